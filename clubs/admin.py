@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import User, Tournament, Club, Match, Pairing, EloRating
+from .models import User, Tournament, Club, ClubMembership, Match, Pairing, EloRating, EloRatingHistory, \
+    LeaderboardEntry, UserStats, ClubSummary, GroupStanding, TournamentSnapshot, TournamentPrediction
 
 
 @admin.register(User)
@@ -15,6 +16,20 @@ class ClubAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(ClubSummary)
+class ClubSummaryAdmin(admin.ModelAdmin):
+    list_display = [
+        'club', 'number_of_members', 'number_of_officers', 'number_of_applicants', 'number_of_tournaments'
+    ]
+
+
+@admin.register(ClubMembership)
+class ClubMembershipAdmin(admin.ModelAdmin):
+    list_display = [
+        'club', 'user', 'role'
+    ]
+
+
 @admin.register(Tournament)
 class TournamentAdmin(admin.ModelAdmin):
     list_display = [
@@ -41,3 +56,46 @@ class EloRatingAdmin(admin.ModelAdmin):
     list_display = [
         'user', 'club', 'elo_rating'
     ]
+
+
+@admin.register(EloRatingHistory)
+class EloRatingHistoryAdmin(admin.ModelAdmin):
+    list_display = [
+        'user', 'club', 'match', 'rating_before', 'rating_after', 'recorded_at'
+    ]
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = [
+        'club', 'position', 'rank', 'user', 'elo_rating', 'percentile'
+    ]
+
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = [
+        'user', 'club', 'matches_played', 'matches_won', 'matches_lost', 'tournaments_participated_in',
+        'tournaments_won'
+    ]
+
+
+@admin.register(GroupStanding)
+class GroupStandingAdmin(admin.ModelAdmin):
+    list_display = [
+        'group', 'player', 'points', 'wins', 'draws', 'losses'
+    ]
+
+
+@admin.register(TournamentSnapshot)
+class TournamentSnapshotAdmin(admin.ModelAdmin):
+    list_display = [
+        'tournament', 'created_at'
+    ]
+
+
+@admin.register(TournamentPrediction)
+class TournamentPredictionAdmin(admin.ModelAdmin):
+    list_display = [
+        'tournament', 'state', 'computed_at'
+    ]
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def restore_search_index(using, **kwargs):
+    from .search import restore_search_tables
+
+    restore_search_tables(connections[using])
 
 
 class ClubsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clubs'
+
+    def ready(self):
+        post_migrate.connect(restore_search_index, sender=self)
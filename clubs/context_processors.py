@@ -0,0 +1,6 @@
+def memberships(request):
+    """Make the clubs of the logged in user available to every template, the navbar needs them on every page."""
+    user_memberships = getattr(request, 'memberships', None)
+    if user_memberships is None:
+        return {}
+    return {"user_clubs": user_memberships.clubs, "managed_club_ids": user_memberships.managed_club_ids}
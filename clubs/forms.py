@@ -69,15 +69,20 @@ class EditForm(forms.ModelForm):
 class CreateClubForm(forms.ModelForm):
     class Meta:
         model = Club
-        fields = ['name', 'location', 'description']
+        fields = ['name', 'location', 'description', 'rating_system']
         widgets = {'description': forms.Textarea()}
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['rating_system'].required = False
+
     def save(self, user):
         super().save(commit=False)
         club = Club.objects.create(
             name=self.cleaned_data.get('name'),
             location=self.cleaned_data.get('location'),
             description=self.cleaned_data.get('description'),
+            rating_system=self.cleaned_data.get('rating_system') or Club.RatingSystem.ELO,
             owner=user,
         )
         return club
@@ -102,6 +107,8 @@ class CreateTournamentForm(forms.ModelForm):
             super(CreateTournamentForm, self).__init__(post, *args, **kwargs)
         else:
             super(CreateTournamentForm, self).__init__(*args, **kwargs)
+        self.fields["format"].required = False
+        self.fields["qualifiers_per_group"].required = False
         if club and current_user:
             self.fields["coorganisers"].choices = _generate_officer_tuples(club, current_user)
 
@@ -112,17 +119,27 @@ class CreateTournamentForm(forms.ModelForm):
 
     class Meta:
         model = Tournament
-        fields = ["name", "description", "coorganisers"]
+        fields = ["name", "description", "coorganisers", "format", "number_of_rounds", "number_of_groups",
+                  "group_size", "qualifiers_per_group"]
         widgets = {"description": forms.Textarea(), "coorganisers": forms.SelectMultiple()}
-        help_texts = {"coorganisers": "Hold Ctrl/⌘ to select multiple"}
+        help_texts = {"coorganisers": "Hold Ctrl/⌘ to select multiple",
+                      "number_of_rounds": "Swiss tournaments only, leave empty to fit the number of participants",
+                      "number_of_groups": "Knockout tournaments only, leave empty to use eight groups",
+                      "group_size": "Knockout tournaments only, the most players in a group"}
 
     def save(self, user, club):
         super().save(commit=False)
+        group_stage = {field: self.cleaned_data.get(field) for field in ("number_of_groups", "group_size",
+                                                                        "qualifiers_per_group")
+                       if self.cleaned_data.get(field)}
         tournament = Tournament.objects.create(
             club=Club.objects.get(id=club),
             name=self.cleaned_data.get("name"),
             description=self.cleaned_data.get("description"),
             organiser=user,
+            format=self.cleaned_data.get("format") or Tournament.Format.KNOCKOUT,
+            number_of_rounds=self.cleaned_data.get("number_of_rounds"),
+            **group_stage,
             deadline=make_aware(
                 datetime.combine(self.cleaned_data.get("deadline_date"), self.cleaned_data.get("deadline_time")))
         )
@@ -130,6 +147,37 @@ class CreateTournamentForm(forms.ModelForm):
         tournament.save()
         return tournament
 
+
+class RoundResultsForm(forms.Form):
+    """The results of every open pairing of the current round of a tournament, pairings left empty are skipped."""
+    DRAW = "draw"
+
+    def __init__(self, tournament, *args, **kwargs):
+        super(RoundResultsForm, self).__init__(*args, **kwargs)
+        self.pairings = list(tournament.get_open_pairings().filter(round=tournament.round))
+        for pairing in self.pairings:
+            self.fields[f"pairing_{pairing.id}"] = forms.ChoiceField(
+                label=f"{pairing.white_player.full_name()} - {pairing.black_player.full_name()}",
+                required=False,
+                widget=forms.Select(attrs={"class": "form-select"}),
+                choices=[("", "Not played yet"), (str(pairing.white_player_id), pairing.white_player.full_name()),
+                         (str(pairing.black_player_id), pairing.black_player.full_name()), (self.DRAW, "Draw")])
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not any(cleaned_data.get(f"pairing_{pairing.id}") for pairing in self.pairings):
+            raise forms.ValidationError("Enter at least one result")
+        return cleaned_data
+
+    def get_results(self):
+        """Return the results as (pairing id, winner id) pairs, with no winner for a draw."""
+        results = []
+        for pairing in self.pairings:
+            result = self.cleaned_data.get(f"pairing_{pairing.id}")
+            if result:
+                results.append((pairing.id, None if result == self.DRAW else int(result)))
+        return results
+
 #
 # class ClubApplicationForm(forms.ModelForm):
 #     class Meta:
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from clubs.models import Tournament
+
+
+class Command(BaseCommand):
+    """Keep a snapshot of the page of every completed tournament that does not have one yet."""
+
+    help = "Freeze the pages of completed tournaments that were won before snapshots were kept"
+
+    def handle(self, *args, **options):
+        tournaments = list(Tournament.objects.filter(winner__isnull=False, snapshot__isnull=True))
+        for tournament in tournaments:
+            tournament.freeze()
+
+        self.stdout.write(f"Froze {len(tournaments)} tournaments")
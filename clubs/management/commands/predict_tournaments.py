@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from clubs.models import Tournament
+from clubs.predictions import DEFAULT_SIMULATIONS, get_prediction
+
+
+class Command(BaseCommand):
+    """Work out the predictions of the knockout tournaments still being played whose stored one is out of date."""
+
+    help = "Refresh the predictions of running knockout tournaments, meant to be run after results come in"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--simulations', type=int, default=DEFAULT_SIMULATIONS)
+        parser.add_argument('--workers', type=int, default=1, help="Worker processes to spread the simulations over")
+
+    def handle(self, *args, **options):
+        tournaments = Tournament.objects.filter(format=Tournament.Format.KNOCKOUT, winner__isnull=True,
+                                                pairings_within__isnull=False).distinct()
+        for tournament in tournaments:
+            get_prediction(tournament, options['simulations'], options['workers'])
+
+        self.stdout.write(f"Predicted {len(tournaments)} tournaments")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from clubs.search import create_search_tables
+
+
+class Command(BaseCommand):
+    """Recreate the full-text search tables and their triggers, and fill the tables again."""
+
+    help = "Rebuild the full-text search index of clubs and players, needed after a migration rebuilds their tables"
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write("The search index is kept by the database itself")
+            return
+        create_search_tables(connection)
+        self.stdout.write("Rebuilt the search index")
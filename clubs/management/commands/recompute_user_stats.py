@@ -0,0 +1,55 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+from clubs.models import Match, Tournament, UserStats
+
+
+def count_user_stats():
+    """Return the counters of every user in every club, keyed by (club id, user id), with one query per counter."""
+    counters = defaultdict(lambda: defaultdict(int))
+
+    def add(counter, rows):
+        for (club_id, user_id, count) in rows:
+            counters[(club_id, user_id)][counter] += count
+
+    matches = Match.objects.annotate(club_id=F('pairing__tournament__club_id'))
+    for player in ('pairing__white_player_id', 'pairing__black_player_id'):
+        rows = matches.values('club_id', player).annotate(played=Count('id'), drawn=Count('id', filter=Q(is_draw=True)))
+        for row in rows:
+            counters[(row['club_id'], row[player])]['matches_played'] += row['played']
+            counters[(row['club_id'], row[player])]['matches_drawn'] += row['drawn']
+    decided = matches.filter(is_draw=False)
+    add('matches_won', decided.values_list('club_id', 'winner_id').annotate(Count('id')))
+    add('matches_lost', decided.values_list('club_id', 'loser_id').annotate(Count('id')))
+
+    participants = Tournament.participants.through.objects.annotate(club_id=F('tournament__club_id'))
+    add('tournaments_participated_in', participants.values_list('club_id', 'user_id').annotate(Count('id')))
+    add('tournaments_won', Tournament.objects.filter(winner__isnull=False).values_list(
+        'club_id', 'winner_id').annotate(Count('id')))
+    add('tournaments_lost', participants.filter(tournament__winner__isnull=False).exclude(
+        user_id=F('tournament__winner_id')).values_list('club_id', 'user_id').annotate(Count('id')))
+    return counters
+
+
+class Command(BaseCommand):
+    """Rebuild the match and tournament counters of every user from the matches and tournaments."""
+
+    help = "Rebuild the match and tournament counters of every user, per club and across all clubs"
+
+    def handle(self, *args, **options):
+        club_counters = count_user_stats()
+        global_counters = defaultdict(lambda: defaultdict(int))
+        for ((_, user_id), user_counters) in club_counters.items():
+            for (counter, count) in user_counters.items():
+                global_counters[user_id][counter] += count
+
+        stats = [UserStats(club_id=club_id, user_id=user_id, **user_counters)
+                 for ((club_id, user_id), user_counters) in club_counters.items()]
+        stats += [UserStats(club_id=None, user_id=user_id, **user_counters)
+                  for (user_id, user_counters) in global_counters.items()]
+        with transaction.atomic():
+            UserStats.objects.all().delete()
+            UserStats.objects.bulk_create(stats, batch_size=1000)
+
+        self.stdout.write(f"Recomputed the counters of {len(global_counters)} users")
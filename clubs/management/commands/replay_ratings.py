@@ -0,0 +1,109 @@
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from clubs.models import Club, EloRating, Match, rebuild_leaderboard
+from clubs.ratings import INITIAL_RATING, INITIAL_RATING_DEVIATION, INITIAL_VOLATILITY, white_score
+
+
+def load_club_results(club):
+    """Return the players of every match in the club, in the order the matches were played, white's scores
+    and the tournament round each match was played in."""
+    results = Match.objects.filter(pairing__tournament__club=club).order_by('id').values_list(
+        'pairing__white_player_id', 'pairing__black_player_id', 'winner_id', 'is_draw', 'pairing__tournament_id',
+        'pairing__round')
+
+    player_index = {}
+    round_index = {}
+    white, black, white_scores, rounds = [], [], [], []
+    for white_id, black_id, winner_id, is_draw, tournament_id, round_number in results.iterator(chunk_size=10000):
+        white.append(player_index.setdefault(white_id, len(player_index)))
+        black.append(player_index.setdefault(black_id, len(player_index)))
+        white_scores.append(white_score(white_id, winner_id, is_draw))
+        rounds.append(round_index.setdefault((tournament_id, round_number), len(round_index)))
+
+    return (player_index, np.array(white, dtype=np.int64), np.array(black, dtype=np.int64), np.array(white_scores),
+            np.array(rounds, dtype=np.int64))
+
+
+def independent_batches(white, black):
+    """Split the matches into consecutive runs in which no player appears twice.
+
+    The matches of a run do not depend on each other, so they can be rated all at once and the result is the same
+    as rating them one by one."""
+    start = 0
+    seen = set()
+    for i, (white_player, black_player) in enumerate(zip(white.tolist(), black.tolist())):
+        if white_player in seen or black_player in seen:
+            yield slice(start, i)
+            start = i
+            seen = set()
+        seen.add(white_player)
+        seen.add(black_player)
+    if start < len(white):
+        yield slice(start, len(white))
+
+
+def round_periods(rounds):
+    """Split the matches into tournament rounds, ordered by the first match played in each round."""
+    order = np.argsort(rounds, kind='stable')
+    boundaries = np.flatnonzero(np.diff(rounds[order])) + 1
+    return np.split(order, boundaries)
+
+
+def replay(engine, number_of_players, white, black, white_scores, rounds):
+    """Replay the matches with the given engine, the same way they are rated when results are recorded."""
+    ratings = np.full(number_of_players, INITIAL_RATING, dtype=np.float64)
+    deviations = np.full(number_of_players, INITIAL_RATING_DEVIATION)
+    volatilities = np.full(number_of_players, INITIAL_VOLATILITY)
+    if engine.rates_each_match:
+        periods = independent_batches(white, black)
+    else:
+        periods = round_periods(rounds)
+    for period in periods:
+        # Only the players of the period are rated, so players who sat it out keep their deviation as they do live
+        players = np.unique(np.concatenate([white[period], black[period]]))
+        ratings[players], deviations[players], volatilities[players] = engine.rate_period(
+            ratings[players], deviations[players], volatilities[players], np.searchsorted(players, white[period]),
+            np.searchsorted(players, black[period]), white_scores[period])
+    return ratings, deviations, volatilities
+
+
+class Command(BaseCommand):
+    """Rebuild the elo ratings of a club from its match history."""
+
+    help = "Rebuild the elo ratings of a club by replaying every match played in it"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--club', type=int, required=True, help="The id of the club to replay")
+
+    def handle(self, *args, **options):
+        try:
+            club = Club.objects.get(id=options['club'])
+        except Club.DoesNotExist:
+            raise CommandError(f"Club {options['club']} does not exist")
+
+        player_index, white, black, white_scores, rounds = load_club_results(club)
+        ratings, deviations, volatilities = replay(club.get_rating_engine(), len(player_index), white, black,
+                                                   white_scores, rounds)
+
+        with transaction.atomic():
+            club_elos = list(EloRating.objects.select_for_update().filter(club=club))
+            changed = 0
+            for elo in club_elos:
+                if elo.user_id in player_index:
+                    i = player_index[elo.user_id]
+                    new_rating = int(ratings[i])
+                    elo.rating_deviation = float(deviations[i])
+                    elo.volatility = float(volatilities[i])
+                else:
+                    new_rating = INITIAL_RATING
+                    elo.rating_deviation = INITIAL_RATING_DEVIATION
+                    elo.volatility = INITIAL_VOLATILITY
+                if new_rating != elo.elo_rating:
+                    changed += 1
+                elo.elo_rating = new_rating
+            EloRating.objects.bulk_update(club_elos, ['elo_rating', 'rating_deviation', 'volatility'], batch_size=1000)
+            rebuild_leaderboard(club.id)
+            club.refresh_summary()
+
+        self.stdout.write(f"Replayed {len(white)} matches in {club.name}, {changed} ratings changed")
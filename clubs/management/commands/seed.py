@@ -77,11 +77,10 @@ def generate_tournament_matches(tournament, number_of_rounds=0, finish=False):
                     else:
                         match = pairing_to_match_group_phase(pairing, pairing.black_player)
 
-            match.save()
-
             if tournament.is_final and tournament.all_pairings_completed():
                 tournament.set_winner(match.winner)
                 tournament.save()
+                tournament.freeze()
 
 
 def get_user():
@@ -110,7 +109,7 @@ def create_email(first_name, last_name):
 
 
 def create_future_tournament(club):
-    members = list(club.members.all())
+    members = list(club.get_members())
     random.shuffle(members)
     participants = members[0: random.randint(4, len(members))]
     coorganisers = members[0: random.randint(0, 5)]
@@ -132,14 +131,15 @@ def create_future_tournament(club):
         deadline=make_aware(datetime.now() + timedelta(hours=24))
     )
 
-    future_tournament.participants.set(participants)
+    for participant in participants:
+        future_tournament.make_participant(participant)
     future_tournament.coorganisers.set(coorganisers)
 
     future_tournament.save()
 
 
 def create_current_tournament(club):
-    members = list(club.members.all())
+    members = list(club.get_members())
     random.shuffle(members)
     participants = members[0: random.randint(4, len(members))]
     coorganisers = members[0: random.randint(0, 5)]
@@ -157,7 +157,8 @@ def create_current_tournament(club):
         description='Come on, chess is not rocket science!',
         deadline=make_aware(datetime.now() - timedelta(hours=24))
     )
-    current_tournament.participants.set(participants)
+    for participant in participants:
+        current_tournament.make_participant(participant)
     current_tournament.coorganisers.set(coorganisers)
 
     current_tournament.save()
@@ -343,10 +344,10 @@ class Command(BaseCommand):
     def create_tournament(self, club, past=False):
         name = f'{club.name} Tournament #{club.get_all_tournaments().count() + 1}'
         description = self.faker.text(max_nb_chars=500)
-        officers = list(club.officers.all())
+        officers = list(club.get_officers())
         random.shuffle(officers)
         organiser = officers[0]
-        members = list(club.members.all())
+        members = list(club.get_members())
         random.shuffle(members)
         participants = members[0: random.randint(4, len(members))]
         coorganisers = members[0: random.randint(0, 5)]
@@ -365,7 +366,8 @@ class Command(BaseCommand):
             deadline=make_aware(deadline)
         )
 
-        tournament.participants.set(participants)
+        for participant in participants:
+            tournament.make_participant(participant)
         tournament.coorganisers.set(coorganisers)
 
         return tournament
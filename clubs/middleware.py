@@ -0,0 +1,44 @@
+from django.db.models import F, FilteredRelation, Q
+from django.utils.functional import SimpleLazyObject
+
+from .models import Club, ClubMembership
+
+
+class UserMemberships:
+    """The clubs the user belongs to and their level in each of them, loaded in one query."""
+
+    def __init__(self, user):
+        self.clubs = []
+        self.levels = {}
+        if not user.is_authenticated:
+            return
+
+        user_clubs = Club.objects.annotate(
+            membership=FilteredRelation('memberships', condition=Q(memberships__user=user))
+        ).filter(Q(owner=user) | Q(membership__role__in=ClubMembership.IN_CLUB_ROLES)).annotate(
+            role=F('membership__role')).order_by('id')
+
+        for user_club in user_clubs:
+            if user_club.owner_id == user.id:
+                self.levels[user_club.id] = "Owner"
+            else:
+                self.levels[user_club.id] = user_club.role
+            self.clubs.append(user_club)
+
+    def user_level(self, club):
+        return self.levels.get(club.id, "Applicant")
+
+    @property
+    def managed_club_ids(self):
+        return {club_id for (club_id, level) in self.levels.items() if level in ("Officer", "Owner")}
+
+
+class ClubMembershipMiddleware:
+    """Attach the memberships of the logged in user to the request, they are only loaded when first used."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.memberships = SimpleLazyObject(lambda: UserMemberships(request.user))
+        return self.get_response(request)
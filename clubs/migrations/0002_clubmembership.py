@@ -0,0 +1,66 @@
+# Generated by Django 3.2.5 on 2026-10-18 13:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_memberships(apps, schema_editor):
+    # Later roles win, so a user who is both an applicant and an officer ends up as an officer
+    Club = apps.get_model('clubs', 'Club')
+    ClubMembership = apps.get_model('clubs', 'ClubMembership')
+    owners = dict(Club.objects.values_list('id', 'owner_id'))
+    roles = {}
+    for field, role in (('applicants', 'Applicant'), ('members', 'Member'), ('officers', 'Officer')):
+        through = getattr(Club, field).through
+        for club_id, user_id in through.objects.values_list('club_id', 'user_id').iterator():
+            if owners[club_id] != user_id:
+                roles[(club_id, user_id)] = role
+    ClubMembership.objects.bulk_create(
+        [ClubMembership(club_id=club_id, user_id=user_id, role=role) for (club_id, user_id), role in roles.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('Applicant', 'Applicant'), ('Member', 'Member'), ('Officer', 'Officer')], max_length=9)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='clubs.club')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='clubmembership',
+            index=models.Index(fields=['club', 'role'], name='clubs_clubm_club_id_a91663_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clubmembership',
+            index=models.Index(fields=['user', 'role'], name='clubs_clubm_user_id_ef79f8_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='clubmembership',
+            constraint=models.UniqueConstraint(fields=('club', 'user'), name='unique_club_membership'),
+        ),
+        migrations.RunPython(copy_memberships, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='club',
+            name='applicants',
+        ),
+        migrations.RemoveField(
+            model_name='club',
+            name='members',
+        ),
+        migrations.RemoveField(
+            model_name='club',
+            name='officers',
+        ),
+    ]
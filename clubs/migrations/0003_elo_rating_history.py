@@ -0,0 +1,36 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0002_clubmembership'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EloRatingHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating_before', models.IntegerField()),
+                ('rating_after', models.IntegerField()),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='elo_history', to='clubs.club')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='elo_changes', to='clubs.match')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='elo_history', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='eloratinghistory',
+            index=models.Index(fields=['user', 'club', 'recorded_at'], name='clubs_elora_user_id_079fb5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eloratinghistory',
+            index=models.Index(fields=['club', 'recorded_at'], name='clubs_elora_club_id_a7cb05_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0003_elo_rating_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='club',
+            name='rating_system',
+            field=models.CharField(choices=[('elo', 'Elo'), ('glicko2', 'Glicko-2')], default='elo', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='elorating',
+            name='rating_deviation',
+            field=models.FloatField(default=350.0),
+        ),
+        migrations.AddField(
+            model_name='elorating',
+            name='volatility',
+            field=models.FloatField(default=0.06),
+        ),
+    ]
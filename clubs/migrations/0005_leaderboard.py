@@ -0,0 +1,66 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_leaderboards(apps, schema_editor):
+    EloRating = apps.get_model('clubs', 'EloRating')
+    LeaderboardEntry = apps.get_model('clubs', 'LeaderboardEntry')
+    ratings = {}
+    listed = set()
+    for club_id, user_id, rating in EloRating.objects.order_by('club_id', '-elo_rating', 'user_id').values_list(
+            'club_id', 'user_id', 'elo_rating').iterator():
+        # A player with more than one rating in the club is only listed with the highest of them
+        if (club_id, user_id) in listed:
+            continue
+        listed.add((club_id, user_id))
+        ratings.setdefault(club_id, []).append((user_id, rating))
+    entries = []
+    for club_id, club_ratings in ratings.items():
+        rank = 0
+        previous_rating = None
+        for position, (user_id, rating) in enumerate(club_ratings, start=1):
+            if rating != previous_rating:
+                rank = position
+                previous_rating = rating
+            entries.append(LeaderboardEntry(club_id=club_id, user_id=user_id, elo_rating=rating, rank=rank,
+                                            position=position,
+                                            percentile=100 * (len(club_ratings) + 1 - rank) / len(club_ratings)))
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0004_rating_engines'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('elo_rating', models.IntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('position', models.PositiveIntegerField()),
+                ('percentile', models.FloatField()),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='clubs.club')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['club', 'position'], name='clubs_leade_club_id_ea5a05_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['club', 'elo_rating'], name='clubs_leade_club_id_9ed8ea_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('club', 'user'), name='unique_leaderboard_entry'),
+        ),
+        migrations.RunPython(build_leaderboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0005_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches_played', models.IntegerField(default=0)),
+                ('matches_won', models.IntegerField(default=0)),
+                ('matches_lost', models.IntegerField(default=0)),
+                ('matches_drawn', models.IntegerField(default=0)),
+                ('tournaments_participated_in', models.IntegerField(default=0)),
+                ('tournaments_won', models.IntegerField(default=0)),
+                ('tournaments_lost', models.IntegerField(default=0)),
+                ('club', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='user_stats', to='clubs.club')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='userstats',
+            constraint=models.UniqueConstraint(fields=('user', 'club'), name='unique_club_user_stats'),
+        ),
+        migrations.AddConstraint(
+            model_name='userstats',
+            constraint=models.UniqueConstraint(condition=models.Q(('club__isnull', True)), fields=('user',), name='unique_global_user_stats'),
+        ),
+    ]
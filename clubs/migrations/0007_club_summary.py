@@ -0,0 +1,49 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:24
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+
+
+def build_club_summaries(apps, schema_editor):
+    Club = apps.get_model('clubs', 'Club')
+    ClubSummary = apps.get_model('clubs', 'ClubSummary')
+    clubs = Club.objects.annotate(
+        members=Count('memberships', filter=Q(memberships__role='Member'), distinct=True),
+        officers=Count('memberships', filter=Q(memberships__role='Officer'), distinct=True),
+        applicants=Count('memberships', filter=Q(memberships__role='Applicant'), distinct=True),
+        tournaments=Count('has_tournaments', distinct=True),
+    )
+    ratings = {row['club_id']: row for row in apps.get_model('clubs', 'EloRating').objects.values('club_id').annotate(
+        count=Count('id'), total=Sum('elo_rating'))}
+    ClubSummary.objects.bulk_create([
+        ClubSummary(club_id=club.id, number_of_members=club.members, number_of_officers=club.officers,
+                    number_of_applicants=club.applicants, number_of_tournaments=club.tournaments,
+                    number_of_ratings=ratings.get(club.id, {}).get('count', 0),
+                    elo_rating_total=ratings.get(club.id, {}).get('total', 0))
+        for club in clubs.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0006_user_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number_of_members', models.IntegerField(default=0)),
+                ('number_of_officers', models.IntegerField(default=0)),
+                ('number_of_applicants', models.IntegerField(default=0)),
+                ('number_of_tournaments', models.IntegerField(default=0)),
+                ('number_of_ratings', models.IntegerField(default=0)),
+                ('elo_rating_total', models.BigIntegerField(default=0)),
+                ('club', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='clubs.club')),
+            ],
+        ),
+        migrations.RunPython(build_club_summaries, migrations.RunPython.noop),
+    ]
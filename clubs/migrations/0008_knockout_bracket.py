@@ -0,0 +1,78 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_open_brackets(apps, schema_editor):
+    """Build the rest of the bracket of knockouts in their elimination phase, the way create_bracket_pairings does.
+
+    Only the current round of those tournaments was paired, with a player left over waiting in bye. The pairings of
+    the current round and the bye players go under the pairings of the next round, and the winners already known
+    take their slots."""
+    Tournament = apps.get_model('clubs', 'Tournament')
+    Pairing = apps.get_model('clubs', 'Pairing')
+    Match = apps.get_model('clubs', 'Match')
+    for tournament in Tournament.objects.filter(winner__isnull=True, elimination_phase=True, is_final=False):
+        current = list(Pairing.objects.filter(tournament=tournament, round=tournament.round,
+                                              group_in_which_the_paring_takes_place__isnull=True).order_by('id'))
+        if not current:
+            continue
+        winners = dict(Match.objects.filter(pairing__in=current).values_list('pairing_id', 'winner_id'))
+
+        # Pairings stand for their winners, users are players who already know they are in the next round
+        entrants = current + list(tournament.bye.order_by('id'))
+        round_number = tournament.round
+        while len(entrants) > 1:
+            round_number += 1
+            next_entrants = []
+            for i in range(0, len(entrants) - 1, 2):
+                pairing = Pairing.objects.create(tournament=tournament, round=round_number)
+                for (entrant, side) in ((entrants[i], 'white'), (entrants[i + 1], 'black')):
+                    if isinstance(entrant, Pairing):
+                        Pairing.objects.filter(id=entrant.id).update(parent=pairing, side=side)
+                        player_id = winners.get(entrant.id)
+                    else:
+                        player_id = entrant.id
+                    setattr(pairing, f'{side}_player_id', player_id)
+                pairing.save()
+                next_entrants.append(pairing)
+            if len(entrants) % 2 == 1:
+                next_entrants.append(entrants[-1])
+            entrants = next_entrants
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0007_club_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pairing',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='clubs.pairing'),
+        ),
+        migrations.AddField(
+            model_name='pairing',
+            name='side',
+            field=models.CharField(blank=True, choices=[('white', 'White'), ('black', 'Black')], max_length=5),
+        ),
+        migrations.AlterField(
+            model_name='pairing',
+            name='black_player',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='plays_black_in', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='pairing',
+            name='white_player',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='plays_white_in', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(build_open_brackets, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='tournament',
+            name='bye',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0008_knockout_bracket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='format',
+            field=models.CharField(choices=[('knockout', 'Knockout'), ('swiss', 'Swiss')], default='knockout', max_length=8),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='number_of_rounds',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:40
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0009_swiss_tournaments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='group_size',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(2)]),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='number_of_groups',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='qualifiers_per_group',
+            field=models.PositiveIntegerField(default=2, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_group_standings(apps, schema_editor):
+    Group = apps.get_model('clubs', 'Group')
+    GroupStanding = apps.get_model('clubs', 'GroupStanding')
+    standings = {}
+    for (group_id, user_id) in Group.participants.through.objects.order_by('id').values_list('group_id', 'user_id'):
+        standings[(group_id, user_id)] = GroupStanding(group_id=group_id, player_id=user_id)
+    results = Group.pairings.through.objects.filter(pairing__match__isnull=False).values_list(
+        'group_id', 'pairing__white_player_id', 'pairing__black_player_id', 'pairing__match__winner_id',
+        'pairing__match__is_draw')
+    for (group_id, white, black, winner, is_draw) in results:
+        for player in (white, black):
+            standing = standings.get((group_id, player))
+            if standing is None:
+                continue
+            if is_draw:
+                standing.points += 0.5
+                standing.draws += 1
+            elif winner == player:
+                standing.points += 1
+                standing.wins += 1
+            else:
+                standing.losses += 1
+    GroupStanding.objects.bulk_create(standings.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0010_group_stage_layout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.FloatField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='clubs.group')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_standings', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupstanding',
+            index=models.Index(fields=['group', '-points'], name='clubs_group_group_i_665247_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupstanding',
+            constraint=models.UniqueConstraint(fields=('group', 'player'), name='unique_group_standing'),
+        ),
+        migrations.RunPython(build_group_standings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:54
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def count_pending_pairings(apps, schema_editor):
+    Tournament = apps.get_model('clubs', 'Tournament')
+    pending = Tournament.objects.annotate(pending=Count('pairings_within', filter=Q(
+        pairings_within__round=F('round'), pairings_within__white_player__isnull=False,
+        pairings_within__black_player__isnull=False, pairings_within__match__isnull=True)))
+    for (tournament_id, count) in pending.filter(pending__gt=0).values_list('id', 'pending'):
+        Tournament.objects.filter(id=tournament_id).update(pending_pairings=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0011_group_standings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='pending_pairings',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_pending_pairings, migrations.RunPython.noop),
+    ]
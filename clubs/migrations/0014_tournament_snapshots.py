@@ -0,0 +1,23 @@
+# Generated by Django 3.2.5 on 2026-10-18 15:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0013_tournament_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TournamentSnapshot',
+            fields=[
+                ('tournament', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='clubs.tournament')),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.5 on 2026-10-18 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0014_tournament_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='elorating',
+            index=models.Index(fields=['club', 'user'], name='clubs_elora_club_id_2adb30_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.5 on 2026-10-18 15:11
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0015_user_list_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='club_name_search'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(django.db.models.functions.text.Lower('location'), name='club_location_search'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.5 on 2026-10-18 15:30
+
+from django.db import migrations
+
+# The FTS5 tables as they were made here, with the table each one shadows and its searched columns. The triggers
+# are recreated after every migrate by the post_migrate handler of the app, as SQLite drops them with their table.
+SEARCH_TABLES = (
+    ('clubs_club_fts', 'clubs_club', ('name', 'location', 'description')),
+    ('clubs_user_fts', 'clubs_user', ('first_name', 'last_name', 'bio')),
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for (table, model_table, columns) in SEARCH_TABLES:
+        names = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        delete = f"INSERT INTO {table}({table}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+        insert = f"INSERT INTO {table}(rowid, {names}) VALUES (new.id, {new_values});"
+        schema_editor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5({names}, "
+                              f"content='{model_table}', content_rowid='id')")
+        schema_editor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON {model_table} "
+                              f"BEGIN {insert} END")
+        schema_editor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON {model_table} "
+                              f"BEGIN {delete} END")
+        schema_editor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_update AFTER UPDATE OF {names} "
+                              f"ON {model_table} BEGIN {delete} {insert} END")
+        schema_editor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for (table, _, _) in SEARCH_TABLES:
+        for trigger in ('insert', 'delete', 'update'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0016_club_directory_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.5 on 2026-10-18 15:45
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0017_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clubapplication',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='clubapplication',
+            index=models.Index(fields=['associated_club', 'is_rejected', '-created_at', '-id'], name='clubs_cluba_associa_243f4e_idx'),
+        ),
+    ]
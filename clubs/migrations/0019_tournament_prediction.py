@@ -0,0 +1,24 @@
+# Generated by Django 3.2.5 on 2026-10-18 15:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0018_application_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TournamentPrediction',
+            fields=[
+                ('tournament', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='prediction', serialize=False, to='clubs.tournament')),
+                ('state', models.CharField(max_length=100)),
+                ('data', models.JSONField(null=True)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
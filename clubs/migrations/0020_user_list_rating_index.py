@@ -0,0 +1,17 @@
+# Generated by Django 3.2.5 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0019_tournament_prediction'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='elorating',
+            index=models.Index(fields=['club', '-elo_rating', 'user'], name='clubs_elora_club_id_feb8c4_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.5 on 2026-10-18 16:05
+
+from collections import defaultdict
+from django.db import migrations
+from django.db.models import Count, F, Q
+
+
+def backfill_user_stats(apps, schema_editor):
+    Match = apps.get_model('clubs', 'Match')
+    Tournament = apps.get_model('clubs', 'Tournament')
+    UserStats = apps.get_model('clubs', 'UserStats')
+    counters = defaultdict(lambda: defaultdict(int))
+
+    def add(counter, rows):
+        for (club_id, user_id, count) in rows:
+            counters[(club_id, user_id)][counter] += count
+            counters[(None, user_id)][counter] += count
+
+    matches = Match.objects.annotate(club_id=F('pairing__tournament__club_id'))
+    for player in ('pairing__white_player_id', 'pairing__black_player_id'):
+        rows = matches.values('club_id', player).annotate(played=Count('id'), drawn=Count('id', filter=Q(is_draw=True)))
+        add('matches_played', [(row['club_id'], row[player], row['played']) for row in rows])
+        add('matches_drawn', [(row['club_id'], row[player], row['drawn']) for row in rows])
+    decided = matches.filter(is_draw=False)
+    add('matches_won', decided.values_list('club_id', 'winner_id').annotate(Count('id')))
+    add('matches_lost', decided.values_list('club_id', 'loser_id').annotate(Count('id')))
+
+    participants = Tournament.participants.through.objects.annotate(club_id=F('tournament__club_id'))
+    add('tournaments_participated_in', participants.values_list('club_id', 'user_id').annotate(Count('id')))
+    add('tournaments_won', Tournament.objects.filter(winner__isnull=False).values_list(
+        'club_id', 'winner_id').annotate(Count('id')))
+    add('tournaments_lost', participants.filter(tournament__winner__isnull=False).exclude(
+        user_id=F('tournament__winner_id')).values_list('club_id', 'user_id').annotate(Count('id')))
+
+    UserStats.objects.all().delete()
+    UserStats.objects.bulk_create([
+        UserStats(club_id=club_id, user_id=user_id, **user_counters)
+        for ((club_id, user_id), user_counters) in counters.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0020_user_list_rating_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,21 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from math import ceil
 import random
 
 from django.contrib.auth.base_user import BaseUserManager
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
-from django.db.models import Model
+from django.core.validators import MinValueValidator
+from django.db.models import Model, Q, F, Avg, Case, Count, Exists, Max, Min, OuterRef, Subquery, Sum, When, \
+    ExpressionWrapper, FilteredRelation, FloatField, Value
+from django.db.models.functions import Coalesce, Greatest, Least, Lower
+from django.utils import timezone
 from django.utils.timezone import make_aware
 from libgravatar import Gravatar
+import numpy as np
+
+from . import swiss, tiebreaks
+from .ratings import RATING_ENGINES, INITIAL_RATING, INITIAL_RATING_DEVIATION, INITIAL_VOLATILITY, white_score
 
 
 # This user manager is following tutorial from
@@ -83,6 +92,10 @@ class User(AbstractUser):
     def user_level(self, club):
         return club.user_level(self)
 
+    def get_all_clubs(self):
+        return Club.objects.filter(
+            Q(id__in=self.memberships.filter(role__in=ClubMembership.IN_CLUB_ROLES).values('club_id')) | Q(owner=self))
+
     def promote(self, club):
         if self.user_level(club) == "Applicant":
             club.make_member(self)
@@ -113,30 +126,35 @@ class User(AbstractUser):
         return self.participates_in.count()
 
     def get_number_of_tournaments_lost(self):
-        counter = 0
-        for tournament in self.participates_in.all():
-            if tournament.winner and tournament.winner != self:
-                counter += 1
-        return counter
+        return self.participates_in.filter(winner__isnull=False).exclude(winner=self).count()
+
+    def get_stats(self, club=None):
+        """Return the counters of the user in the club, or across all clubs when no club is given."""
+        return self.stats.filter(club=club).first() or UserStats(user=self, club=club)
 
     def get_highest_elo(self):
-        return max(self._get_all_elos(), default=0)
+        return self._get_current_elo_statistics()['highest']
 
     def get_lowest_elo(self):
-        return min(self._get_all_elos(), default=0)
+        return self._get_current_elo_statistics()['lowest']
 
     def get_mean_elo(self):
-        all_elos = self._get_all_elos()
-        if sum(all_elos) > 0:
-            return round(sum(all_elos) / len(all_elos), 2)
-        else:
-            return 0
-            
-    def _get_all_elos(self):
-        temp_array = []
-        for elo in self.user_elo.all():
-            temp_array.append(elo.elo_rating)
-        return temp_array
+        return self._get_current_elo_statistics()['mean']
+
+    def get_elo_statistics(self):
+        # The current ratings and the rating history across all clubs, two aggregate queries in total
+        statistics = self._get_current_elo_statistics()
+        statistics.update(_get_elo_history_statistics(self.elo_history.all(), statistics))
+        return statistics
+
+    def _get_current_elo_statistics(self):
+        statistics = self.user_elo.aggregate(highest=Max('elo_rating'), lowest=Min('elo_rating'),
+                                             mean=Avg('elo_rating'))
+        return {
+            'highest': statistics['highest'] or 0,
+            'lowest': statistics['lowest'] or 0,
+            'mean': round(statistics['mean'] or 0, 2),
+        }
 
 
 class Club(models.Model):
@@ -144,91 +162,133 @@ class Club(models.Model):
     location = models.CharField(blank=False, max_length=100)
     description = models.CharField(blank=True, max_length=500)
 
-    members = models.ManyToManyField(User, related_name='member_of')
-    officers = models.ManyToManyField(User, related_name='officer_of')
-    applicants = models.ManyToManyField(User, related_name='applicant_of')
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owner_of')
 
+    class RatingSystem(models.TextChoices):
+        ELO = 'elo', 'Elo'
+        GLICKO2 = 'glicko2', 'Glicko-2'
+
+    rating_system = models.CharField(choices=RatingSystem.choices, default=RatingSystem.ELO, max_length=7)
+
+    class Meta:
+        # The club directory searches names and locations by case-insensitive prefix
+        indexes = [
+            models.Index(Lower('name'), name='club_name_search'),
+            models.Index(Lower('location'), name='club_location_search'),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                ClubSummary.objects.create(club=self)
+
+    def get_rating_engine(self):
+        return RATING_ENGINES[self.rating_system]
+
     def user_level(self, user):
-        if self.owner == user:
+        # The owner is stored on the club itself, everyone else is a single indexed lookup
+        if self.owner_id == user.id:
             return "Owner"
-        elif self.officers.filter(email=user.email):
+        role = self.memberships.filter(user=user).values_list('role', flat=True).first()
+        if role == ClubMembership.Role.OFFICER:
             return "Officer"
-        elif self.members.filter(email=user.email):
+        elif role == ClubMembership.Role.MEMBER:
             return "Member"
         else:
             return "Applicant"
 
     def make_owner(self, user):
         if self.user_level(user) == "Officer":
-            self.officers.remove(user)
-            self.officers.add(self.owner)
-            toggle_superuser(self.owner)
-            self.owner = user
-            toggle_superuser(user)
-            self.save()
+            with transaction.atomic():
+                # The old owner takes over the officer row of the new owner, which swaps both roles in one UPDATE.
+                # The only row an owner can have is an application, which is dropped.
+                applications = self.memberships.filter(user=self.owner).delete()[0]
+                if applications:
+                    update_club_summary(self.id, number_of_applicants=-applications)
+                self.memberships.filter(user=user).update(user=self.owner)
+                toggle_superuser(self.owner)
+                self.owner = user
+                toggle_superuser(user)
+                self.save()
         else:
             raise ValueError
 
     def make_officer(self, user):
-        if self.user_level(user) == "Member":
-            self.members.remove(user)
-            self.officers.add(user)
-            self.save()
-        else:
-            raise ValueError
+        with transaction.atomic():
+            if not self.memberships.filter(user=user, role=ClubMembership.Role.MEMBER).update(
+                    role=ClubMembership.Role.OFFICER):
+                raise ValueError
+            update_club_summary(self.id, number_of_members=-1, number_of_officers=1)
 
     def make_member(self, user):
-        if self.user_level(user) == "Applicant":
-            self.members.add(user)
-            self.applicants.remove(user)
-            self.save()
-            self.give_elo(user)
-        elif self.user_level(user) == "Officer":
-            self.members.add(user)
-            self.officers.remove(user)
-            self.save()
-        else:
-            raise ValueError
+        level = self.user_level(user)
+        with transaction.atomic():
+            if level == "Applicant":
+                membership, created = ClubMembership.objects.update_or_create(
+                    user=user, club=self, defaults={'role': ClubMembership.Role.MEMBER})
+                update_club_summary(self.id, number_of_members=1, number_of_applicants=0 if created else -1)
+                self.give_elo(user)
+            elif level == "Officer":
+                self.memberships.filter(user=user).update(role=ClubMembership.Role.MEMBER)
+                update_club_summary(self.id, number_of_members=1, number_of_officers=-1)
+            else:
+                raise ValueError
 
     def give_elo(self, user):
-        EloRating.objects.create(user=user, club=self, elo_rating=1000)
+        with transaction.atomic():
+            EloRating.objects.create(user=user, club=self, elo_rating=INITIAL_RATING)
+            update_leaderboard(self.id, {user.id: (None, INITIAL_RATING)})
+            update_club_summary(self.id, number_of_ratings=1, elo_rating_total=INITIAL_RATING)
 
     def make_user(self, user):
-        if self.user_level(user) == "Member":
-            self.members.remove(user)
-            self.save()
-            EloRating.objects.filter(user=user, club=self).delete()
-        else:
-            raise ValueError
+        with transaction.atomic():
+            if self.memberships.filter(user=user, role=ClubMembership.Role.MEMBER).delete()[0]:
+                ratings = list(EloRating.objects.filter(user=user, club=self).values_list('elo_rating', flat=True))
+                EloRating.objects.filter(user=user, club=self).delete()
+                update_club_summary(self.id, number_of_members=-1, number_of_ratings=-len(ratings),
+                                    elo_rating_total=-sum(ratings))
+                entry = self.leaderboard.filter(user=user).first()
+                if entry:
+                    update_leaderboard(self.id, {user.id: (entry.elo_rating, None)})
+            else:
+                raise ValueError
 
     def make_applicant(self, user):
-        if user not in self.applicants.all():
-            self.applicants.add(user)
-        else:
-            raise ValueError
+        with transaction.atomic():
+            membership, created = ClubMembership.objects.get_or_create(
+                user=user, club=self, defaults={'role': ClubMembership.Role.APPLICANT})
+            if created:
+                update_club_summary(self.id, number_of_applicants=1)
+            elif membership.role == ClubMembership.Role.APPLICANT:
+                raise ValueError
 
     def get_number_of_members(self):
-        return self.members.count()
+        return self.memberships.filter(role=ClubMembership.Role.MEMBER).count()
 
     def get_number_of_officers(self):
-        return self.officers.count()
+        return self.memberships.filter(role=ClubMembership.Role.OFFICER).count()
+
+    def get_number_of_applicants(self):
+        return self.memberships.filter(role=ClubMembership.Role.APPLICANT).count()
 
     def get_members(self):
-        return self.members.all()
+        return self._get_users_with_roles(ClubMembership.Role.MEMBER)
 
     def get_officers(self):
-        return self.officers.all()
+        return self._get_users_with_roles(ClubMembership.Role.OFFICER)
 
     def get_owner(self):
         return self.owner
 
     def get_all_users(self):
-        return self.get_members().union(self.get_officers()).union(
-            User.objects.filter(email=self.get_owner().email))
+        return User.objects.filter(
+            Q(id__in=self.memberships.filter(
+                role__in=ClubMembership.IN_CLUB_ROLES).values('user_id')) | Q(id=self.owner_id))
 
     def get_all_applicants(self):
-        return self.applicants.all()
+        return self._get_users_with_roles(ClubMembership.Role.APPLICANT)
 
     def get_all_non_applicants(self):
         return User.objects.difference(self.get_all_applicants())
@@ -240,10 +300,179 @@ class Club(models.Model):
         return self.has_tournaments.count()
 
     def get_average_elo(self):
-        temp_array = []
-        for elo in EloRating.objects.filter(club=self):
-            temp_array.append(elo.elo_rating)
-        return round(sum(temp_array) / len(temp_array), 2)
+        return round(self.has_elo_club.aggregate(mean=Avg('elo_rating'))['mean'] or 0, 2)
+
+    def refresh_summary(self):
+        """Recount the summary of the club from scratch and return it."""
+        roles = self.memberships.aggregate(
+            members=Count('id', filter=Q(role=ClubMembership.Role.MEMBER)),
+            officers=Count('id', filter=Q(role=ClubMembership.Role.OFFICER)),
+            applicants=Count('id', filter=Q(role=ClubMembership.Role.APPLICANT)))
+        ratings = self.has_elo_club.aggregate(count=Count('id'), total=Sum('elo_rating'))
+        summary, _ = ClubSummary.objects.update_or_create(club=self, defaults={
+            'number_of_members': roles['members'],
+            'number_of_officers': roles['officers'],
+            'number_of_applicants': roles['applicants'],
+            'number_of_tournaments': self.has_tournaments.count(),
+            'number_of_ratings': ratings['count'],
+            'elo_rating_total': ratings['total'] or 0,
+        })
+        return summary
+
+    def get_elo_statistics(self):
+        statistics = EloRating.objects.filter(club=self).aggregate(highest=Max('elo_rating'),
+                                                                   lowest=Min('elo_rating'))
+        statistics.update(_get_elo_history_statistics(self.elo_history.all(), statistics))
+        return statistics
+
+    def get_leaderboard_entry(self, user):
+        return self.leaderboard.filter(user=user).first()
+
+    def get_top_players(self, count):
+        return self.leaderboard.select_related('user').order_by('position')[:count]
+
+    def get_leaderboard_page(self, page_number, page_size=50):
+        # Positions have no gaps, so a page is a range of the (club, position) index however deep it is
+        first_position = (page_number - 1) * page_size
+        return self.leaderboard.select_related('user').filter(
+            position__gt=first_position, position__lte=first_position + page_size).order_by('position')
+
+    def get_players_near_rating(self, rating, count):
+        """Return up to count players on either side of the rating, in leaderboard order."""
+        above = self.leaderboard.select_related('user').filter(elo_rating__gte=rating).order_by('-position')[:count]
+        below = self.leaderboard.select_related('user').filter(elo_rating__lt=rating).order_by('position')[:count]
+        return list(reversed(above)) + list(below)
+
+    def _get_users_with_roles(self, *roles):
+        return User.objects.filter(memberships__club=self, memberships__role__in=roles)
+
+    def get_user_list(self, members_only=False, role=None, experience=None):
+        """Return the users of the club as one query, each annotated with their role and Elo rating in the club.
+
+        Members only see the other members, everyone else also sees the officers and the owner."""
+        users = User.objects.filter(id__in=self._get_listed_user_ids(members_only)).annotate(
+            role=self._get_role_in_club('id'),
+            elo=Coalesce(Subquery(self.has_elo_club.filter(user_id=OuterRef('id')).values('elo_rating')[:1]), 0))
+        if role:
+            users = users.filter(role=role)
+        if experience:
+            users = users.filter(chess_exp=experience)
+        return users
+
+    def get_rated_user_list(self, members_only=False, role=None, experience=None):
+        """Return the Elo ratings of the users listed by get_user_list, with the user joined in and their role
+        annotated, so that listing them by rating reads the (club, rating, user) index in order."""
+        # Filtering on the role of each rating, rather than on a list of users, keeps the database reading the
+        # ratings in index order and stopping once the page is full
+        roles = [ClubMembership.Role.MEMBER] if members_only else ["Owner", *ClubMembership.IN_CLUB_ROLES]
+        ratings = self.has_elo_club.select_related('user').annotate(role=self._get_role_in_club('user_id')).filter(
+            role__in=[listed_role for listed_role in roles if not role or listed_role == role])
+        if experience:
+            ratings = ratings.filter(user__chess_exp=experience)
+        return ratings
+
+    def _get_listed_user_ids(self, members_only):
+        if members_only:
+            return self.memberships.filter(role=ClubMembership.Role.MEMBER).values('user_id')
+        return self.get_all_users().values('id')
+
+    def _get_role_in_club(self, user_field):
+        """The role in the club of the user whose id is in the given field of the listed rows."""
+        return Case(When(**{user_field: self.owner_id}, then=Value("Owner")),
+                    default=Subquery(self.memberships.filter(user_id=OuterRef(user_field)).values('role')[:1]))
+
+
+def get_club_directory(user, search=None):
+    """Return the clubs with their owner and summary as one query, each annotated with the role of the user in it
+    and whether their application to it was rejected.
+
+    The search matches the start of the name or the location of a club, ignoring case, as a range over their
+    indexes."""
+    clubs = Club.objects.select_related('owner', 'summary').annotate(
+        membership=FilteredRelation('memberships', condition=Q(memberships__user=user)),
+        role=Case(When(owner=user, then=Value("Owner")), default=F('membership__role')),
+        application_rejected=Subquery(ClubApplication.objects.filter(
+            associated_club=OuterRef('id'), associated_user=user).order_by('-id').values('is_rejected')[:1]))
+    search = (search or "").strip().lower()
+    if search:
+        clubs = clubs.alias(search_name=Lower('name'), search_location=Lower('location')).filter(
+            Q(search_name__gte=search, search_name__lt=search + SEARCH_UPPER_BOUND) |
+            Q(search_location__gte=search, search_location__lt=search + SEARCH_UPPER_BOUND))
+    return clubs
+
+
+# Sorts after every character, so that a prefix and this character bound everything starting with the prefix
+SEARCH_UPPER_BOUND = '\U0010ffff'
+
+
+# The role of a user within a club. The owner is not stored here, it is kept on the club itself.
+class ClubMembership(models.Model):
+    class Role(models.TextChoices):
+        APPLICANT = 'Applicant'
+        MEMBER = 'Member'
+        OFFICER = 'Officer'
+
+    IN_CLUB_ROLES = [Role.MEMBER, Role.OFFICER]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='memberships')
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='memberships')
+    role = models.CharField(choices=Role.choices, max_length=9)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['club', 'user'], name='unique_club_membership'),
+        ]
+        indexes = [
+            models.Index(fields=['club', 'role']),
+            models.Index(fields=['user', 'role']),
+        ]
+
+
+# Counts and the mean Elo of a club, kept in one row so the club directory does not have to count anything.
+# The write paths that change memberships, ratings and tournaments add to it in the same transaction.
+class ClubSummary(models.Model):
+    club = models.OneToOneField(Club, on_delete=models.CASCADE, related_name="summary")
+    number_of_members = models.IntegerField(default=0)
+    number_of_officers = models.IntegerField(default=0)
+    number_of_applicants = models.IntegerField(default=0)
+    number_of_tournaments = models.IntegerField(default=0)
+    number_of_ratings = models.IntegerField(default=0)
+    elo_rating_total = models.BigIntegerField(default=0)
+
+    def get_average_elo(self):
+        if not self.number_of_ratings:
+            return 0
+        return round(self.elo_rating_total / self.number_of_ratings, 2)
+
+
+def update_club_summary(club_id, **changes):
+    """Add to the counters of a club summary with one UPDATE, recounting it if the club has no summary yet."""
+    if not ClubSummary.objects.filter(club_id=club_id).update(
+            **{counter: F(counter) + step for (counter, step) in changes.items()}):
+        Club.objects.get(id=club_id).refresh_summary()
+
+
+ELO_TREND_PERIOD = timedelta(days=30)
+
+
+def _get_elo_history_statistics(history, current_statistics):
+    """Peak and trough ratings ever reached, and the rating change and games played over the trend period."""
+    recent = Q(recorded_at__gte=timezone.now() - ELO_TREND_PERIOD)
+    statistics = history.aggregate(
+        peak=Max(Greatest('rating_before', 'rating_after')),
+        trough=Min(Least('rating_before', 'rating_after')),
+        trend=Sum(F('rating_after') - F('rating_before'), filter=recent),
+        recent_games=Count('match', distinct=True, filter=recent),
+    )
+    # Ratings that never changed have no history, so the current ratings also count towards the peak and the trough
+    peaks = [rating for rating in (statistics['peak'], current_statistics['highest']) if rating is not None]
+    troughs = [rating for rating in (statistics['trough'], current_statistics['lowest']) if rating is not None]
+    return {
+        'peak': max(peaks, default=0),
+        'trough': min(troughs, default=0),
+        'trend': statistics['trend'] or 0,
+        'recent_games': statistics['recent_games'],
+    }
 
 
 def toggle_superuser(user):
@@ -255,9 +484,26 @@ class ClubApplication(models.Model):
     associated_club = models.ForeignKey(Club, on_delete=models.CASCADE)
     associated_user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)  # wouldn't allow without null = true
     is_rejected = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # The inbox of the officers lists the open applications of their clubs, newest first
+        indexes = [
+            models.Index(fields=['associated_club', 'is_rejected', '-created_at', '-id']),
+        ]
+
+
+def get_application_inbox(club_ids):
+    """Return the open applications to the given clubs with their club and applicant, as one query."""
+    return ClubApplication.objects.filter(associated_club_id__in=club_ids, is_rejected=False).select_related(
+        'associated_club__summary', 'associated_user')
 
 
 class Tournament(models.Model):
+    class Format(models.TextChoices):
+        KNOCKOUT = 'knockout', 'Knockout'
+        SWISS = 'swiss', 'Swiss'
+
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="has_tournaments")
     name = models.CharField(unique=True, blank=False, max_length=50)
     description = models.CharField(blank=True, max_length=500)
@@ -266,21 +512,72 @@ class Tournament(models.Model):
     coorganisers = models.ManyToManyField(User, related_name="coorganises", blank=True)
     deadline = models.DateTimeField(blank=False)
     winner = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name="tournament_wins")
-    bye = models.ManyToManyField(User)
     round = models.IntegerField(default=1)
     group_phase = models.BooleanField(default=False)
     elimination_phase = models.BooleanField(default=True)
     is_final = models.BooleanField(default=False)
+    format = models.CharField(choices=Format.choices, default=Format.KNOCKOUT, max_length=8)
+    # Only used by Swiss tournaments, chosen from the number of participants when left empty
+    number_of_rounds = models.PositiveIntegerField(null=True, blank=True)
+    # The group stage of knockout tournaments, either a number of groups or the most players in a group
+    number_of_groups = models.PositiveIntegerField(null=True, blank=True, validators=[MinValueValidator(1)])
+    group_size = models.PositiveIntegerField(null=True, blank=True, validators=[MinValueValidator(2)])
+    qualifiers_per_group = models.PositiveIntegerField(default=2, validators=[MinValueValidator(1)])
+    # Pairings of the current round still waiting for a result
+    pending_pairings = models.PositiveIntegerField(default=0)
+    # Bumped by every change of state of the tournament, writing it is what locks the row
+    version = models.PositiveIntegerField(default=0)
 
     SIZE_OF_BRACKET = 16
     NUMBER_OF_GROUPS = int(SIZE_OF_BRACKET / 2)
+    # Without a group size, eight round robins grow with the square of the number of participants
+    MAX_KNOCKOUT_PARTICIPANTS = 96
+    # Only ever changed with update(), so that saving a stale copy of the tournament cannot undo changes made since
+    UPDATED_IN_PLACE = ('pending_pairings', 'version')
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if not adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in self.UPDATED_IN_PLACE]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                update_club_summary(self.club_id, number_of_tournaments=1)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            update_club_summary(self.club_id, number_of_tournaments=-1)
+        return deleted
 
     def get_number_of_participants(self):
         return self.participants.count()
 
+    def lock(self):
+        """Lock the row of the tournament until the end of the transaction and read its state afresh.
+
+        The lock is taken by writing the version, which works the same on every database. Requests changing the same
+        tournament wait for each other, while other tournaments are not held up."""
+        Tournament.objects.filter(id=self.id).update(version=F('version') + 1)
+        self.refresh_from_db(fields=['version', 'round', 'is_final', 'group_phase', 'elimination_phase', 'winner',
+                                     'pending_pairings'])
+
+    @transaction.atomic
     def create_initial_pairings(self):
+        self.lock()
+        if self.pairings_within.exists():
+            # Someone else created them first
+            return []
         self.round = 0
-        if self.participants.count() > self.SIZE_OF_BRACKET:
+        if self.format == self.Format.SWISS:
+            self.round += 1
+            self.elimination_phase = False
+            if not self.number_of_rounds:
+                self.number_of_rounds = swiss.default_number_of_rounds(self.participants.count())
+            return self.create_swiss_pairings()
+        number_of_participants = self.participants.count()
+        if number_of_participants > self.get_number_of_groups(number_of_participants) * self.qualifiers_per_group:
             self.create_groups()
             self.group_phase = True
             self.elimination_phase = False
@@ -295,112 +592,430 @@ class Tournament(models.Model):
         if self.is_final:
             return []
 
-        if self.elimination_phase:
-            previous_pairings = self.pairings_within.all().filter(round=self.round - 1)
-            players = []
-            for pairing in previous_pairings:
-                match = Match.objects.get(pairing=pairing)
-                players.append(match.winner)
-            players = players + list(self.bye.all())
-            self.bye.set([])
+        if self.format == self.Format.SWISS:
+            return self.create_swiss_pairings()
 
-            return self.create_bracket_pairings(players)
+        if self.elimination_phase:
+            # The winners were already moved into these pairings as their results were recorded
+            pairings = list(self.pairings_within.filter(round=self.round).select_related(
+                'white_player', 'black_player').order_by('id'))
+            self.is_final = len(pairings) == 1 and pairings[0].parent_id is None
+            self.save()
+            self.start_round(pairings)
+            return pairings
 
-        pairings = []
         if self.group_phase:
-            for group in self.groups_within.all():
-                self.group_phase = False
-                new_pairings = group.get_next_pairings()
-                if new_pairings is not None:
-                    pairings += new_pairings
-                    self.group_phase = True
+            # Every round of every group was scheduled when the groups were created
+            pairings = list(self.pairings_within.filter(round=self.round).select_related(
+                'white_player', 'black_player').order_by('id'))
             if len(pairings) > 0:
+                self.save()
+                self.start_round(pairings)
                 return pairings
+            self.group_phase = False
 
         self.elimination_phase = True
-        players = []
-        for group in self.groups_within.all():
-            players += group.get_top_seeds()
+        # Group winners meet the runners-up of the groups at the other end of the draw, and so on down the tiers
+        qualifiers = self.get_group_qualifiers()
+        seeds = [group[tier] for tier in range(0, self.qualifiers_per_group)
+                 for group in qualifiers if tier < len(group)]
         ordering = []
-        for i in range(0, self.NUMBER_OF_GROUPS):
-            ordering.append((players[2 * i], players[self.SIZE_OF_BRACKET - 1 - 2 * i]))
-        pairings = self.create_bracket_pairings(players, ordering=ordering)
+        for i in range(0, len(seeds) // 2):
+            ordering.append((seeds[i], seeds[len(seeds) - 1 - i]))
+        pairings = self.create_bracket_pairings(seeds, ordering=ordering)
         return pairings
 
+    def get_number_of_groups(self, number_of_participants):
+        if self.number_of_groups:
+            return self.number_of_groups
+        if self.group_size:
+            return ceil(number_of_participants / self.group_size)
+        return self.NUMBER_OF_GROUPS
+
+    def get_group_qualifiers(self):
+        """Return the players who qualify from each group, best first, with one ordered query."""
+        qualifiers = {}
+        for standing in self.get_group_standings():
+            group = qualifiers.setdefault(standing.group_id, [])
+            if len(group) < self.qualifiers_per_group:
+                group.append(standing.player)
+        return list(qualifiers.values())
+
+    def get_group_standings(self):
+        """Return the standings of every group in order of group number, each group ranked with its tie-breaks."""
+        groups = {}
+        for standing in GroupStanding.objects.filter(group__tournament=self).select_related('player', 'group').order_by(
+                'group__group_number'):
+            groups.setdefault(standing.group_id, []).append(standing)
+        results = {}
+        for (group_id, *result) in self.pairings_within.filter(
+                group_in_which_the_paring_takes_place__isnull=False, match__isnull=False).values_list(
+                'group_in_which_the_paring_takes_place', 'white_player_id', 'black_player_id', 'match__winner_id',
+                'match__is_draw'):
+            results.setdefault(group_id, []).append(result)
+        return [standing for (group_id, standings) in groups.items()
+                for standing in rank_group_standings(standings, results.get(group_id, []))]
+
     def create_groups(self):
+        """Create the groups with every pairing of their round robins, with a fixed number of queries."""
         participant_list = list(self.participants.all())
-        for i in range(0, self.NUMBER_OF_GROUPS):
-            group = Group.objects.create(
-                tournament=self,
-                group_number=i
-            )
-            group.save()
-
-        # This method is more evenly spread than just taking the first however many users
-        # because the last group could be way smaller. Here the difference is at most 1
-        for i in range(0, len(participant_list)):
-            group = self.groups_within.get(group_number=i % self.NUMBER_OF_GROUPS, tournament=self)
-            group.participants.add(participant_list[i])
-            group.save()
+        number_of_groups = min(self.get_number_of_groups(len(participant_list)), len(participant_list))
+        with transaction.atomic():
+            Group.objects.bulk_create(
+                [Group(tournament=self, group_number=i) for i in range(0, number_of_groups)])
+            groups = list(self.groups_within.order_by('group_number'))
+
+            # This method is more evenly spread than just taking the first however many users
+            # because the last group could be way smaller. Here the difference is at most 1
+            group_players = [participant_list[i::number_of_groups] for i in range(0, number_of_groups)]
+            Group.participants.through.objects.bulk_create(
+                [Group.participants.through(group_id=group.id, user_id=player.id)
+                 for (group, players) in zip(groups, group_players) for player in players])
+            GroupStanding.objects.bulk_create(
+                [GroupStanding(group_id=group.id, player_id=player.id)
+                 for (group, players) in zip(groups, group_players) for player in players])
+
+            group_pairings = []
+            for (group, players) in zip(groups, group_players):
+                (_, pairings) = group.schedule_all_pairs(players)
+                group_pairings.append((group, pairings))
+            bulk_create_pairings([pairing for (_, pairings) in group_pairings for pairing in pairings])
+            Group.pairings.through.objects.bulk_create(
+                [Group.pairings.through(group_id=group.id, pairing_id=pairing.id)
+                 for (group, pairings) in group_pairings for pairing in pairings])
 
     def create_bracket_pairings(self, participants, ordering=None):
-        self.is_final = False
-        if len(participants) % 2 == 1:
-            self.bye.add(participants[-1])
-            participants = participants[0: len(participants) - 1]
+        """Create the whole knockout bracket as a tree of pairings and return the pairings of its first round.
 
+        Every pairing after the first round points to the pairing its winner moves on to, and the side it plays
+        there. A player left over in a round with an odd number of players gets a bye to the end of the next
+        round, so their slot is filled straight away."""
         if ordering is None:
             ordering = []
-            for i in range(0, len(participants), 2):
+            for i in range(0, len(participants) - 1, 2):
                 ordering.append((participants[i], participants[i + 1]))
+        paired = {player for pair in ordering for player in pair}
+        byes = [player for player in participants if player not in paired]
 
         pairings = []
         for pair in ordering:
             if pair[1] is not None and pair[0] is not None:
-                pairing = Pairing.objects.create(
+                pairings.append(Pairing(
                     tournament=self,
                     white_player=pair[0],
                     black_player=pair[1],
                     round=self.round
-                )
-                pairing.save()
-                pairings.append(pairing)
-
-        if len(pairings) == 1 and self.bye.count() == 0:
-            self.is_final = True
+                ))
+
+        # Pairings stand for their winners, users are players who already know they are in the next round
+        entrants = pairings + byes
+        bracket = list(pairings)
+        feeders = []
+        round_number = self.round
+        while len(entrants) > 1:
+            round_number += 1
+            next_entrants = []
+            for i in range(0, len(entrants) - 1, 2):
+                pairing = Pairing(tournament=self, round=round_number)
+                for (entrant, side) in ((entrants[i], Pairing.Side.WHITE), (entrants[i + 1], Pairing.Side.BLACK)):
+                    if isinstance(entrant, User):
+                        setattr(pairing, f'{side}_player', entrant)
+                    else:
+                        entrant.side = side
+                        feeders.append((entrant, pairing))
+                bracket.append(pairing)
+                next_entrants.append(pairing)
+            if len(entrants) % 2 == 1:
+                next_entrants.append(entrants[-1])
+            entrants = next_entrants
+
+        with transaction.atomic():
+            bulk_create_pairings(bracket)
+            for (pairing, parent) in feeders:
+                pairing.parent_id = parent.id
+            Pairing.objects.bulk_update([pairing for (pairing, _) in feeders], ['parent', 'side'])
+
+            self.is_final = len(pairings) == 1 and not feeders
+            self.save()
+            self.start_round(pairings)
 
-        self.save()
+        return pairings
 
+    def create_swiss_pairings(self):
+        """Pair the current round of a Swiss tournament from the results of the rounds before it."""
+        players = list(self.participants.values_list('id', flat=True))
+        ratings = dict(EloRating.objects.filter(club_id=self.club_id, user_id__in=players).values_list(
+            'user_id', 'elo_rating'))
+        (scores, colours, opponents, byes) = self.get_swiss_history()
+        (pairs, bye) = swiss.pair_round(players, scores, ratings, colours, opponents, byes)
+
+        pairings = [Pairing(tournament=self, white_player_id=white, black_player_id=black, round=self.round)
+                    for (white, black) in pairs]
+        if bye is not None:
+            # A bye is a pairing without a black player, it counts as a win and is never played
+            pairings.append(Pairing(tournament=self, white_player_id=bye, round=self.round))
+        with transaction.atomic():
+            bulk_create_pairings(pairings)
+            self.is_final = self.round >= self.number_of_rounds
+            self.save()
+            pairings = [pairing for pairing in pairings if pairing.black_player_id is not None]
+            self.start_round(pairings)
         return pairings
 
+    def get_swiss_history(self):
+        """Return the scores, colours played, opponents met and byes received of the players so far."""
+        scores = {}
+        colours = {}
+        opponents = {}
+        byes = set()
+        results = self.pairings_within.order_by('round', 'id').values_list(
+            'white_player_id', 'black_player_id', 'match__winner_id', 'match__is_draw')
+        for (white, black, winner, is_draw) in results:
+            if black is None:
+                byes.add(white)
+                scores[white] = scores.get(white, 0) + 1
+                continue
+            colours.setdefault(white, []).append(swiss.WHITE)
+            colours.setdefault(black, []).append(swiss.BLACK)
+            opponents.setdefault(white, set()).add(black)
+            opponents.setdefault(black, set()).add(white)
+            if is_draw:
+                scores[white] = scores.get(white, 0) + 0.5
+                scores[black] = scores.get(black, 0) + 0.5
+            elif winner is not None:
+                scores[winner] = scores.get(winner, 0) + 1
+        return scores, colours, opponents, byes
+
+    def get_swiss_standings(self):
+        """Return every participant with their tie-break scores, best first."""
+        players = {player.id: player for player in self.participants.all()}
+        results = []
+        byes = {}
+        for (white, black, winner, is_draw) in self.pairings_within.filter(
+                Q(match__isnull=False) | Q(black_player__isnull=True)).values_list(
+                'white_player_id', 'black_player_id', 'match__winner_id', 'match__is_draw'):
+            if black is None:
+                byes[white] = byes.get(white, 0) + 1
+            else:
+                results.append((white, black, white_score(white, winner, is_draw)))
+        ranking = tiebreaks.rank_players(players, results, tiebreaks.SWISS_TIEBREAKS, extra_points=byes)
+        return [(players[player], scores) for (player, scores) in ranking]
+
+    def decide_winner(self, last_match):
+        if self.format == self.Format.SWISS:
+            return self.get_swiss_standings()[0][0]
+        return last_match.winner
+
+    def is_organised_by(self, user):
+        """Whether the user runs the tournament, as its organiser or as one of its coorganisers."""
+        return user.id == self.organiser_id or self.coorganisers.filter(id=user.id).exists()
+
+    def is_full(self):
+        return (self.format == self.Format.KNOCKOUT and not self.group_size
+                and self.participants.count() >= self.MAX_KNOCKOUT_PARTICIPANTS)
+
+    def get_bracket(self):
+        """Return the knockout bracket as a list of rounds of pairings, with one query."""
+        if self.format == self.Format.SWISS:
+            return []
+        bracket = {}
+        pairings = self.pairings_within.filter(group_in_which_the_paring_takes_place__isnull=True).select_related(
+            'white_player', 'black_player').annotate(winner_id=F('match__winner_id')).order_by('round', 'id')
+        for pairing in pairings:
+            bracket.setdefault(pairing.round, []).append(pairing)
+        return list(bracket.values())
+
+    def get_open_pairings(self):
+        return self.pairings_within.filter(round__lte=self.round, white_player__isnull=False,
+                                           black_player__isnull=False, match__isnull=True).select_related(
+            'white_player', 'black_player').order_by('round', 'id')
+
     def get_all_matches(self):
         return list(Match.objects.filter(pairing__in=self.pairings_within.all()))
 
+    def start_round(self, pairings):
+        """Start counting off the results of the pairings of the current round."""
+        self.pending_pairings = len(pairings)
+        Tournament.objects.filter(id=self.id).update(pending_pairings=self.pending_pairings)
+
     def all_pairings_completed(self):
-        if self.pairings_within.count() > 0:
-            for pairing in self.pairings_within.all():
-                if not pairing.match_exists():
-                    return False
-            return True
+        """Whether every pairing of the current round has its result, with a single lookup of the tournament."""
+        # Results may have come in since this copy of the tournament was read
+        (self.pending_pairings, started) = Tournament.objects.filter(id=self.id).values_list(
+            'pending_pairings', Exists(Pairing.objects.filter(tournament=OuterRef('id')))).get()
+        return started and self.pending_pairings == 0
+
+    def advance_round(self, last_match):
+        """Pair the next round once every result of this one is in, or name the winner after the last round."""
+        with transaction.atomic():
+            # Of several requests completing the round at once, only the first to get the lock moves it on
+            self.lock()
+            if self.winner_id or not self.all_pairings_completed():
+                return
+            if not self.is_final:
+                self.next_pairings()
+            else:
+                self.set_winner(self.decide_winner(last_match))
+                self.save()
+                self.freeze()
+
+    def freeze(self):
+        """Keep the page of the completed tournament as a snapshot, which is never changed afterwards."""
+        TournamentSnapshot.objects.get_or_create(tournament=self, defaults={'data': self.get_page_data()})
+
+    def get_page_data(self):
+        """Return what the page of the tournament shows to every viewer, as plain data that can be stored as JSON.
+
+        The number of queries is the same however many participants, pairings and matches there are."""
+        def player(user):
+            return {'id': user.id, 'name': user.full_name()} if user else None
+
+        participants = list(self.participants.order_by('id'))
+        mean_elos = dict(EloRating.objects.filter(user__in=participants + [self.organiser]).values(
+            'user_id').annotate(mean=Avg('elo_rating')).values_list('user_id', 'mean'))
+        matches = Match.objects.filter(pairing__tournament=self).select_related(
+            'pairing__white_player', 'pairing__black_player').order_by('pairing__round', 'id')
+        groups = {}
+        for standing in self.get_group_standings():
+            groups.setdefault(standing.group.group_number, []).append({
+                'player': player(standing.player), 'wins': standing.wins, 'draws': standing.draws,
+                'losses': standing.losses, 'points': standing.points,
+                'sonneborn_berger': standing.tiebreaks.sonneborn_berger})
+        if self.format == self.Format.SWISS and self.pairings_within.exists():
+            swiss_standings = [dict(player=player(user), **scores._asdict())
+                               for (user, scores) in self.get_swiss_standings()]
         else:
-            return False
+            swiss_standings = []
+        return {
+            'tournament': {'id': self.id, 'name': self.name, 'description': self.description, 'format': self.format,
+                           'round': self.round, 'qualifiers_per_group': self.qualifiers_per_group,
+                           'deadline': self.deadline.isoformat(), 'winner': player(self.winner)},
+            'organiser': dict(player(self.organiser), gravatar=self.organiser.mini_gravatar(),
+                              bio=self.organiser.bio, chess_exp=self.organiser.chess_exp,
+                              tournaments_organised=self.organiser.organises.count(),
+                              tournaments_won=self.organiser.get_number_of_tournaments_won(),
+                              mean_elo=round(mean_elos.get(self.organiser.id) or 0, 2)),
+            'club': {'id': self.club.id, 'name': self.club.name, 'description': self.club.description,
+                     'location': self.club.location, 'tournaments': self.club.get_number_of_tournaments(),
+                     'members': self.club.get_all_users().count()},
+            'coorganisers': [player(user) for user in self.coorganisers.all()],
+            'participants': [dict(player(user), gravatar=user.mini_gravatar(), chess_exp=user.chess_exp,
+                                  mean_elo=round(mean_elos.get(user.id) or 0, 2)) for user in participants],
+            'matches': [{'round': match.pairing.round, 'white': player(match.pairing.white_player),
+                         'black': player(match.pairing.black_player), 'winner': match.winner_id,
+                         'loser': match.loser_id, 'is_draw': match.is_draw} for match in matches],
+            'swiss_standings': swiss_standings,
+            'groups': [{'number': number + 1, 'standings': standings} for (number, standings) in groups.items()],
+            'bracket': [[{'white': player(pairing.white_player), 'black': player(pairing.black_player),
+                          'winner': pairing.winner_id} for pairing in pairings] for pairings in self.get_bracket()],
+        }
+
+    def record_round_results(self, results):
+        """Record results of the current round at once and move the tournament on if that completes the round.
+
+        results are (pairing id, winner id) pairs, with no winner for a draw. Every result is checked before any is
+        recorded, so a ValueError leaves the tournament as it was. The matches are inserted, counted and rated in
+        bulk, with a number of queries that does not grow with the number of results. Returns the new matches."""
+        results = list(results)
+        winners = dict(results)
+        if not results or len(winners) != len(results):
+            raise ValueError("Each pairing must be given exactly one result")
+        with transaction.atomic():
+            # Results sent twice at once are checked one after the other, so the second finds the pairings taken
+            self.lock()
+            pairings = {pairing.id: pairing for pairing in self.get_open_pairings().filter(
+                round=self.round, id__in=list(winners))}
+            matches = []
+            for (pairing_id, winner_id) in results:
+                pairing = pairings.get(pairing_id)
+                if pairing is None:
+                    raise ValueError(f"Pairing {pairing_id} is not waiting for a result in this round")
+                if winner_id is not None:
+                    if winner_id not in (pairing.white_player_id, pairing.black_player_id):
+                        raise ValueError(f"Player {winner_id} does not play in pairing {pairing_id}")
+                    loser_id = pairing.black_player_id if winner_id == pairing.white_player_id \
+                        else pairing.white_player_id
+                    matches.append(Match(pairing=pairing, winner_id=winner_id, loser_id=loser_id, is_draw=False))
+                elif self.elimination_phase:
+                    # A simplified view - if the match is a draw, the arbiter flips a coin
+                    (winner_id, loser_id) = random.sample([pairing.white_player_id, pairing.black_player_id], 2)
+                    matches.append(Match(pairing=pairing, winner_id=winner_id, loser_id=loser_id, is_draw=True))
+                else:
+                    matches.append(Match(pairing=pairing, is_draw=True))
+
+            Match.objects.bulk_create(matches)
+            if matches[0].id is None:
+                # SQLite does not return the ids of the inserted rows, each pairing has a single match
+                ids = dict(Match.objects.filter(pairing_id__in=list(pairings)).values_list('pairing_id', 'id'))
+                for match in matches:
+                    match.id = ids[match.pairing_id]
+                    match._state.adding = False
+            Tournament.objects.filter(id=self.id, round=self.round).update(
+                pending_pairings=Greatest(F('pending_pairings') - len(matches), 0))
+
+            advance_winners(matches)
+            add_group_results(matches)
+            counters = {}
+            for match in matches:
+                (white_id, black_id) = (match.pairing.white_player_id, match.pairing.black_player_id)
+                if match.is_draw:
+                    outcomes = ((white_id, 'matches_drawn'), (black_id, 'matches_drawn'))
+                else:
+                    outcomes = ((match.winner_id, 'matches_won'), (match.loser_id, 'matches_lost'))
+                for (user_id, counter) in outcomes:
+                    user_counters = counters.setdefault(user_id, {'matches_played': 0})
+                    user_counters['matches_played'] += 1
+                    user_counters[counter] = user_counters.get(counter, 0) + 1
+            # Users with the same changes are counted with one UPDATE, a round has at most a handful of distinct ones
+            same_changes = {}
+            for (user_id, user_counters) in counters.items():
+                same_changes.setdefault(tuple(sorted(user_counters.items())), []).append(user_id)
+            for (changes, user_ids) in same_changes.items():
+                update_user_stats(self.club_id, user_ids, **dict(changes))
+
+            engine = self.club.get_rating_engine()
+            if engine.rates_each_match:
+                update_ratings(self.club_id, engine, [
+                    (match.id, match.pairing.white_player_id, match.pairing.black_player_id,
+                     white_score(match.pairing.white_player_id, match.winner_id, match.is_draw))
+                    for match in matches])
+            else:
+                rate_round(self.club_id, engine, self.id, self.round)
+
+            self.advance_round(matches[-1])
+        return matches
 
     def set_winner(self, winner):
+        if self.winner_id == winner.id:
+            return
+        with transaction.atomic():
+            participant_ids = list(self.participants.values_list('id', flat=True))
+            if self.winner_id:
+                self._count_outcome(participant_ids, self.winner_id, -1)
+            self._count_outcome(participant_ids, winner.id, 1)
         self.winner = winner
 
+    def _count_outcome(self, participant_ids, winner_id, step):
+        update_user_stats(self.club_id, [winner_id], tournaments_won=step)
+        update_user_stats(self.club_id, [user_id for user_id in participant_ids if user_id != winner_id],
+                          tournaments_lost=step)
+
     def make_participant(self, user):
-        if user not in self.participants.all():
+        with transaction.atomic():
+            # Concurrent joins are counted one after the other, so they cannot go over capacity
+            self.lock()
+            if self.participants.filter(id=user.id).exists() or self.is_full():
+                raise ValueError
             self.participants.add(user)
-            self.save()
-        else:
-            raise ValueError
+            update_user_stats(self.club_id, [user.id], tournaments_participated_in=1)
 
     def remove_participant(self, user):
-        if user in self.participants.all():
+        with transaction.atomic():
+            self.lock()
+            if not self.participants.filter(id=user.id).exists():
+                raise ValueError
             self.participants.remove(user)
-            self.save()
-        else:
-            raise ValueError
+            update_user_stats(self.club_id, [user.id], tournaments_participated_in=-1)
 
     def get_all_participants(self):
         return self.participants.all()
@@ -410,18 +1025,26 @@ class Tournament(models.Model):
             return "Completed"
         elif self.deadline < make_aware(datetime.now()):
             return f"Round {self.round}"
-        elif self.participants.count() > 95:
+        elif self.is_full():
             return "Applications full"
         else:
             return "Taking applications"
 
 
 class Pairing(models.Model):
+    class Side(models.TextChoices):
+        WHITE = 'white'
+        BLACK = 'black'
+
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="pairings_within")
-    white_player = models.ForeignKey(User, on_delete=models.CASCADE, related_name="plays_white_in")
-    black_player = models.ForeignKey(User, on_delete=models.CASCADE, related_name="plays_black_in")
+    # The players of a later round of the bracket are only known once the pairings before it are played
+    white_player = models.ForeignKey(User, on_delete=models.CASCADE, related_name="plays_white_in", null=True)
+    black_player = models.ForeignKey(User, on_delete=models.CASCADE, related_name="plays_black_in", null=True)
 
     round = models.IntegerField(blank=False)
+    # The pairing of the bracket the winner moves on to, and the side they play there
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name="children")
+    side = models.CharField(choices=Side.choices, max_length=5, blank=True)
 
     def get_other_player(self, player):
         if player == self.white_player:
@@ -429,71 +1052,162 @@ class Pairing(models.Model):
         else:
             return self.white_player
 
+    def get_other_player_id(self, player):
+        if player.id == self.white_player_id:
+            return self.black_player_id
+        else:
+            return self.white_player_id
+
     def match_exists(self):
         return Match.objects.filter(pairing=self)
 
+    def advance_winner(self, winner_id):
+        if self.parent_id:
+            Pairing.objects.filter(id=self.parent_id).update(**{f'{self.side}_player_id': winner_id})
+
+
+def advance_winners(matches):
+    """Move the winners of the matches into the pairings they play next, with one query per bracket round."""
+    moves = [(match.pairing, match.winner_id) for match in matches if match.winner_id and match.pairing.parent_id]
+    if not moves:
+        return
+    parents = Pairing.objects.in_bulk([pairing.parent_id for (pairing, _) in moves])
+    for (pairing, winner_id) in moves:
+        setattr(parents[pairing.parent_id], f'{pairing.side}_player_id', winner_id)
+    Pairing.objects.bulk_update(list(parents.values()), ['white_player', 'black_player'])
+
+
+def bulk_create_pairings(pairings):
+    """Insert the pairings of one tournament with bulk_create and set their ids."""
+    Pairing.objects.bulk_create(pairings)
+    if pairings and pairings[0].id is None:
+        # SQLite does not return the ids of the inserted rows, they are the latest ones of the tournament
+        ids = Pairing.objects.filter(tournament_id=pairings[0].tournament_id).order_by('-id').values_list(
+            'id', flat=True)[:len(pairings)]
+        for (pairing, pairing_id) in zip(pairings, reversed(list(ids))):
+            pairing.id = pairing_id
+            pairing._state.adding = False
+
 
 def pairing_to_match_elimination_phase(pairing, winner=None):
     if winner:
-        win_scenario = Match.objects.create(
-            pairing=pairing,
-            winner=winner,
-            loser=pairing.get_other_player(winner),
-            is_draw=False
-        )
-        win_scenario.set_winner()
-        win_scenario.save()
-        return win_scenario
+        return _record_win(pairing, winner)
     else:
         # A simplified view - if the match is a draw, the arbiter flips a coin
         if random.randint(0, 1) > 0:
+            coin_flip_winner, coin_flip_loser = pairing.white_player_id, pairing.black_player_id
+        else:
+            coin_flip_winner, coin_flip_loser = pairing.black_player_id, pairing.white_player_id
+        with transaction.atomic():
             draw_scenario = Match.objects.create(
                 pairing=pairing,
-                winner=pairing.white_player,
-                loser=pairing.black_player,
+                winner_id=coin_flip_winner,
+                loser_id=coin_flip_loser,
                 is_draw=True
             )
             draw_scenario.set_draw()
-            draw_scenario.save()
-            return draw_scenario
-        else:
+        return draw_scenario
+
+
+def pairing_to_match_group_phase(pairing, winner=None):
+    if winner:
+        return _record_win(pairing, winner)
+    else:
+        with transaction.atomic():
             draw_scenario = Match.objects.create(
                 pairing=pairing,
-                winner=pairing.black_player,
-                loser=pairing.white_player,
                 is_draw=True
             )
             draw_scenario.set_draw()
-            draw_scenario.save()
-            return draw_scenario
+        return draw_scenario
 
 
-def pairing_to_match_group_phase(pairing, winner=None):
-    if winner:
+def _record_win(pairing, winner):
+    with transaction.atomic():
         win_scenario = Match.objects.create(
             pairing=pairing,
             winner=winner,
-            loser=pairing.get_other_player(winner),
+            loser_id=pairing.get_other_player_id(winner),
             is_draw=False
         )
         win_scenario.set_winner()
-        win_scenario.save()
-        return win_scenario
-
-    else:
-        draw_scenario = Match.objects.create(
-            pairing=pairing,
-            is_draw=True
+    return win_scenario
+
+
+def rate_round(club_id, engine, tournament_id, round):
+    """Rate every result of a round of a tournament as one period, once the last of them is in."""
+    round_pairings = Pairing.objects.filter(tournament_id=tournament_id, round=round, black_player__isnull=False)
+    if round_pairings.filter(match__isnull=True).exists():
+        return {}
+    results = Match.objects.filter(pairing__in=round_pairings).values_list(
+        'id', 'pairing__white_player_id', 'pairing__black_player_id', 'winner_id', 'is_draw')
+    return update_ratings(club_id, engine, [(match_id, white_id, black_id, white_score(white_id, winner_id, is_draw))
+                                            for (match_id, white_id, black_id, winner_id, is_draw) in results])
+
+
+def update_ratings(club_id, engine, results):
+    """Rate a period of results, given as (match id, white id, black id, white's score), in one transaction.
+
+    Returns the rating change of every player who played in the period."""
+    player_ids = {white_id for (_, white_id, _, _) in results} | {black_id for (_, _, black_id, _) in results}
+    with transaction.atomic():
+        # The rows are read once and locked, so two results for the same player cannot overwrite each other
+        elos = list(EloRating.objects.select_for_update().filter(club_id=club_id, user_id__in=player_ids))
+        index = {elo.user_id: i for (i, elo) in enumerate(elos)}
+        new_ratings, new_deviations, new_volatilities = engine.rate_period(
+            np.array([elo.elo_rating for elo in elos], dtype=np.float64),
+            np.array([elo.rating_deviation for elo in elos]),
+            np.array([elo.volatility for elo in elos]),
+            np.array([index[white_id] for (_, white_id, _, _) in results], dtype=np.int64),
+            np.array([index[black_id] for (_, _, black_id, _) in results], dtype=np.int64),
+            np.array([score for (_, _, _, score) in results], dtype=np.float64),
         )
-        draw_scenario.set_draw()
-        draw_scenario.save()
-        return draw_scenario
+
+        # The change over the period is recorded against the last match each player played in it
+        last_matches = {}
+        for (match_id, white_id, black_id, _) in results:
+            last_matches[white_id] = match_id
+            last_matches[black_id] = match_id
+
+        history = []
+        deltas = {}
+        changes = {}
+        for (i, elo) in enumerate(elos):
+            history.append(EloRatingHistory(club_id=club_id, user_id=elo.user_id, match_id=last_matches[elo.user_id],
+                                            rating_before=elo.elo_rating, rating_after=int(new_ratings[i])))
+            deltas[elo.user_id] = int(new_ratings[i]) - elo.elo_rating
+            changes[elo.user_id] = (elo.elo_rating, int(new_ratings[i]))
+            elo.elo_rating = int(new_ratings[i])
+            elo.rating_deviation = float(new_deviations[i])
+            elo.volatility = float(new_volatilities[i])
+        EloRating.objects.bulk_update(elos, ['elo_rating', 'rating_deviation', 'volatility'])
+        EloRatingHistory.objects.bulk_create(history)
+        update_leaderboard(club_id, changes)
+        if any(deltas.values()):
+            update_club_summary(club_id, elo_rating_total=sum(deltas.values()))
+
+    return deltas
 
 
 class EloRating(models.Model):
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="has_elo_club")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_elo')
     elo_rating = models.IntegerField()
+    rating_deviation = models.FloatField(default=INITIAL_RATING_DEVIATION)
+    volatility = models.FloatField(default=INITIAL_VOLATILITY)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['club', 'user']),
+            # The user list reads the ratings of a club best first from here, starting right at its cursor
+            models.Index(fields=['club', '-elo_rating', 'user']),
+        ]
+
+    def get_listed_user(self):
+        """The rated user, annotated like the users of Club.get_user_list."""
+        self.user.role = self.role
+        self.user.elo = self.elo_rating
+        return self.user
 
     def assign_elo(self, club, user, elo_rating):
         self.club = club
@@ -501,6 +1215,186 @@ class EloRating(models.Model):
         self.elo_rating = elo_rating
 
 
+# Every rating change is appended here and never updated, which gives each player a rating time series per club
+class EloRatingHistory(models.Model):
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="elo_history")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="elo_history")
+    match = models.ForeignKey("Match", on_delete=models.CASCADE, related_name="elo_changes")
+    rating_before = models.IntegerField()
+    rating_after = models.IntegerField()
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'club', 'recorded_at']),
+            models.Index(fields=['club', 'recorded_at']),
+        ]
+
+
+# Periods that move more players than this rebuild the whole leaderboard instead of moving them one by one
+LEADERBOARD_REBUILD_THRESHOLD = 32
+
+
+# The materialized leaderboard of every club, kept in step with EloRating. Players with the same rating share a
+# rank, the position breaks ties by user id so every player has a unique place to page by. The percentile is the
+# share of the club rated no higher than the player, so the top player is always at 100.
+class LeaderboardEntry(models.Model):
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="leaderboard")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    elo_rating = models.IntegerField()
+    rank = models.PositiveIntegerField()
+    position = models.PositiveIntegerField()
+    percentile = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['club', 'user'], name='unique_leaderboard_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['club', 'position']),
+            models.Index(fields=['club', 'elo_rating']),
+        ]
+
+
+def rebuild_leaderboard(club_id):
+    """Rebuild the leaderboard of a club from its elo ratings."""
+    # A player with more than one rating in the club is only listed with the highest of them
+    ratings = list(dict(reversed(EloRating.objects.filter(club_id=club_id).order_by('-elo_rating', 'user_id')
+                                 .values_list('user_id', 'elo_rating'))).items())
+    ratings.sort(key=lambda rating: (-rating[1], rating[0]))
+    number_of_players = len(ratings)
+    entries = []
+    rank = 0
+    previous_rating = None
+    for (position, (user_id, rating)) in enumerate(ratings, start=1):
+        if rating != previous_rating:
+            rank = position
+            previous_rating = rating
+        entries.append(LeaderboardEntry(club_id=club_id, user_id=user_id, elo_rating=rating, rank=rank,
+                                        position=position, percentile=_percentile(rank, number_of_players)))
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(club_id=club_id).delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+def update_leaderboard(club_id, changes):
+    """Apply rating changes, given as {user id: (old rating, new rating)}, to the leaderboard of a club.
+
+    The old rating is None for a player who joins and the new one is None for a player who leaves. Only the players
+    between the old and the new place of a moved player are touched."""
+    changes = {user_id: ratings for (user_id, ratings) in changes.items() if ratings[0] != ratings[1]}
+    if not changes:
+        return
+    if len(changes) > LEADERBOARD_REBUILD_THRESHOLD:
+        rebuild_leaderboard(club_id)
+        return
+
+    number_of_players = LeaderboardEntry.objects.filter(club_id=club_id).count()
+    for (user_id, (old_rating, new_rating)) in changes.items():
+        if old_rating is None:
+            number_of_players += 1
+        elif new_rating is None:
+            number_of_players -= 1
+        if number_of_players < 1 or not _move_on_leaderboard(club_id, user_id, old_rating, new_rating,
+                                                             number_of_players):
+            # The leaderboard was out of step with the ratings, so it is rebuilt from scratch
+            rebuild_leaderboard(club_id)
+            return
+        if old_rating is None or new_rating is None:
+            # Every percentile depends on the size of the club
+            LeaderboardEntry.objects.filter(club_id=club_id).update(
+                percentile=_percentile(F('rank'), number_of_players))
+
+
+def _move_on_leaderboard(club_id, user_id, old_rating, new_rating, number_of_players):
+    others = LeaderboardEntry.objects.filter(club_id=club_id).exclude(user_id=user_id)
+    if old_rating is None or (new_rating is not None and new_rating > old_rating):
+        step, higher_rating, lower_rating = 1, new_rating, old_rating
+    else:
+        step, higher_rating, lower_rating = -1, old_rating, new_rating
+
+    # The players the moved player passes, or who pass it, are the ones between its old and new place
+    passed_by_rank = Q(elo_rating__lt=higher_rating)
+    passed_by_position = _placed_behind(higher_rating, user_id)
+    if lower_rating is not None:
+        passed_by_rank &= Q(elo_rating__gte=lower_rating)
+        passed_by_position &= ~_placed_behind(lower_rating, user_id)
+    others.filter(passed_by_rank).update(rank=F('rank') + step,
+                                         percentile=_percentile(F('rank') + step, number_of_players))
+    others.filter(passed_by_position).update(position=F('position') + step)
+
+    if new_rating is None:
+        return LeaderboardEntry.objects.filter(club_id=club_id, user_id=user_id).delete()[0]
+    rank = others.filter(elo_rating__gt=new_rating).count() + 1
+    position = rank + others.filter(elo_rating=new_rating, user_id__lt=user_id).count()
+    entry = {'elo_rating': new_rating, 'rank': rank, 'position': position,
+             'percentile': _percentile(rank, number_of_players)}
+    if old_rating is None:
+        return LeaderboardEntry.objects.update_or_create(club_id=club_id, user_id=user_id, defaults=entry)[1]
+    return LeaderboardEntry.objects.filter(club_id=club_id, user_id=user_id).update(**entry)
+
+
+def _placed_behind(rating, user_id):
+    return Q(elo_rating__lt=rating) | Q(elo_rating=rating, user_id__gt=user_id)
+
+
+def _percentile(rank, number_of_players):
+    if isinstance(rank, int):
+        return 100 * (number_of_players + 1 - rank) / number_of_players
+    return ExpressionWrapper(Value(100.0) * (number_of_players + 1 - rank) / number_of_players,
+                             output_field=FloatField())
+
+
+# Counters of a user's matches and tournaments, kept per club and across all clubs (the row without a club).
+# They are updated as results are recorded, the recompute_user_stats command rebuilds them from scratch.
+class UserStats(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="stats")
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="user_stats", null=True, blank=True)
+    matches_played = models.IntegerField(default=0)
+    matches_won = models.IntegerField(default=0)
+    matches_lost = models.IntegerField(default=0)
+    matches_drawn = models.IntegerField(default=0)
+    tournaments_participated_in = models.IntegerField(default=0)
+    tournaments_won = models.IntegerField(default=0)
+    tournaments_lost = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'club'], name='unique_club_user_stats'),
+            models.UniqueConstraint(fields=['user'], condition=Q(club__isnull=True), name='unique_global_user_stats'),
+        ]
+
+    def get_number_of_tournaments_ongoing(self):
+        return self.tournaments_participated_in - self.tournaments_won - self.tournaments_lost
+
+
+def update_user_stats(club_id, user_ids, **counters):
+    """Add to the counters of the users, both in the club and across all clubs, with one UPDATE."""
+    if not user_ids:
+        return
+    UserStats.objects.bulk_create([UserStats(user_id=user_id, club_id=stats_club_id)
+                                   for user_id in user_ids for stats_club_id in (club_id, None)],
+                                  ignore_conflicts=True)
+    UserStats.objects.filter(Q(club_id=club_id) | Q(club__isnull=True), user_id__in=user_ids).update(
+        **{counter: F(counter) + step for (counter, step) in counters.items()})
+
+
+# The page of a completed tournament frozen as plain data, so it is shown with a single read
+class TournamentSnapshot(models.Model):
+    tournament = models.OneToOneField(Tournament, on_delete=models.CASCADE, primary_key=True, related_name="snapshot")
+    data = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+
+# The latest prediction of a knockout tournament, with the state of play it was worked out from
+class TournamentPrediction(models.Model):
+    tournament = models.OneToOneField(Tournament, on_delete=models.CASCADE, primary_key=True,
+                                      related_name="prediction")
+    state = models.CharField(max_length=100)
+    data = models.JSONField(null=True)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+
 class Group(models.Model):
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="groups_within")
     participants = models.ManyToManyField(User, related_name="participant_in_group")
@@ -509,11 +1403,20 @@ class Group(models.Model):
 
     def create_all_pairs(self):
         # Create the whole table of pairings for the group.
+        (pairs, pairings) = self.schedule_all_pairs(list(self.participants.all()))
+        with transaction.atomic():
+            bulk_create_pairings(pairings)
+            Group.pairings.through.objects.bulk_create(
+                [Group.pairings.through(group_id=self.id, pairing_id=pairing.id) for pairing in pairings])
+        return pairs
+
+    def schedule_all_pairs(self, player_list):
+        # Build the unsaved pairings of the whole round robin of the players, and the pairs of numbers they come from.
         # I'm using the Berger algorithm as described here
         # https://en.wikipedia.org/wiki/Round-robin_tournament#Scheduling_algorithm
         # I allocate each participant a number, corresponding to the index in the
         # participants field + 1
-        self.player_list = list(self.participants.all())
+        self.player_list = player_list
         participant_numbers = list(range(1, len(self.player_list) + 1))
         if len(participant_numbers) % 2 == 1:
             # we need to add a dummy participant
@@ -552,19 +1455,18 @@ class Group(models.Model):
                 new_row.append((int(new_first_num), int(new_second_num)))
             pairs.append(new_row)
 
+        pairings = []
         for i in range(0, len(pairs)):
             for pair in pairs[i]:
                 if len(self.player_list) % 2 == 0 or (pair[0] != n and pair[1] != n):
-                    pairing = Pairing.objects.create(
-                        tournament=self.tournament,
+                    pairings.append(Pairing(
+                        tournament_id=self.tournament_id,
                         white_player=self.player_list[pair[0] - 1],
                         black_player=self.player_list[pair[1] - 1],
                         round=i + 1
-                    )
-                    self.pairings.add(pairing)
-                    pairing.save()
+                    ))
 
-        return list(pairs)
+        return list(pairs), pairings
 
     def get_next_pairings(self):
         if self.pairings.count() == 0:
@@ -573,36 +1475,100 @@ class Group(models.Model):
             return None
         return self.pairings.filter(round=self.tournament.round)
 
-    def get_ranking(self):
-        players_and_points = {}
-        for player in self.participants.all():
-            players_and_points[player] = 0
-        for pairing in self.pairings.all():
-            match = Match.objects.get(pairing=pairing)
-            if match.is_draw:
-                players_and_points[pairing.white_player] += 0.5
-                players_and_points[pairing.black_player] += 0.5
-            else:
-                players_and_points[match.winner] += 1
-
-        return players_and_points
+    def get_standings(self):
+        standings = list(self.standings.select_related('player'))
+        if not standings:
+            # Groups filled in by hand instead of by Tournament.create_groups have no standings yet
+            self.refresh_standings()
+            standings = list(self.standings.select_related('player'))
+        results = self.pairings.filter(match__isnull=False).values_list(
+            'white_player_id', 'black_player_id', 'match__winner_id', 'match__is_draw')
+        return rank_group_standings(standings, results)
+
+    def refresh_standings(self):
+        results = {player_id: GroupStanding(group=self, player_id=player_id)
+                   for player_id in Group.participants.through.objects.filter(group=self).order_by('id').values_list(
+                       'user_id', flat=True)}
+        for (white, black, winner, is_draw) in self.pairings.filter(match__isnull=False).values_list(
+                'white_player_id', 'black_player_id', 'match__winner_id', 'match__is_draw'):
+            results[white].add_result(is_draw, winner == white)
+            results[black].add_result(is_draw, winner == black)
+        with transaction.atomic():
+            self.standings.all().delete()
+            GroupStanding.objects.bulk_create(results.values())
 
-    def get_top_seeds(self):
-        ranking = self.get_ranking()
-        max_score = 0
-        first_seed = list(self.participants.all())[0]
-        second_seed = list(self.participants.all())[1]
-        for (player, score) in ranking.items():
-            if score > max_score:
-                max_score = score
-                first_seed = player
-        max_score = 0
-        for (player, score) in ranking.items():
-            if score > max_score and player != first_seed:
-                max_score = score
-                second_seed = player
-
-        return [first_seed, second_seed]
+    def get_ranking(self):
+        return {standing.player: standing.points
+                for standing in sorted(self.get_standings(), key=lambda standing: standing.id)}
+
+    def get_top_seeds(self, count=2):
+        return [standing.player for standing in self.get_standings()[:count]]
+
+
+# The results of each player of a group, kept up to date as the matches of the group are recorded
+class GroupStanding(models.Model):
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name="standings")
+    player = models.ForeignKey(User, on_delete=models.CASCADE, related_name="group_standings")
+    points = models.FloatField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['group', 'player'], name='unique_group_standing')]
+        indexes = [models.Index(fields=['group', '-points'])]
+
+    def add_result(self, is_draw, won):
+        if is_draw:
+            self.points += 0.5
+            self.draws += 1
+        elif won:
+            self.points += 1
+            self.wins += 1
+        else:
+            self.losses += 1
+
+
+def rank_group_standings(standings, results):
+    """Order the standings of a group by points and the round robin tie-breaks, and give each its tie-break scores.
+
+    results are the (white, black, winner, is draw) of the matches played in the group."""
+    by_player = {standing.player_id: standing for standing in standings}
+    ranking = tiebreaks.rank_players(by_player, [(white, black, white_score(white, winner, is_draw))
+                                                 for (white, black, winner, is_draw) in results],
+                                     tiebreaks.ROUND_ROBIN_TIEBREAKS)
+    for (player, scores) in ranking:
+        by_player[player].tiebreaks = scores
+    return [by_player[player] for (player, _) in ranking]
+
+
+def update_group_standings(match):
+    """Add the result of a match to the standings of its group, knockout and Swiss matches have none."""
+    standings = GroupStanding.objects.filter(group__pairings=match.pairing_id)
+    if match.is_draw:
+        standings.filter(player_id__in=[match.pairing.white_player_id, match.pairing.black_player_id]).update(
+            points=F('points') + 0.5, draws=F('draws') + 1)
+    elif match.winner_id:
+        standings.filter(player_id=match.winner_id).update(points=F('points') + 1, wins=F('wins') + 1)
+        standings.filter(player_id=match.loser_id).update(losses=F('losses') + 1)
+
+
+def add_group_results(matches):
+    """Add the results of matches of one round to the standings of their groups, with a fixed number of queries."""
+    standings = {}
+    for standing in GroupStanding.objects.select_for_update().filter(
+            group__pairings__in=[match.pairing_id for match in matches]).distinct():
+        standings[(standing.group_id, standing.player_id)] = standing
+    if not standings:
+        return
+    # In one round every player plays once, in a single group
+    group_of = {player_id: group_id for (group_id, player_id) in standings}
+    for match in matches:
+        for player_id in (match.pairing.white_player_id, match.pairing.black_player_id):
+            standing = standings.get((group_of.get(player_id), player_id))
+            if standing is not None:
+                standing.add_result(match.is_draw, match.winner_id == player_id)
+    GroupStanding.objects.bulk_update(list(standings.values()), ['points', 'wins', 'draws', 'losses'])
 
 
 class Match(models.Model):
@@ -611,78 +1577,41 @@ class Match(models.Model):
     loser = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name="match_losses")
     is_draw = models.BooleanField(blank=True)
 
-    def set_winner(self):
-        winner_new_rating = self.set_elo_winner(self.winner, self.loser)
-        loser_new_rating = self.set_elo_loser(self.winner, self.loser)
-
-        w_user = User.objects.get(email=self.winner.email)
-        l_user = User.objects.get(email=self.loser.email)
-        m_club = Club.objects.get(id=self.pairing.tournament.club.id)
-
-        w_elo = EloRating.objects.get(user=w_user, club=m_club)
-        w_elo.elo_rating = winner_new_rating
-        w_elo.save()
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            if Match.objects.filter(pairing_id=self.pairing_id).exclude(id=self.id).exists():
+                # The pairing already had its result, this one must not count it off or move anyone on again
+                return
+            # Results of pairings outside the current round were already counted, or are not counted yet
+            Tournament.objects.filter(id=self.pairing.tournament_id, round=self.pairing.round,
+                                      pending_pairings__gt=0).update(pending_pairings=F('pending_pairings') - 1)
+            if self.winner_id:
+                self.pairing.advance_winner(self.winner_id)
+            update_group_standings(self)
 
-        l_elo = EloRating.objects.get(user=l_user, club=m_club)
-        l_elo.elo_rating = loser_new_rating
-        l_elo.save()
+    def set_winner(self):
+        return self._record(white_score(self.pairing.white_player_id, self.winner_id, False))
 
     def set_draw(self):
-        user_draw_black = self.pairing.black_player
-        user_draw_white = self.pairing.white_player
-
-        black_new_rating = self.set_elo_draw_black(user_draw_white, user_draw_black)
-        white_new_rating = self.set_elo_draw_white(user_draw_white, user_draw_black)
-
-        b_user = User.objects.get(email=self.pairing.black_player.email)
-        wh_user = User.objects.get(email=self.pairing.white_player.email)
-        m_club = Club.objects.get(id=self.pairing.tournament.club.id)
-
-        b_elo = EloRating.objects.get(user=b_user, club=m_club)
-        b_elo.elo_rating = black_new_rating
-        b_elo.save()
-
-        wh_elo = EloRating.objects.get(user=wh_user, club=m_club)
-        wh_elo.elo_rating = white_new_rating
-        wh_elo.save()
-
-    def get_elo_player(self, player):
-        t_user = User.objects.get(email=player.email)
-        m_club = Club.objects.get(id=self.pairing.tournament.club.id)
-        t_elo = EloRating.objects.get(user=t_user, club=m_club)
-        return t_elo.elo_rating
-
-    def expected_outcome(self, winner_user, loser_user):
-        current_elo_winner = self.get_elo_player(winner_user)
-        current_elo_loser = self.get_elo_player(loser_user)
-        exponent_calc = (current_elo_loser - current_elo_winner) / 400
-        expected_outcome = 1 / (1 + pow(10, exponent_calc))
-        return expected_outcome
-
-    def expected_outcome_alt(self, winner_user, loser_user):
-        expected_outcome = 1 - self.expected_outcome(winner_user, loser_user)
-        return expected_outcome
-
-    def set_elo_winner(self, winner_user, loser_user):
-        winner_current_elo = self.get_elo_player(winner_user)
-        expected_outcome_winner = self.expected_outcome(winner_user, loser_user)
-        winner_new_elo = winner_current_elo + 32 * (1 - expected_outcome_winner)
-        return winner_new_elo
-
-    def set_elo_loser(self, winner_user, loser_user):
-        loser_current_elo = self.get_elo_player(loser_user)
-        expected_outcome_loser = self.expected_outcome_alt(winner_user, loser_user)
-        loser_new_elo = loser_current_elo + 32 * (0 - expected_outcome_loser)
-        return loser_new_elo
-
-    def set_elo_draw_white(self, white_player, black_player):
-        white_current_elo = self.get_elo_player(white_player)
-        white_expected_outcome = self.expected_outcome(white_player, black_player)
-        white_new_elo = white_current_elo + 32 * (0.5 - white_expected_outcome)
-        return white_new_elo
-
-    def set_elo_draw_black(self, white_player, black_player):
-        black_current_elo = self.get_elo_player(black_player)
-        black_expected_outcome = self.expected_outcome_alt(white_player, black_player)
-        black_new_elo = black_current_elo + 32 * (0.5 - black_expected_outcome)
-        return black_new_elo
+        return self._record(0.5)
+
+    def _record(self, score):
+        club = Club.objects.only('rating_system').get(has_tournaments__pairings_within=self.pairing_id)
+        if self.is_draw:
+            update_user_stats(club.id, [self.pairing.white_player_id, self.pairing.black_player_id],
+                              matches_played=1, matches_drawn=1)
+        else:
+            update_user_stats(club.id, [self.winner_id], matches_played=1, matches_won=1)
+            update_user_stats(club.id, [self.loser_id], matches_played=1, matches_lost=1)
+        return self._rate(club, score)
+
+    def _rate(self, club, score):
+        engine = club.get_rating_engine()
+        if engine.rates_each_match:
+            return update_ratings(club.id, engine,
+                                  [(self.id, self.pairing.white_player_id, self.pairing.black_player_id, score)])
+
+        # Engines that rate whole periods wait for the last result of the round
+        return rate_round(club.id, engine, self.pairing.tournament_id, self.pairing.round)
@@ -0,0 +1,75 @@
+"""Keyset pagination: each page starts right after the sort key of the last row of the page before it, carried in
+an opaque cursor, so a page deep into a long list costs the same as the first one."""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    # Dates and times go in as ISO strings, which their fields read back in lookups
+    return urlsafe_b64encode(json.dumps(list(values), default=lambda value: value.isoformat()).encode()).decode()
+
+
+def decode_cursor(cursor, length):
+    """Return the values of the cursor, or None if it is missing or was not made by encode_cursor."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    return values
+
+
+def after(ordering, values):
+    """Return the condition for the rows that come after the given values of the fields of the ordering."""
+    condition = Q(pk__in=[])
+    equal = {}
+    for (field, value) in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    # The bound on the first field alone is implied, but it lets the database seek an index to the cursor
+    first = ordering[0]
+    return Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": values[0]}) & condition
+
+
+def convert_cursor(queryset, ordering, values):
+    """Return the values of a cursor as the types of the fields of the ordering, or None if any of them is not a
+    valid value of its field."""
+    if values is None:
+        return None
+    converted = []
+    for (field, value) in zip(ordering, values):
+        name = field.lstrip('-')
+        if name in queryset.query.annotations:
+            model_field = queryset.query.annotations[name].output_field
+        else:
+            model_field = queryset.model._meta.get_field(name)
+        try:
+            value = model_field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            return None
+        if value is None:
+            return None
+        converted.append(value)
+    return converted
+
+
+def keyset_page(queryset, ordering, cursor, size):
+    """Return a page of the queryset in the given ordering, which must end with a unique field, and the cursor of
+    the next page, or None on the last page. A single query fetches one row more than the page to tell.
+
+    A cursor that cannot be read is treated as missing, so the first page is returned."""
+    values = convert_cursor(queryset, ordering, decode_cursor(cursor, len(ordering)))
+    if values is not None:
+        queryset = queryset.filter(after(ordering, values))
+    rows = list(queryset.order_by(*ordering)[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(getattr(rows[-1], field.lstrip('-')) for field in ordering)
@@ -0,0 +1,310 @@
+"""Monte Carlo predictions of the outcome of knockout tournaments, from the Elo ratings of the players."""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import django
+import numpy as np
+from django.db.models import Count, Max
+from django.utils import timezone
+from .models import EloRating, Tournament, TournamentPrediction
+from .ratings import INITIAL_RATING
+
+DEFAULT_SIMULATIONS = 100000
+# Simulations are played this many at a time, which caps the memory a run needs whatever the number of simulations
+SIMULATION_CHUNK = 10000
+# Worker processes of the web server that work out predictions in the background
+PREDICTION_WORKERS = 2
+# Up to this many players, the chances of every possible game are worked out once and looked up
+LOOKUP_TABLE_PLAYERS = 2000
+
+
+def outcome_probabilities(white_ratings, black_ratings):
+    """The chances of a draw and of white winning a decisive game, with the model of the seed command: the stronger
+    the players, the likelier a draw."""
+    draw = np.clip((white_ratings + black_ratings) / 6000, 0, 1)
+    expected = 1 / (1 + 10 ** ((black_ratings - white_ratings) / 400))
+    return draw, expected
+
+
+def advance_probability(white_ratings, black_ratings):
+    """The chance that white goes through, a drawn knockout game is decided by a coin flip."""
+    (draw, expected) = outcome_probabilities(white_ratings, black_ratings)
+    return (1 - draw) * expected + draw / 2
+
+
+def simulate(model, simulations, seed=None):
+    """Play the rest of the tournament the given number of times, in chunks of simulations played all at once.
+
+    Returns how many times each player reached each round of the bracket, and won it, as an array with a row per
+    player and a column per round plus one for the winner."""
+    rng = np.random.default_rng(seed)
+    ratings = model['ratings']
+    n = len(ratings)
+    reached = np.zeros((n, model['number_of_rounds'] + 1))
+    if n <= LOOKUP_TABLE_PLAYERS:
+        table = advance_probability(ratings[:, np.newaxis], ratings[np.newaxis, :])
+    else:
+        table = None
+    for start in range(0, simulations, SIMULATION_CHUNK):
+        _simulate_chunk(model, min(SIMULATION_CHUNK, simulations - start), rng, table, reached)
+    return reached
+
+
+def _simulate_chunk(model, simulations, rng, table, reached):
+    ratings = model['ratings']
+    n = len(ratings)
+    seeds = _simulate_groups(model, simulations, rng) if model['groups'] else None
+
+    # Each node is played once by its parent, so its winners are let go of as soon as the parent has them
+    winners = {}
+    for (node, (round_index, white, black, winner)) in enumerate(model['nodes']):
+        (white, black) = (_entrants(source, winners, seeds, simulations) for source in (white, black))
+        reached[:, round_index] += np.bincount(white, minlength=n) + np.bincount(black, minlength=n)
+        if winner is not None:
+            winners[node] = np.full(simulations, winner)
+        else:
+            if table is not None:
+                chance = table[white, black]
+            else:
+                chance = advance_probability(ratings[white], ratings[black])
+            goes_through = rng.random(simulations) < chance
+            winners[node] = np.where(goes_through, white, black)
+    reached[:, -1] += np.bincount(winners.pop(len(model['nodes']) - 1), minlength=n)
+
+
+def _entrants(source, winners, seeds, simulations):
+    (kind, value) = source
+    if kind == 'node':
+        return winners.pop(value)
+    if kind == 'seed':
+        return seeds[:, value]
+    return np.full(simulations, value)
+
+
+def _simulate_groups(model, simulations, rng):
+    """Play the rest of every group and return the players on each seed of the bracket, one row per simulation."""
+    ratings = model['ratings']
+    seeds = np.empty((simulations, len(model['seeds'])), dtype=int)
+    for (group_index, (players, points, white, black)) in enumerate(model['groups']):
+        points = np.tile(points, (simulations, 1))
+        if len(white) > 0:
+            (draw, expected) = outcome_probabilities(ratings[players[white]], ratings[players[black]])
+            outcome = rng.random((simulations, len(white)))
+            white_points = np.where(outcome < draw, 0.5, np.where(outcome < draw + (1 - draw) * expected, 1.0, 0.0))
+            # Each game is a row of the incidence matrices, so players with several games add all of them up
+            games = np.arange(len(white))
+            white_games = np.zeros((len(white), len(players)))
+            white_games[games, white] = 1
+            black_games = np.zeros((len(white), len(players)))
+            black_games[games, black] = 1
+            points += white_points @ white_games + (1 - white_points) @ black_games
+        # Players level on points are ordered at random
+        ranking = np.lexsort((rng.random(points.shape), -points))
+        for (seed, (seed_group, tier)) in enumerate(model['seeds']):
+            if seed_group == group_index:
+                seeds[:, seed] = players[ranking[:, tier]]
+    return seeds
+
+
+def build_model(tournament):
+    """Describe what is left of the tournament as plain arrays, so it can be sent to worker processes."""
+    if tournament.elimination_phase:
+        players = {}
+        nodes = _bracket_nodes(tournament, players)
+        groups = []
+        seeds = []
+    else:
+        (players, groups, seeds) = _group_stage(tournament)
+        nodes = _seeded_bracket_nodes(len(seeds))
+    if not nodes:
+        return None
+    ratings = dict(EloRating.objects.filter(club_id=tournament.club_id, user_id__in=list(players)).values_list(
+        'user_id', 'elo_rating'))
+    return {
+        'players': list(players),
+        'ratings': np.array([ratings.get(player, INITIAL_RATING) for player in players], dtype=float),
+        'groups': groups,
+        'seeds': seeds,
+        'nodes': nodes,
+        'number_of_rounds': max(round_index for (round_index, _, _, _) in nodes) + 1,
+    }
+
+
+def _bracket_nodes(tournament, players):
+    bracket = [pairing for pairings in tournament.get_bracket() for pairing in pairings]
+    node_of = {pairing.id: node for (node, pairing) in enumerate(bracket)}
+    feeders = {(pairing.parent_id, pairing.side): node_of[pairing.id] for pairing in bracket}
+    first_round = bracket[0].round if bracket else 0
+
+    def source(pairing, side):
+        if (pairing.id, side) in feeders:
+            return ('node', feeders[(pairing.id, side)])
+        return ('player', players.setdefault(getattr(pairing, f'{side}_player_id'), len(players)))
+
+    nodes = []
+    for pairing in bracket:
+        white = source(pairing, 'white')
+        black = source(pairing, 'black')
+        winner = players.setdefault(pairing.winner_id, len(players)) if pairing.winner_id else None
+        nodes.append((pairing.round - first_round, white, black, winner))
+    return nodes
+
+
+def _group_stage(tournament):
+    players = {}
+    groups = {}
+    for standing in tournament.get_group_standings():
+        players.setdefault(standing.player_id, len(players))
+        groups.setdefault(standing.group_id, []).append(standing)
+    remaining = {}
+    for (group_id, white, black) in tournament.pairings_within.filter(match__isnull=True).values_list(
+            'group_in_which_the_paring_takes_place', 'white_player_id', 'black_player_id'):
+        remaining.setdefault(group_id, []).append((white, black))
+
+    model_groups = []
+    for (group_id, standings) in groups.items():
+        local = {standing.player_id: i for (i, standing) in enumerate(standings)}
+        games = remaining.get(group_id, [])
+        model_groups.append((
+            np.array([players[standing.player_id] for standing in standings]),
+            np.array([standing.points for standing in standings], dtype=float),
+            np.array([local[white] for (white, _) in games], dtype=int),
+            np.array([local[black] for (_, black) in games], dtype=int),
+        ))
+    seeds = [(group_index, tier) for tier in range(0, tournament.qualifiers_per_group)
+             for (group_index, standings) in enumerate(groups.values()) if tier < len(standings)]
+    return players, model_groups, seeds
+
+
+def _seeded_bracket_nodes(number_of_seeds):
+    """The bracket Tournament.create_bracket_pairings would build from the seeds."""
+    nodes = []
+    entrants = []
+    for i in range(0, number_of_seeds // 2):
+        nodes.append((0, ('seed', i), ('seed', number_of_seeds - 1 - i), None))
+        entrants.append(('node', len(nodes) - 1))
+    if number_of_seeds % 2 == 1:
+        entrants.append(('seed', number_of_seeds // 2))
+    round_index = 0
+    while len(entrants) > 1:
+        round_index += 1
+        next_entrants = []
+        for i in range(0, len(entrants) - 1, 2):
+            nodes.append((round_index, entrants[i], entrants[i + 1], None))
+            next_entrants.append(('node', len(nodes) - 1))
+        if len(entrants) % 2 == 1:
+            next_entrants.append(entrants[-1])
+        entrants = next_entrants
+    return nodes
+
+
+def run_simulations(model, simulations, workers=1, seed=None):
+    """Run the simulations, split between worker processes when more than one is asked for.
+
+    Only the predict_tournaments command asks for several, the background workers of requests run one each."""
+    if workers <= 1:
+        return simulate(model, simulations, seed)
+    chunks = [simulations // workers + (1 if i < simulations % workers else 0) for i in range(0, workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(simulate, [model] * workers, chunks, seeds))
+
+
+def round_names(number_of_rounds, nodes):
+    pairings_per_round = np.bincount([round_index for (round_index, _, _, _) in nodes], minlength=number_of_rounds)
+    names = []
+    for pairings in pairings_per_round:
+        if pairings == 1:
+            names.append("Final")
+        elif pairings == 2:
+            names.append("Semi-finals")
+        elif pairings == 4:
+            names.append("Quarter-finals")
+        else:
+            names.append(f"Round of {2 * pairings}")
+    return names + ["Winner"]
+
+
+def is_predicted(tournament):
+    return tournament.format == Tournament.Format.KNOCKOUT and not tournament.winner_id
+
+
+def prediction_state(tournament):
+    """What the prediction of a tournament depends on, it is out of date as soon as this changes."""
+    state = tournament.pairings_within.aggregate(pairings=Count('id'), matches=Count('match'),
+                                                 last_match=Max('match__id'))
+    return f"{tournament.round}:{state['pairings']}:{state['matches']}:{state['last_match']}"
+
+
+def predict_tournament(tournament, simulations=DEFAULT_SIMULATIONS, workers=1):
+    """Return the chance of each player reaching each round of a knockout tournament and winning it, best first, as
+    plain data, or None if there is nothing to predict."""
+    if not is_predicted(tournament) or not tournament.pairings_within.exists():
+        return None
+    model = build_model(tournament)
+    if model is None:
+        return None
+    reached = run_simulations(model, simulations, workers)
+    # Players on a bye into a later round were in the tournament for the rounds before it
+    chances = np.maximum.accumulate((reached / simulations)[:, ::-1], axis=1)[:, ::-1]
+    order = np.lexsort((-chances[:, :-1].sum(axis=1), -chances[:, -1]))
+    users = {user.id: user for user in tournament.participants.filter(id__in=model['players'])}
+    return {
+        'rounds': round_names(model['number_of_rounds'], model['nodes']),
+        'players': [{'id': model['players'][i], 'name': users[model['players'][i]].full_name(),
+                     'chances': [round(float(chance) * 100, 1) for chance in chances[i]]}
+                    for i in order if model['players'][i] in users],
+    }
+
+
+def get_prediction(tournament, simulations=DEFAULT_SIMULATIONS, workers=1):
+    """Return the stored prediction of the tournament, working it out again first if a result was recorded or the
+    tournament moved on a round since it was stored. Stored predictions are shared by every web worker."""
+    if not is_predicted(tournament):
+        return None
+    state = prediction_state(tournament)
+    stored = TournamentPrediction.objects.filter(tournament=tournament, state=state).values_list('data').first()
+    if stored is not None:
+        return stored[0]
+    data = predict_tournament(tournament, simulations, workers)
+    TournamentPrediction.objects.update_or_create(tournament=tournament, defaults={
+        'state': state, 'data': data, 'computed_at': timezone.now()})
+    return data
+
+
+def get_stored_prediction(tournament):
+    """Return the stored prediction of the tournament and whether a newer one is still being worked out.
+
+    It is never worked out here, an out of date one is handed to a worker process and is pending until stored."""
+    if not is_predicted(tournament):
+        return None, False
+    state = prediction_state(tournament)
+    stored = TournamentPrediction.objects.filter(tournament=tournament, state=state).values_list('data').first()
+    if stored is not None:
+        return stored[0], False
+    request_prediction(tournament.id, state)
+    return None, True
+
+
+_executor = None
+_requested = set()
+
+
+def request_prediction(tournament_id, state):
+    """Have a worker process work out and store the prediction of the tournament, once for each state of play."""
+    global _executor
+    if (tournament_id, state) in _requested:
+        return
+    if _executor is None:
+        # The workers are started afresh rather than forked, so they open database connections of their own
+        _executor = ProcessPoolExecutor(max_workers=PREDICTION_WORKERS, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=django.setup)
+    _requested.add((tournament_id, state))
+    future = _executor.submit(refresh_prediction, tournament_id)
+    future.add_done_callback(lambda _: _requested.discard((tournament_id, state)))
+
+
+def refresh_prediction(tournament_id, simulations=DEFAULT_SIMULATIONS):
+    """Work out and store the prediction of a tournament if it is out of date, run in a worker process."""
+    tournament = Tournament.objects.filter(id=tournament_id).first()
+    if tournament is not None:
+        get_prediction(tournament, simulations)
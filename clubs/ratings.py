@@ -0,0 +1,129 @@
+"""Rating engines, which turn the results of a rating period into new ratings for every player at once.
+
+Players are given as arrays of ratings, rating deviations and volatilities indexed by player, and the games of
+the period as arrays of white player indices, black player indices and the scores of the white players.
+The engines do not touch the database, the models load the players of a period and store the new ratings."""
+import numpy as np
+
+INITIAL_RATING = 1000
+INITIAL_RATING_DEVIATION = 350.0
+INITIAL_VOLATILITY = 0.06
+
+
+def white_score(white_id, winner_id, is_draw):
+    if is_draw:
+        return 0.5
+    return 1.0 if winner_id == white_id else 0.0
+
+
+class RatingEngine:
+    """The interface of a rating engine."""
+
+    # Whether results are rated as soon as they are recorded, or only once the whole round is complete
+    rates_each_match = True
+
+    def rate_period(self, ratings, deviations, volatilities, white, black, white_scores):
+        """Return the new ratings, deviations and volatilities of all players after the period."""
+        raise NotImplementedError
+
+
+class EloEngine(RatingEngine):
+    """Elo with a fixed K factor. Every game is rated from the ratings before the period, so a player
+    must not play more than once in a period for the result to match rating the games one by one."""
+
+    def __init__(self, k_factor=32):
+        self.k_factor = k_factor
+
+    def expected_score(self, rating, opponent_rating):
+        return 1 / (1 + np.power(10, (opponent_rating - rating) / 400))
+
+    def rate_period(self, ratings, deviations, volatilities, white, black, white_scores):
+        new_ratings = np.array(ratings, dtype=np.float64)
+        white_expected = self.expected_score(new_ratings[white], new_ratings[black])
+        # Ratings are stored as integers, so they are truncated the same way saving them always has
+        white_ratings = np.trunc(new_ratings[white] + self.k_factor * (white_scores - white_expected))
+        black_ratings = np.trunc(new_ratings[black] + self.k_factor * (white_expected - white_scores))
+        new_ratings[white] = white_ratings
+        new_ratings[black] = black_ratings
+        return new_ratings, deviations, volatilities
+
+
+class Glicko2Engine(RatingEngine):
+    """Glicko-2 as described in http://www.glicko.net/glicko/glicko2.pdf, with every player of the period
+    updated in the same vectorized pass. A period is a round of a tournament and only its players are rated, so
+    unlike in the paper the deviation of a club member who sits a round out does not grow."""
+
+    rates_each_match = False
+    SCALE = 173.7178
+    BASE_RATING = 1500
+    CONVERGENCE_TOLERANCE = 0.000001
+    MAX_ITERATIONS = 100
+
+    def __init__(self, tau=0.5):
+        self.tau = tau
+
+    def rate_period(self, ratings, deviations, volatilities, white, black, white_scores):
+        mu = (np.asarray(ratings, dtype=np.float64) - self.BASE_RATING) / self.SCALE
+        phi = np.asarray(deviations, dtype=np.float64) / self.SCALE
+        sigma = np.asarray(volatilities, dtype=np.float64)
+        number_of_players = len(mu)
+
+        # Every game counts once from the point of view of each of its two players
+        players = np.concatenate([white, black])
+        opponents = np.concatenate([black, white])
+        scores = np.concatenate([white_scores, 1 - np.asarray(white_scores)])
+
+        g = 1 / np.sqrt(1 + 3 * phi[opponents] ** 2 / np.pi ** 2)
+        expected = 1 / (1 + np.exp(-g * (mu[players] - mu[opponents])))
+        information = np.bincount(players, weights=g ** 2 * expected * (1 - expected), minlength=number_of_players)
+        improvement = np.bincount(players, weights=g * (scores - expected), minlength=number_of_players)
+
+        # Players without games get a placeholder variance, their new volatility is thrown away below
+        played = information > 0
+        variance = 1 / np.where(played, information, 1)
+        delta = variance * improvement
+
+        new_sigma = np.where(played, self._new_volatilities(phi, sigma, variance, delta), sigma)
+        phi_star = np.sqrt(phi ** 2 + new_sigma ** 2)
+        new_phi = np.where(played, 1 / np.sqrt(1 / phi_star ** 2 + information), phi_star)
+        new_mu = mu + new_phi ** 2 * improvement
+
+        return (np.round(new_mu * self.SCALE + self.BASE_RATING), new_phi * self.SCALE, new_sigma)
+
+    def _new_volatilities(self, phi, sigma, variance, delta):
+        # The Illinois algorithm from step 5 of the paper, run for all players at once
+        a = np.log(sigma ** 2)
+        excess = delta ** 2 - phi ** 2 - variance
+
+        def f(x):
+            exp_x = np.exp(x)
+            return (exp_x * (excess - exp_x) / (2 * (phi ** 2 + variance + exp_x) ** 2)) - (x - a) / self.tau ** 2
+
+        k = np.ones_like(a)
+        searching = (excess <= 0) & (f(a - self.tau) < 0)
+        while np.any(searching):
+            k = np.where(searching, k + 1, k)
+            searching &= f(a - k * self.tau) < 0
+
+        low = a
+        high = np.where(excess > 0, np.log(np.maximum(excess, np.finfo(np.float64).tiny)), a - k * self.tau)
+        f_low, f_high = f(low), f(high)
+        for _ in range(self.MAX_ITERATIONS):
+            converging = np.abs(high - low) > self.CONVERGENCE_TOLERANCE
+            if not np.any(converging):
+                break
+            with np.errstate(divide='ignore', invalid='ignore'):
+                middle = np.where(converging, low + (low - high) * f_low / (f_high - f_low), high)
+            f_middle = f(middle)
+            crossed = f_middle * f_high <= 0
+            low = np.where(converging & crossed, high, low)
+            f_low = np.where(converging, np.where(crossed, f_high, f_low / 2), f_low)
+            high = np.where(converging, middle, high)
+            f_high = np.where(converging, f_middle, f_high)
+        return np.exp(low / 2)
+
+
+RATING_ENGINES = {
+    'elo': EloEngine(),
+    'glicko2': Glicko2Engine(),
+}
@@ -0,0 +1,123 @@
+"""Full-text search over clubs and players.
+
+On SQLite, an FTS5 table shadows each searched model, kept in sync by triggers on the model's table, and results are
+ranked with bm25. Other databases use their own full-text search where Django supports it, and a plain substring
+match otherwise."""
+import re
+from django.db import connection
+from django.db.models import Q
+from .models import Club, User
+
+SEARCH_LIMIT = 20
+AUTOCOMPLETE_LIMIT = 8
+
+# For each searched model, its FTS5 table, the columns searched with their bm25 weights, and the columns
+# autocomplete matches
+SEARCH_TABLES = {
+    Club: ('clubs_club_fts', (('name', 10.0), ('location', 5.0), ('description', 1.0)), ('name',)),
+    User: ('clubs_user_fts', (('first_name', 10.0), ('last_name', 10.0), ('bio', 1.0)), ('first_name', 'last_name')),
+}
+
+
+def search(model, text, limit=SEARCH_LIMIT):
+    """Return the objects of the model containing every word of the text, best match first."""
+    return _run(model, _words(text), prefix=False, limit=limit)
+
+
+def autocomplete(model, text, limit=AUTOCOMPLETE_LIMIT):
+    """Return the objects of the model whose names contain a word starting with each word of the text, best match
+    first."""
+    return _run(model, _words(text), prefix=True, limit=limit)
+
+
+def _words(text):
+    # Only letters and digits reach the query, so nothing typed can be read as FTS5 or tsquery syntax
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def _run(model, words, prefix, limit):
+    if not words:
+        return []
+    if connection.vendor == 'sqlite':
+        return _search_fts5(model, words, prefix, limit)
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(model, words, prefix, limit)
+    return _search_substrings(model, words, prefix, limit)
+
+
+def _search_fts5(model, words, prefix, limit):
+    (table, columns, autocomplete_columns) = SEARCH_TABLES[model]
+    if prefix:
+        match = '{%s} : (%s)' % (' '.join(autocomplete_columns), ' '.join(f'"{word}"*' for word in words))
+    else:
+        match = ' '.join(f'"{word}"' for word in words)
+    weights = ', '.join(str(weight) for (_, weight) in columns)
+    model_table = model._meta.db_table
+    return list(model.objects.raw(
+        f'SELECT {model_table}.* FROM {table} JOIN {model_table} ON {model_table}.id = {table}.rowid '
+        f'WHERE {table} MATCH %s ORDER BY bm25({table}, {weights}) LIMIT %s', [match, limit]))
+
+
+def _search_postgresql(model, words, prefix, limit):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    (_, columns, autocomplete_columns) = SEARCH_TABLES[model]
+    if prefix:
+        columns = [(column, weight) for (column, weight) in columns if column in autocomplete_columns]
+        query = SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config='simple')
+    else:
+        query = SearchQuery(' '.join(words), config='simple')
+    # The weights of the columns, in the order of the bm25 weights of the FTS5 tables
+    labels = dict(zip(sorted({weight for (_, weight) in columns}, reverse=True), 'ABCD'))
+    vector = SearchVector(columns[0][0], weight=labels[columns[0][1]], config='simple')
+    for (column, weight) in columns[1:]:
+        vector += SearchVector(column, weight=labels[weight], config='simple')
+    return list(model.objects.annotate(search=vector, rank=SearchRank(vector, query)).filter(
+        search=query).order_by('-rank', 'id')[:limit])
+
+
+def _search_substrings(model, words, prefix, limit):
+    (_, columns, autocomplete_columns) = SEARCH_TABLES[model]
+    columns = autocomplete_columns if prefix else [column for (column, _) in columns]
+    condition = Q()
+    for word in words:
+        word_condition = Q()
+        for column in columns:
+            word_condition |= Q(**{f'{column}__icontains': word})
+        condition &= word_condition
+    return list(model.objects.filter(condition).order_by('id')[:limit])
+
+
+def create_search_tables(connection):
+    """Create the FTS5 tables and their triggers, if missing, and fill the tables from the searched models."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for (model, (table, columns, _)) in SEARCH_TABLES.items():
+            model_table = model._meta.db_table
+            names = ', '.join(column for (column, _) in columns)
+            new_values = ', '.join(f'new.{column}' for (column, _) in columns)
+            old_values = ', '.join(f'old.{column}' for (column, _) in columns)
+            delete = f"INSERT INTO {table}({table}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+            insert = f"INSERT INTO {table}(rowid, {names}) VALUES (new.id, {new_values});"
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5({names}, "
+                           f"content='{model_table}', content_rowid='id')")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON {model_table} "
+                           f"BEGIN {insert} END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON {model_table} "
+                           f"BEGIN {delete} END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_update AFTER UPDATE OF {names} ON {model_table} "
+                           f"BEGIN {delete} {insert} END")
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def restore_search_tables(connection):
+    """Recreate the triggers of the FTS5 tables and fill the tables again, once the search index migration has made
+    them.
+
+    SQLite drops the triggers of a table whenever a migration rebuilds it, so this runs after every migrate."""
+    if connection.vendor != 'sqlite':
+        return
+    tables = connection.introspection.table_names()
+    if all(table in tables for (table, _, _) in SEARCH_TABLES.values()):
+        create_search_tables(connection)
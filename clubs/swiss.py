@@ -0,0 +1,137 @@
+"""Pairing of the rounds of Swiss-system tournaments."""
+from math import ceil, log2
+
+WHITE = 1
+BLACK = -1
+
+# How many candidate opponents may be tried per player before rematches are allowed again
+BACKTRACKING_LIMIT = 200
+
+
+def default_number_of_rounds(number_of_players):
+    """Enough rounds for a single player to be left with a perfect score."""
+    return max(1, ceil(log2(max(number_of_players, 2))))
+
+
+def due_colour(colours):
+    """The colour a player should get next, given the colours they played so far, or None if either will do."""
+    balance = sum(colours)
+    if balance > 0:
+        return BLACK
+    if balance < 0:
+        return WHITE
+    if colours:
+        return -colours[-1]
+    return None
+
+
+def pair_round(players, scores, ratings, colours, opponents, byes):
+    """Pair one round of a Swiss tournament.
+
+    Players are ranked by score and then rating. Each player is paired inside their score group, the top half
+    against the bottom half, and players left over float down to the next group. No two players meet twice unless
+    there is no other way to pair the round, and players whose due colours clash are only paired if nobody else
+    fits. With an odd number of players, the lowest ranked player who has not had a bye yet gets it.
+
+    Returns a list of (white, black) pairs and the player with the bye, or None."""
+    ranked = sorted(players, key=lambda player: (-scores.get(player, 0), -ratings.get(player, 0), player))
+    bye = None
+    if len(ranked) % 2 == 1:
+        bye = next((player for player in reversed(ranked) if player not in byes), ranked[-1])
+        ranked.remove(bye)
+
+    dues = {player: due_colour(colours.get(player, [])) for player in ranked}
+    matching = _match(ranked, scores, dues, opponents, BACKTRACKING_LIMIT * len(ranked))
+    allowed_rematches = 1
+    while matching is None:
+        # Let in as few rematches as will do, the search is only left unbounded once any pair is allowed
+        limit = BACKTRACKING_LIMIT * len(ranked) if allowed_rematches < len(ranked) // 2 else None
+        matching = _match(ranked, scores, dues, opponents, limit, allowed_rematches)
+        allowed_rematches = allowed_rematches + 1 if allowed_rematches < 4 else allowed_rematches * 2
+
+    pairs = [_assign_colours(ranked[i], ranked[j], dues, colours) for (i, j) in matching]
+    return pairs, bye
+
+
+def _match(ranked, scores, dues, opponents, limit, allowed_rematches=0):
+    """Pair the ranked players with a depth-first search over the candidates of the highest unpaired player.
+
+    Players who already met are only tried once nobody else fits, and no more than allowed_rematches of them."""
+    n = len(ranked)
+    group_end = [n] * n
+    for i in range(n - 2, -1, -1):
+        group_end[i] = group_end[i + 1] if scores.get(ranked[i], 0) == scores.get(ranked[i + 1], 0) else i + 1
+    paired = [False] * n
+    no_opponents = set()
+
+    def candidates(i):
+        player = ranked[i]
+        played = opponents.get(player, no_opponents)
+        start = i + 1
+        while start < n:
+            end = group_end[start]
+            group = [j for j in range(start, end) if not paired[j] and ranked[j] not in played]
+            if end == group_end[i]:
+                # Top half against bottom half of the score group
+                half = len(group) // 2
+                group = group[half:] + group[:half][::-1]
+            clashing = []
+            for j in group:
+                if dues[player] is not None and dues[player] == dues[ranked[j]]:
+                    clashing.append(j)
+                else:
+                    yield j
+            yield from clashing
+            start = end
+        for j in range(i + 1, n):
+            if not paired[j] and ranked[j] in played and rematches[0] < allowed_rematches:
+                yield j
+
+    # Each entry is the player, the candidates left to try and the candidate they are paired with
+    stack = []
+    rematches = [0]
+    steps = 0
+    i = 0
+    while True:
+        while i < n and paired[i]:
+            i += 1
+        if i == n:
+            return [(player, opponent) for (player, _, opponent) in stack]
+        paired[i] = True
+        stack.append([i, candidates(i), None])
+        while stack:
+            entry = stack[-1]
+            if entry[2] is not None:
+                paired[entry[2]] = False
+                rematches[0] -= _is_rematch(ranked, opponents, entry[0], entry[2])
+            opponent = next(entry[1], None)
+            steps += 1
+            if limit is not None and steps > limit:
+                return None
+            if opponent is not None:
+                entry[2] = opponent
+                paired[opponent] = True
+                rematches[0] += _is_rematch(ranked, opponents, entry[0], opponent)
+                break
+            paired[entry[0]] = False
+            stack.pop()
+        if not stack:
+            return None
+        i = stack[-1][0] + 1
+
+
+def _is_rematch(ranked, opponents, i, j):
+    return ranked[j] in opponents.get(ranked[i], ())
+
+
+def _assign_colours(player, opponent, dues, colours):
+    """Give each player their due colour, the one with the stronger claim wins a clash, white goes to the higher
+    ranked player when neither is due a colour."""
+    (player_due, opponent_due) = (dues[player], dues[opponent])
+    if player_due == opponent_due:
+        if player_due is not None and abs(sum(colours.get(opponent, []))) > abs(sum(colours.get(player, []))):
+            player_due = -opponent_due
+        player_due = player_due or WHITE
+    elif player_due is None:
+        player_due = -opponent_due
+    return (player, opponent) if player_due == WHITE else (opponent, player)
@@ -0,0 +1,34 @@
+"""Unit tests of the freeze tournaments command."""
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from clubs.models import Tournament, TournamentSnapshot
+
+
+class FreezeTournamentsCommandTestCase(TestCase):
+    """Unit tests of the freeze tournaments command."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+        "clubs/tests/fixtures/default_tournament.json",
+        "clubs/tests/fixtures/other_tournament.json",
+    ]
+
+    def setUp(self):
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.other_tournament = Tournament.objects.get(name="Bedroom Tournament")
+        self.other_tournament.winner = None
+        self.other_tournament.save()
+
+    def test_completed_tournaments_are_frozen(self):
+        output = StringIO()
+        call_command("freeze_tournaments", stdout=output)
+        self.assertEqual(list(TournamentSnapshot.objects.values_list('tournament_id', flat=True)),
+                         [self.tournament.id])
+        self.assertIn("Froze 1 tournaments", output.getvalue())
+
+    def test_existing_snapshots_are_kept(self):
+        TournamentSnapshot.objects.create(tournament=self.tournament, data={'frozen': True})
+        call_command("freeze_tournaments", stdout=StringIO())
+        self.assertEqual(TournamentSnapshot.objects.get(tournament=self.tournament).data, {'frozen': True})
@@ -0,0 +1,68 @@
+"""Unit tests of the recompute user stats command."""
+from importlib import import_module
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+from clubs.models import Club, Pairing, Tournament, User, UserStats, pairing_to_match_group_phase
+
+
+class RecomputeUserStatsCommandTestCase(TestCase):
+    """Unit tests of the recompute user stats command."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+        "clubs/tests/fixtures/other_clubs.json",
+        "clubs/tests/fixtures/default_tournament.json",
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.other_club = Club.objects.get(name="Saint Louis Chess Club 2")
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.winner = None
+        self.tournament.save()
+        self.tournament.participants.clear()
+        self.other_tournament = Tournament.objects.create(club=self.other_club, name="Other tournament",
+                                                          organiser=self.other_club.owner,
+                                                          deadline=self.tournament.deadline)
+        self.jane = User.objects.get(email="janedoe@example.com")
+        self.bob = User.objects.get(email="bobdoe@example.com")
+        for tournament in (self.tournament, self.other_tournament):
+            tournament.club.make_member(self.jane)
+            tournament.club.make_member(self.bob)
+            tournament.make_participant(self.jane)
+            tournament.make_participant(self.bob)
+            pairing = Pairing.objects.create(tournament=tournament, white_player=self.jane,
+                                             black_player=self.bob, round=1)
+            pairing_to_match_group_phase(pairing, self.jane)
+        pairing = Pairing.objects.create(tournament=self.tournament, white_player=self.bob,
+                                         black_player=self.jane, round=2)
+        pairing_to_match_group_phase(pairing)
+        self.tournament.set_winner(self.jane)
+        self.tournament.save()
+
+    def _all_stats(self):
+        return sorted(UserStats.objects.values_list(
+            "user_id", "club_id", "matches_played", "matches_won", "matches_lost", "matches_drawn",
+            "tournaments_participated_in", "tournaments_won", "tournaments_lost"), key=str)
+
+    def test_recompute_matches_incremental_counters(self):
+        incremental_stats = self._all_stats()
+        UserStats.objects.update(matches_played=100, tournaments_won=7)
+        call_command("recompute_user_stats", stdout=StringIO())
+        self.assertEqual(self._all_stats(), incremental_stats)
+
+    def test_backfill_migration_matches_incremental_counters(self):
+        incremental_stats = self._all_stats()
+        UserStats.objects.all().delete()
+        import_module("clubs.migrations.0021_backfill_user_stats").backfill_user_stats(apps, None)
+        self.assertEqual(self._all_stats(), incremental_stats)
+
+    def test_recompute_counts_across_clubs(self):
+        call_command("recompute_user_stats", stdout=StringIO())
+        jane_stats = self.jane.get_stats()
+        self.assertEqual((jane_stats.matches_played, jane_stats.matches_won, jane_stats.matches_drawn), (3, 2, 1))
+        self.assertEqual(self.jane.get_stats(self.other_club).matches_played, 1)
+        self.assertEqual(self.bob.get_stats(self.club).tournaments_lost, 1)
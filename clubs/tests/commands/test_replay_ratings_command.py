@@ -0,0 +1,77 @@
+"""Unit tests of the replay ratings command."""
+import random
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from clubs.models import Club, EloRating, Pairing, Tournament, User, pairing_to_match_group_phase, \
+    pairing_to_match_elimination_phase
+from clubs.tests.models.helpers import _create_test_users
+
+
+class ReplayRatingsCommandTestCase(TestCase):
+    """Unit tests of the replay ratings command."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+        "clubs/tests/fixtures/default_tournament.json",
+        "clubs/tests/fixtures/default_elo.json",
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        _create_test_users(10, 8)
+        self.players = list(User.objects.filter(id__gte=10))
+        for player in self.players:
+            self.club.make_member(player)
+
+    def _play_random_matches(self, number_of_rounds):
+        random.seed(0)
+        for round_number in range(number_of_rounds):
+            players = self.players[:]
+            random.shuffle(players)
+            # An odd number of matches per round makes some rounds share players with the next one
+            pairings = [Pairing.objects.create(tournament=self.tournament, white_player=players[i],
+                                               black_player=players[i + 1], round=round_number + 1)
+                        for i in range(0, len(players) - 2 - round_number % 2, 2)]
+            for (i, pairing) in zip(range(0, len(players), 2), pairings):
+                outcome = random.random()
+                if outcome < 0.2:
+                    pairing_to_match_group_phase(pairing)
+                elif outcome < 0.3:
+                    pairing_to_match_elimination_phase(pairing)
+                else:
+                    pairing_to_match_group_phase(pairing, random.choice([players[i], players[i + 1]]))
+
+    def _current_ratings(self):
+        return dict(EloRating.objects.filter(club=self.club).values_list("user_id", "elo_rating"))
+
+    def test_replay_matches_recorded_ratings(self):
+        self._play_random_matches(12)
+        recorded_ratings = self._current_ratings()
+        EloRating.objects.filter(club=self.club).update(elo_rating=1500)
+        call_command("replay_ratings", "--club", str(self.club.id), stdout=StringIO())
+        self.assertEqual(self._current_ratings(), recorded_ratings)
+
+    def test_glicko2_replay_matches_recorded_ratings(self):
+        self.club.rating_system = Club.RatingSystem.GLICKO2
+        self.club.save()
+        self._play_random_matches(12)
+        recorded = {elo.user_id: elo for elo in EloRating.objects.filter(club=self.club)}
+        EloRating.objects.filter(club=self.club).update(elo_rating=1500, rating_deviation=50)
+        call_command("replay_ratings", "--club", str(self.club.id), stdout=StringIO())
+        for elo in EloRating.objects.filter(club=self.club):
+            self.assertEqual(elo.elo_rating, recorded[elo.user_id].elo_rating)
+            self.assertAlmostEqual(elo.rating_deviation, recorded[elo.user_id].rating_deviation)
+            self.assertAlmostEqual(elo.volatility, recorded[elo.user_id].volatility)
+
+    def test_replay_resets_players_without_matches(self):
+        EloRating.objects.filter(club=self.club).update(elo_rating=1234)
+        call_command("replay_ratings", "--club", str(self.club.id), stdout=StringIO())
+        self.assertEqual(set(self._current_ratings().values()), {1000})
+
+    def test_replay_of_unknown_club_fails(self):
+        with self.assertRaises(CommandError):
+            call_command("replay_ratings", "--club", "99", stdout=StringIO())
@@ -51,3 +51,14 @@ class CreateClubFormTestCase(TestCase):
         self.assertEqual(club.location, 'KCL')
         self.assertEqual(club.description, 'short description here')
         self.assertEqual(club.owner, self.user)
+
+    def test_rating_system_defaults_to_elo(self):
+        form = CreateClubForm(data=self.form_input)
+        club = form.save(user=self.user)
+        self.assertEqual(club.rating_system, Club.RatingSystem.ELO)
+
+    def test_form_saves_rating_system(self):
+        self.form_input['rating_system'] = Club.RatingSystem.GLICKO2
+        form = CreateClubForm(data=self.form_input)
+        club = form.save(user=self.user)
+        self.assertEqual(club.rating_system, Club.RatingSystem.GLICKO2)
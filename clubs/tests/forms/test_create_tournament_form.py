@@ -78,3 +78,12 @@ class CreateTournamentFormTestCase(TestCase):
         self.assertEqual(tournament.organiser, self.user)
         self.assertEqual(list(tournament.coorganisers.all()), [self.jane, self.bob])
         self.assertEqual(tournament.deadline, make_aware(datetime(2021, 10, 12, 12, 30)))
+        self.assertEqual(tournament.format, Tournament.Format.KNOCKOUT)
+
+    def test_form_saves_swiss_format(self):
+        self.form_input["format"] = Tournament.Format.SWISS
+        self.form_input["number_of_rounds"] = 7
+        form = CreateTournamentForm(data=self.form_input)
+        tournament = form.save(user=self.user, club=self.club.id)
+        self.assertEqual(tournament.format, Tournament.Format.SWISS)
+        self.assertEqual(tournament.number_of_rounds, 7)
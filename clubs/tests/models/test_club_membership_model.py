@@ -0,0 +1,83 @@
+"""Unit tests of the club membership model."""
+from unittest.mock import patch
+from django.db import DatabaseError, IntegrityError
+from django.test import TestCase
+from clubs.models import User, Club, ClubMembership
+
+
+class ClubMembershipModelTestCase(TestCase):
+    """Unit tests of the club membership model."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(email="johndoe@example.com")
+        self.jane = User.objects.get(email="janedoe@example.com")
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+
+    def test_owner_has_no_membership_row(self):
+        self.assertFalse(ClubMembership.objects.filter(club=self.club, user=self.owner).exists())
+        self.assertEqual(self.club.user_level(self.owner), "Owner")
+
+    def test_user_without_membership_is_applicant(self):
+        self.assertEqual(self.club.user_level(self.jane), "Applicant")
+
+    def test_applying_creates_applicant_row(self):
+        self.club.make_applicant(self.jane)
+        membership = ClubMembership.objects.get(club=self.club, user=self.jane)
+        self.assertEqual(membership.role, ClubMembership.Role.APPLICANT)
+
+    def test_promotion_updates_the_same_row(self):
+        self.club.make_applicant(self.jane)
+        membership_id = ClubMembership.objects.get(club=self.club, user=self.jane).id
+        self.club.make_member(self.jane)
+        self.club.make_officer(self.jane)
+        membership = ClubMembership.objects.get(club=self.club, user=self.jane)
+        self.assertEqual(membership.id, membership_id)
+        self.assertEqual(membership.role, ClubMembership.Role.OFFICER)
+
+    def test_user_can_only_have_one_role_per_club(self):
+        ClubMembership.objects.create(club=self.club, user=self.jane, role=ClubMembership.Role.MEMBER)
+        with self.assertRaises(IntegrityError):
+            ClubMembership.objects.create(club=self.club, user=self.jane, role=ClubMembership.Role.OFFICER)
+
+    def test_make_officer_requires_member(self):
+        with self.assertRaises(ValueError):
+            self.club.make_officer(self.jane)
+
+    def test_make_owner_swaps_rows(self):
+        self.club.make_member(self.jane)
+        self.club.make_officer(self.jane)
+        self.club.make_owner(self.jane)
+        self.assertFalse(ClubMembership.objects.filter(club=self.club, user=self.jane).exists())
+        self.assertEqual(ClubMembership.objects.get(club=self.club, user=self.owner).role,
+                         ClubMembership.Role.OFFICER)
+
+    def test_make_owner_failing_partway_changes_nothing(self):
+        self.club.make_applicant(self.owner)
+        self.club.make_member(self.jane)
+        self.club.make_officer(self.jane)
+        with patch.object(Club, "save", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.club.make_owner(self.jane)
+        self.club = Club.objects.get(id=self.club.id)
+        self.assertEqual(self.club.owner, self.owner)
+        self.assertEqual(ClubMembership.objects.get(club=self.club, user=self.jane).role, ClubMembership.Role.OFFICER)
+        self.assertEqual(ClubMembership.objects.get(club=self.club, user=self.owner).role,
+                         ClubMembership.Role.APPLICANT)
+        self.assertEqual(self.club.summary.number_of_applicants, 1)
+
+    def test_make_user_removes_membership(self):
+        self.club.make_member(self.jane)
+        self.club.make_user(self.jane)
+        self.assertFalse(ClubMembership.objects.filter(club=self.club, user=self.jane).exists())
+
+    def test_get_all_users_has_no_duplicates(self):
+        other_club = Club.objects.create(name="Other club", location="London", owner=self.owner)
+        other_club.make_member(self.jane)
+        self.club.make_member(self.jane)
+        self.assertEqual(self.club.get_all_users().count(), 2)
+        self.assertEqual(list(self.jane.get_all_clubs().order_by("id")), [self.club, other_club])
@@ -64,7 +64,7 @@ class ClubModelTestCase(TestCase):
 
     def test_club_can_accept_applicant(self):
         self.club.make_applicant(self.jane)
-        self.assertEqual(self.club.applicants.count(), 1)
+        self.assertEqual(self.club.get_number_of_applicants(), 1)
         self.assertEqual(self.club.get_all_applicants().get(email='janedoe@example.com'), self.jane)
 
     def test_club_cannot_have_same_applicant_twice(self):
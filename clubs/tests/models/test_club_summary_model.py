@@ -0,0 +1,70 @@
+"""Unit tests of the club summary model."""
+from django.test import TestCase
+from clubs.models import Club, ClubSummary, Pairing, Tournament, User, pairing_to_match_group_phase
+
+
+class ClubSummaryModelTestCase(TestCase):
+    """Unit tests of the club summary model."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(email="johndoe@example.com")
+        self.jane = User.objects.get(email="janedoe@example.com")
+        self.bob = User.objects.get(email="bobdoe@example.com")
+        self.club = Club.objects.create(name="Summary club", location="London", owner=self.owner)
+
+    def _summary(self):
+        return ClubSummary.objects.get(club=self.club)
+
+    def _assert_summary_matches_recount(self):
+        summary = self._summary()
+        recount = self.club.refresh_summary()
+        for field in ("number_of_members", "number_of_officers", "number_of_applicants", "number_of_tournaments",
+                      "number_of_ratings", "elo_rating_total"):
+            self.assertEqual(getattr(summary, field), getattr(recount, field), field)
+
+    def test_new_club_has_empty_summary(self):
+        summary = self._summary()
+        self.assertEqual(summary.number_of_members, 0)
+        self.assertEqual(summary.get_average_elo(), 0)
+
+    def test_membership_changes_are_counted(self):
+        self.club.make_applicant(self.jane)
+        self.club.make_applicant(self.bob)
+        self.assertEqual(self._summary().number_of_applicants, 2)
+        self.club.make_member(self.jane)
+        self.club.make_member(self.bob)
+        self.club.make_officer(self.bob)
+        summary = self._summary()
+        self.assertEqual((summary.number_of_applicants, summary.number_of_members, summary.number_of_officers),
+                         (0, 1, 1))
+        self._assert_summary_matches_recount()
+        self.club.make_owner(self.bob)
+        self.club.make_member(self.owner)
+        self.club.make_user(self.owner)
+        self._assert_summary_matches_recount()
+
+    def test_ratings_are_averaged(self):
+        self.club.give_elo(self.owner)
+        self.club.make_member(self.jane)
+        tournament = Tournament.objects.create(club=self.club, name="Summary tournament", organiser=self.owner,
+                                               deadline="9999-12-10T17:00:00+00:00")
+        pairing = Pairing.objects.create(tournament=tournament, white_player=self.owner, black_player=self.jane,
+                                         round=1)
+        pairing_to_match_group_phase(pairing, self.jane)
+        summary = self._summary()
+        self.assertEqual(summary.number_of_tournaments, 1)
+        self.assertEqual(summary.get_average_elo(), self.club.get_average_elo())
+        self._assert_summary_matches_recount()
+
+    def test_deleting_a_tournament_is_counted(self):
+        tournament = Tournament.objects.create(club=self.club, name="Summary tournament", organiser=self.owner,
+                                               deadline="9999-12-10T17:00:00+00:00")
+        tournament.delete()
+        self.assertEqual(self._summary().number_of_tournaments, 0)
+
+    def test_club_without_ratings_has_zero_average(self):
+        self.assertEqual(self.club.get_average_elo(), 0)
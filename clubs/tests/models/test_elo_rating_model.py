@@ -1,6 +1,7 @@
 from django.test import TestCase
 from clubs.models import *
 from clubs.forms import CreateClubForm
+from clubs.ratings import RATING_ENGINES
 from django.urls import reverse
 
 
@@ -76,3 +77,44 @@ class EloRatingModelTestCase(TestCase):
     def test_assign_elo(self):
         self.user_elo.assign_elo(club=self.club, user=self.user, elo_rating=2000)
         self.assertEqual(self.user_elo.elo_rating, 2000)
+
+    def test_rating_update_returns_deltas(self):
+        match = Match.objects.create(pairing=self.pairing, winner=self.michael, loser=self.alice, is_draw=False)
+        deltas = update_ratings(self.club.id, RATING_ENGINES['elo'], [(match.id, self.michael.id, self.alice.id, 1)])
+        self.assertEqual(deltas, {self.michael.id: 24, self.alice.id: -25})
+
+    def test_rating_update_reads_and_writes_both_ratings_once(self):
+        match = Match.objects.create(pairing=self.pairing, is_draw=True)
+        rebuild_leaderboard(self.club.id)
+        self.club.refresh_summary()
+        # A savepoint, one locking read, one rating write, one history write, the release, the leaderboard
+        # (one count and five queries to move each of the two players) and the club summary
+        with self.assertNumQueries(17):
+            update_ratings(self.club.id, RATING_ENGINES['elo'], [(match.id, self.michael.id, self.alice.id, 0.5)])
+
+    def test_rating_update_is_recorded_in_history(self):
+        match = pairing_to_match_group_phase(self.pairing, self.michael)
+        michael_history = EloRatingHistory.objects.get(user=self.michael, club=self.club)
+        self.assertEqual(michael_history.match, match)
+        self.assertEqual(michael_history.rating_before, 1000)
+        self.assertEqual(michael_history.rating_after, 1024)
+        alice_history = EloRatingHistory.objects.get(user=self.alice, club=self.club)
+        self.assertEqual(alice_history.rating_before, 1200)
+        self.assertEqual(alice_history.rating_after, 1175)
+
+    def test_elo_statistics_come_from_history(self):
+        pairing_to_match_group_phase(self.pairing, self.michael)
+        statistics = self.alice.get_elo_statistics()
+        self.assertEqual(statistics['peak'], 1200)
+        self.assertEqual(statistics['trough'], 1175)
+        self.assertEqual(statistics['trend'], -25)
+        self.assertEqual(statistics['recent_games'], 1)
+        club_statistics = self.club.get_elo_statistics()
+        self.assertEqual(club_statistics['peak'], 1200)
+        self.assertEqual(club_statistics['recent_games'], 1)
+
+    def test_elo_statistics_without_history(self):
+        statistics = self.alice.get_elo_statistics()
+        self.assertEqual(statistics['peak'], statistics['highest'])
+        self.assertEqual(statistics['trough'], statistics['lowest'])
+        self.assertEqual(statistics['trend'], 0)
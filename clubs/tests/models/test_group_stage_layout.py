@@ -0,0 +1,70 @@
+"""Unit tests of the configurable group stage of knockout tournaments."""
+from django.test import TestCase
+from clubs.models import User, Tournament, Match
+from .helpers import _create_test_users
+
+
+def _higher_id_wins(pairing):
+    (winner, loser) = sorted((pairing.white_player, pairing.black_player), key=lambda player: -player.id)
+    Match.objects.create(pairing=pairing, winner=winner, loser=loser, is_draw=False)
+
+
+class GroupStageLayoutTestCase(TestCase):
+    """Unit tests of the configurable group stage of knockout tournaments."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 150)
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+
+    def _play_group_stage(self):
+        pairings = self.tournament.create_initial_pairings()
+        while not self.tournament.elimination_phase:
+            for pairing in pairings:
+                _higher_id_wins(pairing)
+            pairings = self.tournament.next_pairings()
+        return pairings
+
+    def test_number_of_groups_follows_group_size(self):
+        self.tournament.group_size = 4
+        self.tournament.participants.set(self.players[:150])
+        self.tournament.create_initial_pairings()
+        groups = list(self.tournament.groups_within.all())
+        self.assertEqual(len(groups), 38)
+        self.assertEqual({group.participants.count() for group in groups}, {3, 4})
+
+    def test_group_size_lifts_the_entry_cap(self):
+        self.tournament.participants.set(self.players[:Tournament.MAX_KNOCKOUT_PARTICIPANTS])
+        self.assertTrue(self.tournament.is_full())
+        self.tournament.group_size = 6
+        self.assertFalse(self.tournament.is_full())
+
+    def test_qualifiers_per_group_fill_the_bracket(self):
+        self.tournament.number_of_groups = 4
+        self.tournament.qualifiers_per_group = 3
+        self.tournament.participants.set(self.players[:20])
+        first_round = self._play_group_stage()
+        self.assertEqual(len(first_round), 6)
+        qualifiers = [player for pairing in first_round for player in (pairing.white_player, pairing.black_player)]
+        self.assertEqual(sorted(player.id for player in qualifiers), list(range(18, 30)))
+        # Group winners meet the third placed players of the groups at the other end of the draw
+        self.assertEqual([(pairing.white_player_id, pairing.black_player_id) for pairing in first_round[:2]],
+                         [(26, 21), (27, 20)])
+
+    def test_odd_number_of_qualifiers_gives_a_bye(self):
+        self.tournament.number_of_groups = 3
+        self.tournament.qualifiers_per_group = 1
+        self.tournament.participants.set(self.players[:9])
+        first_round = self._play_group_stage()
+        self.assertEqual([(pairing.white_player_id, pairing.black_player_id) for pairing in first_round], [(16, 18)])
+        self.assertEqual(self.tournament.get_bracket()[1][0].black_player_id, 17)
+
+    def test_small_field_skips_the_group_stage(self):
+        self.tournament.number_of_groups = 4
+        self.tournament.qualifiers_per_group = 2
+        self.tournament.participants.set(self.players[:8])
+        pairings = self.tournament.create_initial_pairings()
+        self.assertFalse(self.tournament.groups_within.exists())
+        self.assertEqual(len(pairings), 4)
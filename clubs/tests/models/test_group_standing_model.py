@@ -0,0 +1,83 @@
+"""Unit tests of the group standing model."""
+from django.test import TestCase
+from clubs.models import User, Tournament, Group, GroupStanding, pairing_to_match_group_phase
+from .helpers import _create_test_users
+
+
+class GroupStandingModelTestCase(TestCase):
+    """Unit tests of the group standing model."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 12)
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.number_of_groups = 2
+        self.tournament.qualifiers_per_group = 1
+        self.tournament.participants.set(self.players)
+        for player in self.players:
+            self.tournament.club.make_member(player)
+        self.pairings = self.tournament.create_initial_pairings()
+
+    def _standing(self, player):
+        return GroupStanding.objects.get(group__tournament=self.tournament, player=player)
+
+    def test_groups_start_with_empty_standings(self):
+        self.assertEqual(GroupStanding.objects.filter(group__tournament=self.tournament).count(), 12)
+        self.assertEqual({standing.points for standing in self.tournament.get_group_standings()}, {0})
+
+    def test_recording_a_win_updates_both_players(self):
+        pairing = self.pairings[0]
+        pairing_to_match_group_phase(pairing, pairing.black_player)
+        winner = self._standing(pairing.black_player)
+        loser = self._standing(pairing.white_player)
+        self.assertEqual((winner.points, winner.wins, winner.losses), (1, 1, 0))
+        self.assertEqual((loser.points, loser.wins, loser.losses), (0, 0, 1))
+
+    def test_recording_a_draw_gives_half_a_point(self):
+        pairing = self.pairings[0]
+        pairing_to_match_group_phase(pairing)
+        for player in (pairing.white_player, pairing.black_player):
+            standing = self._standing(player)
+            self.assertEqual((standing.points, standing.draws), (0.5, 1))
+
+    def test_top_seeds_are_read_with_two_queries(self):
+        pairing = self.pairings[0]
+        pairing_to_match_group_phase(pairing, pairing.black_player)
+        group = Group.objects.get(pairings=pairing)
+        with self.assertNumQueries(2):
+            top_seeds = group.get_top_seeds(1)
+        self.assertEqual(top_seeds, [pairing.black_player])
+
+    def test_refreshed_standings_match_the_incremental_ones(self):
+        for (i, pairing) in enumerate(self.pairings):
+            pairing_to_match_group_phase(pairing, None if i % 3 == 0 else pairing.white_player)
+        incremental = sorted(GroupStanding.objects.values_list('player_id', 'points', 'wins', 'draws', 'losses'))
+        for group in self.tournament.groups_within.all():
+            group.refresh_standings()
+        self.assertEqual(sorted(GroupStanding.objects.values_list('player_id', 'points', 'wins', 'draws', 'losses')),
+                         incremental)
+
+    def test_knockout_matches_do_not_touch_the_standings(self):
+        tournament = Tournament.objects.create(club=self.tournament.club, organiser=self.tournament.organiser,
+                                               name="Knockout", deadline=self.tournament.deadline)
+        tournament.participants.set(self.players[:2])
+        pairing = tournament.create_initial_pairings()[0]
+        pairing_to_match_group_phase(pairing, pairing.white_player)
+        self.assertEqual(sum(standing.points for standing in self.tournament.get_group_standings()), 0)
+
+    def test_ties_are_broken_by_direct_encounter(self):
+        group = Group.objects.get(pairings=self.pairings[0])
+        (first, second, third) = [standing.player for standing in group.standings.order_by('player_id')][:3]
+
+        def play(winner, loser):
+            pairing = group.pairings.get(white_player__in=[winner, loser], black_player__in=[winner, loser])
+            pairing_to_match_group_phase(pairing, winner)
+
+        # The two highest ids end up level on one point, the higher one won their game
+        play(third, second)
+        play(second, first)
+        standings = group.get_standings()
+        self.assertEqual([standing.player for standing in standings[:2]], [third, second])
+        self.assertEqual(standings[0].tiebreaks.direct_encounter, 1)
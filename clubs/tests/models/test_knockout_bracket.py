@@ -0,0 +1,77 @@
+"""Unit tests of the knockout bracket."""
+from django.test import TestCase
+from clubs.models import User, Tournament, Match, Pairing
+from .helpers import _create_test_users
+
+
+def _white_wins(pairing):
+    return Match.objects.create(pairing=pairing, winner=pairing.white_player, loser=pairing.black_player,
+                                is_draw=False)
+
+
+class KnockoutBracketTestCase(TestCase):
+    """Unit tests of the knockout bracket."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 5)
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.participants.set(self.players)
+        self.tournament.round = 1
+
+    def test_whole_bracket_is_created_up_front(self):
+        first_round = self.tournament.create_bracket_pairings(self.players)
+        self.assertEqual(len(first_round), 2)
+        self.assertEqual(self.tournament.pairings_within.count(), 4)
+        self.assertFalse(self.tournament.is_final)
+        final = Pairing.objects.get(tournament=self.tournament, parent__isnull=True)
+        self.assertEqual(final.round, 3)
+        self.assertEqual(final.children.count(), 1)
+
+    def test_bye_fills_its_slot_straight_away(self):
+        self.tournament.create_bracket_pairings(self.players)
+        second_round = Pairing.objects.get(tournament=self.tournament, round=2)
+        self.assertIsNone(second_round.white_player)
+        self.assertIsNone(second_round.black_player)
+        final = Pairing.objects.get(tournament=self.tournament, round=3)
+        self.assertIsNone(final.white_player)
+        self.assertEqual(final.black_player, self.players[4])
+
+    def test_winner_moves_into_the_next_pairing(self):
+        first_round = self.tournament.create_bracket_pairings(self.players)
+        _white_wins(first_round[1])
+        second_round = Pairing.objects.get(tournament=self.tournament, round=2)
+        self.assertIsNone(second_round.white_player)
+        self.assertEqual(second_round.black_player, self.players[2])
+
+    def test_next_pairings_does_not_read_previous_round(self):
+        first_round = self.tournament.create_bracket_pairings(self.players)
+        for pairing in first_round:
+            _white_wins(pairing)
+        self.assertTrue(self.tournament.all_pairings_completed())
+        with self.assertNumQueries(5):
+            second_round = self.tournament.next_pairings()
+        self.assertEqual([(pairing.white_player_id, pairing.black_player_id) for pairing in second_round],
+                         [(self.players[0].id, self.players[2].id)])
+        self.assertFalse(self.tournament.is_final)
+        _white_wins(second_round[0])
+        final = self.tournament.next_pairings()
+        self.assertTrue(self.tournament.is_final)
+        self.assertEqual((final[0].white_player, final[0].black_player), (self.players[0], self.players[4]))
+
+    def test_two_players_play_the_final_straight_away(self):
+        pairings = self.tournament.create_bracket_pairings(self.players[:2])
+        self.assertEqual(len(pairings), 1)
+        self.assertTrue(self.tournament.is_final)
+
+    def test_bracket_is_read_with_one_query(self):
+        first_round = self.tournament.create_bracket_pairings(self.players)
+        _white_wins(first_round[0])
+        with self.assertNumQueries(1):
+            bracket = self.tournament.get_bracket()
+            names = [(pairing.white_player and pairing.white_player.full_name()) for round in bracket for pairing in round]
+        self.assertEqual([len(round) for round in bracket], [2, 1, 1])
+        self.assertEqual(bracket[0][0].winner_id, self.players[0].id)
+        self.assertEqual(names[2], self.players[0].full_name())
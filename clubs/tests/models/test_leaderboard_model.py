@@ -0,0 +1,82 @@
+"""Unit tests of the leaderboard model."""
+import random
+from django.test import TestCase
+from clubs.models import Club, EloRating, LeaderboardEntry, Pairing, Tournament, User, pairing_to_match_group_phase, \
+    rebuild_leaderboard
+from clubs.tests.models.helpers import _create_test_users
+
+
+class LeaderboardModelTestCase(TestCase):
+    """Unit tests of the leaderboard model."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+        "clubs/tests/fixtures/default_tournament.json",
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        _create_test_users(10, 8)
+        self.players = list(User.objects.filter(id__gte=10).order_by("id"))
+        for player in self.players:
+            self.club.make_member(player)
+
+    def _entries(self):
+        return list(LeaderboardEntry.objects.filter(club=self.club).order_by("position").values_list(
+            "user_id", "elo_rating", "rank", "position", "percentile"))
+
+    def _set_rating(self, player, rating):
+        EloRating.objects.filter(club=self.club, user=player).update(elo_rating=rating)
+
+    def test_members_join_the_leaderboard(self):
+        entries = self._entries()
+        self.assertEqual([user_id for (user_id, _, _, _, _) in entries], [player.id for player in self.players])
+        self.assertEqual({rank for (_, _, rank, _, _) in entries}, {1})
+        self.assertEqual([position for (_, _, _, position, _) in entries], list(range(1, 9)))
+        self.assertEqual({percentile for (_, _, _, _, percentile) in entries}, {100})
+
+    def test_ties_share_a_rank(self):
+        self._set_rating(self.players[3], 1200)
+        self._set_rating(self.players[5], 1200)
+        self._set_rating(self.players[0], 900)
+        rebuild_leaderboard(self.club.id)
+        entries = self._entries()
+        self.assertEqual(entries[0][:4], (self.players[3].id, 1200, 1, 1))
+        self.assertEqual(entries[1][:4], (self.players[5].id, 1200, 1, 2))
+        self.assertEqual(entries[2][2], 3)
+        self.assertEqual(entries[-1][:4], (self.players[0].id, 900, 8, 8))
+        self.assertEqual(entries[-1][4], 12.5)
+
+    def test_incremental_updates_match_a_rebuild(self):
+        random.seed(1)
+        for round_number in range(10):
+            players = self.players[:]
+            random.shuffle(players)
+            for i in range(0, len(players), 2):
+                pairing = Pairing.objects.create(tournament=self.tournament, white_player=players[i],
+                                                 black_player=players[i + 1], round=round_number + 1)
+                if random.random() < 0.2:
+                    pairing_to_match_group_phase(pairing)
+                else:
+                    pairing_to_match_group_phase(pairing, random.choice([players[i], players[i + 1]]))
+        incremental_entries = self._entries()
+        rebuild_leaderboard(self.club.id)
+        self.assertEqual(incremental_entries, self._entries())
+
+    def test_leaving_player_is_removed(self):
+        self.club.make_user(self.players[0])
+        entries = self._entries()
+        self.assertNotIn(self.players[0].id, [user_id for (user_id, _, _, _, _) in entries])
+        self.assertEqual([position for (_, _, _, position, _) in entries], list(range(1, 8)))
+
+    def test_leaderboard_queries(self):
+        for (i, player) in enumerate(self.players):
+            self._set_rating(player, 1000 + 10 * i)
+        rebuild_leaderboard(self.club.id)
+        self.assertEqual([entry.user for entry in self.club.get_top_players(2)], self.players[:-3:-1])
+        self.assertEqual(self.club.get_leaderboard_entry(self.players[0]).rank, 8)
+        self.assertEqual([entry.user for entry in self.club.get_leaderboard_page(2, 3)], self.players[4:1:-1])
+        self.assertEqual([entry.elo_rating for entry in self.club.get_players_near_rating(1035, 2)],
+                         [1050, 1040, 1030, 1020])
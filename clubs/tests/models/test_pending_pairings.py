@@ -0,0 +1,68 @@
+"""Unit tests of the counter of pairings waiting for a result."""
+from django.test import TestCase
+from clubs.models import User, Tournament, Match
+from .helpers import _create_test_users
+
+
+def _white_wins(pairing):
+    return Match.objects.create(pairing=pairing, winner=pairing.white_player, loser=pairing.black_player,
+                                is_draw=False)
+
+
+class PendingPairingsTestCase(TestCase):
+    """Unit tests of the counter of pairings waiting for a result."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 8)
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.participants.set(self.players)
+
+    def test_round_is_not_completed_before_pairings(self):
+        self.assertFalse(self.tournament.all_pairings_completed())
+
+    def test_results_count_off_the_pairings_of_the_round(self):
+        first_round = self.tournament.create_initial_pairings()
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).pending_pairings, 4)
+        for pairing in first_round[:3]:
+            _white_wins(pairing)
+        self.assertFalse(self.tournament.all_pairings_completed())
+        self.assertEqual(self.tournament.pending_pairings, 1)
+        _white_wins(first_round[3])
+        self.assertTrue(self.tournament.all_pairings_completed())
+
+    def test_round_completion_is_a_single_query(self):
+        for pairing in self.tournament.create_initial_pairings():
+            _white_wins(pairing)
+        with self.assertNumQueries(1):
+            self.assertTrue(self.tournament.all_pairings_completed())
+
+    def test_saving_a_stale_tournament_keeps_the_count(self):
+        first_round = self.tournament.create_initial_pairings()
+        stale = Tournament.objects.get(id=self.tournament.id)
+        _white_wins(first_round[0])
+        stale.description = "Changed"
+        stale.save()
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).pending_pairings, 3)
+
+    def test_next_round_restarts_the_count(self):
+        for pairing in self.tournament.create_initial_pairings():
+            _white_wins(pairing)
+        second_round = self.tournament.next_pairings()
+        self.assertEqual(len(second_round), 2)
+        self.assertFalse(self.tournament.all_pairings_completed())
+        self.assertEqual(self.tournament.pending_pairings, 2)
+
+    def test_results_outside_the_current_round_are_not_counted(self):
+        first_round = self.tournament.create_initial_pairings()
+        Tournament.objects.filter(id=self.tournament.id).update(round=2)
+        _white_wins(first_round[0])
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).pending_pairings, 4)
+
+    def test_second_result_of_a_pairing_is_not_counted(self):
+        first_round = self.tournament.create_initial_pairings()
+        _white_wins(first_round[0])
+        _white_wins(first_round[0])
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).pending_pairings, 3)
@@ -0,0 +1,105 @@
+"""Unit tests of the tournament predictions."""
+from unittest.mock import patch
+from django.test import TestCase
+from clubs.models import User, Tournament, EloRating, TournamentPrediction, pairing_to_match_group_phase
+from clubs.predictions import build_model, get_prediction, get_stored_prediction, predict_tournament, \
+    run_simulations, simulate
+from .helpers import _create_test_users
+
+
+class PredictionsTestCase(TestCase):
+    """Unit tests of the tournament predictions."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 20)
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.winner = None
+        self.tournament.save()
+        for (i, player) in enumerate(self.players):
+            self.tournament.club.make_member(player)
+            EloRating.objects.filter(user=player, club=self.tournament.club).update(elo_rating=1000 + 50 * i)
+
+    def _chances(self, prediction):
+        return {player['id']: player['chances'] for player in prediction['players']}
+
+    def test_stronger_player_is_favourite_in_a_final(self):
+        self.tournament.participants.set(self.players[:2])
+        self.tournament.create_initial_pairings()
+        prediction = predict_tournament(self.tournament, simulations=20000)
+        self.assertEqual(prediction['rounds'], ["Final", "Winner"])
+        (favourite, underdog) = prediction['players']
+        self.assertEqual(favourite['id'], self.players[1].id)
+        self.assertEqual(favourite['chances'][0], 100)
+        self.assertAlmostEqual(favourite['chances'][1] + underdog['chances'][1], 100, delta=0.5)
+        self.assertGreater(favourite['chances'][1], 50)
+
+    def test_bye_reaches_the_next_round_for_sure(self):
+        self.tournament.participants.set(self.players[:5])
+        self.tournament.create_initial_pairings()
+        chances = self._chances(predict_tournament(self.tournament, simulations=5000))
+        self.assertEqual(chances[self.players[4].id][:3], [100, 100, 100])
+        self.assertAlmostEqual(sum(player_chances[-1] for player_chances in chances.values()), 100, delta=0.5)
+
+    def test_recorded_results_are_kept(self):
+        self.tournament.participants.set(self.players[:4])
+        first_round = self.tournament.create_initial_pairings()
+        pairing_to_match_group_phase(first_round[0], first_round[0].white_player)
+        chances = self._chances(predict_tournament(self.tournament, simulations=5000))
+        self.assertEqual(chances[first_round[0].white_player_id][1], 100)
+        self.assertEqual(chances[first_round[0].black_player_id][1:], [0, 0])
+
+    def test_group_stage_is_simulated_into_the_bracket(self):
+        self.tournament.number_of_groups = 4
+        self.tournament.participants.set(self.players)
+        self.tournament.create_initial_pairings()
+        prediction = predict_tournament(self.tournament, simulations=5000)
+        self.assertEqual(prediction['rounds'], ["Quarter-finals", "Semi-finals", "Final", "Winner"])
+        chances = self._chances(prediction)
+        self.assertAlmostEqual(sum(player_chances[0] for player_chances in chances.values()), 800, delta=0.5)
+
+    def test_simulations_can_be_spread_over_processes(self):
+        self.tournament.participants.set(self.players[:8])
+        self.tournament.create_initial_pairings()
+        reached = run_simulations(build_model(self.tournament), 3000, workers=2, seed=1)
+        self.assertEqual(reached[:, -1].sum(), 3000)
+        self.assertEqual(reached[:, 0].sum(), 8 * 3000)
+
+    def test_simulations_are_played_in_chunks(self):
+        self.tournament.number_of_groups = 4
+        self.tournament.participants.set(self.players)
+        self.tournament.create_initial_pairings()
+        with patch("clubs.predictions.SIMULATION_CHUNK", 300):
+            reached = simulate(build_model(self.tournament), 1000, seed=1)
+        self.assertEqual(reached[:, -1].sum(), 1000)
+        self.assertEqual(reached[:, 0].sum(), 8 * 1000)
+
+    def test_stored_prediction_is_never_worked_out_on_the_spot(self):
+        self.tournament.participants.set(self.players[:4])
+        self.tournament.create_initial_pairings()
+        with patch("clubs.predictions.request_prediction") as request_prediction:
+            self.assertEqual(get_stored_prediction(self.tournament), (None, True))
+        request_prediction.assert_called_once()
+        self.assertFalse(TournamentPrediction.objects.exists())
+        prediction = get_prediction(self.tournament, simulations=1000)
+        self.assertEqual(get_stored_prediction(self.tournament), (prediction, False))
+
+    def test_predictions_are_stored_until_a_result_is_recorded(self):
+        self.tournament.participants.set(self.players[:4])
+        first_round = self.tournament.create_initial_pairings()
+        prediction = get_prediction(self.tournament, simulations=1000)
+        self.assertEqual(TournamentPrediction.objects.get(tournament=self.tournament).data, prediction)
+        with self.assertNumQueries(2):
+            self.assertEqual(get_prediction(self.tournament, simulations=1000), prediction)
+        pairing_to_match_group_phase(first_round[0], first_round[0].black_player)
+        self.assertNotEqual(get_prediction(self.tournament, simulations=1000), prediction)
+        self.assertEqual(TournamentPrediction.objects.count(), 1)
+
+    def test_swiss_tournaments_are_not_predicted(self):
+        self.tournament.format = Tournament.Format.SWISS
+        self.tournament.participants.set(self.players[:4])
+        self.tournament.create_initial_pairings()
+        self.assertIsNone(predict_tournament(self.tournament))
+        self.assertIsNone(get_prediction(self.tournament))
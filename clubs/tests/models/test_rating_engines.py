@@ -0,0 +1,78 @@
+"""Unit tests of the rating engines."""
+import numpy as np
+from django.test import TestCase
+from clubs.models import Club, EloRating, EloRatingHistory, Pairing, Tournament, User, pairing_to_match_group_phase
+from clubs.ratings import EloEngine, Glicko2Engine, INITIAL_RATING
+from clubs.tests.models.helpers import _create_test_users
+
+
+class RatingEnginesTestCase(TestCase):
+    """Unit tests of the rating engines."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+        "clubs/tests/fixtures/default_tournament.json",
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        _create_test_users(10, 4)
+        self.players = list(User.objects.filter(id__gte=10).order_by("id"))
+        for player in self.players:
+            self.club.make_member(player)
+
+    def test_elo_engine_rates_a_game(self):
+        ratings, _, _ = EloEngine().rate_period(np.array([1200.0, 1000.0]), None, None, np.array([0]),
+                                                np.array([1]), np.array([0.0]))
+        self.assertEqual(list(ratings), [1175, 1024])
+
+    def test_glicko2_engine_matches_paper_example(self):
+        # The worked example from the Glicko-2 paper, player 0 plays the other three
+        ratings, deviations, volatilities = Glicko2Engine().rate_period(
+            np.array([1500.0, 1400.0, 1550.0, 1700.0]),
+            np.array([200.0, 30.0, 100.0, 300.0]),
+            np.full(4, 0.06),
+            np.array([0, 0, 0]),
+            np.array([1, 2, 3]),
+            np.array([1.0, 0.0, 0.0]),
+        )
+        self.assertEqual(ratings[0], 1464)
+        self.assertAlmostEqual(deviations[0], 151.52, places=2)
+        self.assertAlmostEqual(volatilities[0], 0.06, places=4)
+
+    def test_glicko2_engine_only_widens_deviation_of_players_without_games(self):
+        ratings, deviations, volatilities = Glicko2Engine().rate_period(
+            np.array([1500.0, 1500.0, 1500.0]), np.full(3, 100.0), np.full(3, 0.06),
+            np.array([0]), np.array([1]), np.array([1.0]))
+        self.assertEqual(ratings[2], 1500)
+        self.assertGreater(deviations[2], 100)
+        self.assertEqual(volatilities[2], 0.06)
+
+    def test_glicko2_club_rates_once_the_round_is_complete(self):
+        self.club.rating_system = Club.RatingSystem.GLICKO2
+        self.club.save()
+        first = Pairing.objects.create(tournament=self.tournament, white_player=self.players[0],
+                                       black_player=self.players[1], round=1)
+        second = Pairing.objects.create(tournament=self.tournament, white_player=self.players[2],
+                                        black_player=self.players[3], round=1)
+
+        pairing_to_match_group_phase(first, self.players[0])
+        self.assertEqual(EloRating.objects.get(user=self.players[0], club=self.club).elo_rating, INITIAL_RATING)
+        self.assertFalse(EloRatingHistory.objects.exists())
+
+        pairing_to_match_group_phase(second)
+        first_winner = EloRating.objects.get(user=self.players[0], club=self.club)
+        self.assertGreater(first_winner.elo_rating, INITIAL_RATING)
+        self.assertLess(first_winner.rating_deviation, 350)
+        self.assertEqual(EloRating.objects.get(user=self.players[2], club=self.club).elo_rating, INITIAL_RATING)
+        self.assertEqual(EloRatingHistory.objects.count(), 4)
+
+    def test_elo_club_rates_every_match(self):
+        pairing = Pairing.objects.create(tournament=self.tournament, white_player=self.players[0],
+                                         black_player=self.players[1], round=1)
+        Pairing.objects.create(tournament=self.tournament, white_player=self.players[2],
+                               black_player=self.players[3], round=1)
+        pairing_to_match_group_phase(pairing, self.players[0])
+        self.assertEqual(EloRating.objects.get(user=self.players[0], club=self.club).elo_rating, INITIAL_RATING + 16)
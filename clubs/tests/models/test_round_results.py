@@ -0,0 +1,109 @@
+"""Unit tests of recording the results of a whole round at once."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from clubs.models import User, Club, Tournament, Match, EloRating, EloRatingHistory, UserStats
+from .helpers import _create_test_users
+
+
+class RoundResultsTestCase(TestCase):
+    """Unit tests of recording the results of a whole round at once."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 16)
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        for player in self.players:
+            self.club.give_elo(player)
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.winner = None
+        self.tournament.save()
+
+    def _start(self, number_of_players):
+        self.tournament.participants.set(self.players[:number_of_players])
+        return self.tournament.create_initial_pairings()
+
+    def test_whole_round_is_recorded_and_the_next_one_paired(self):
+        first_round = self._start(8)
+        matches = self.tournament.record_round_results([(pairing.id, pairing.white_player_id)
+                                                        for pairing in first_round])
+        self.assertEqual(len(matches), 4)
+        self.assertEqual(Match.objects.filter(pairing__tournament=self.tournament).count(), 4)
+        self.assertEqual(self.tournament.round, 2)
+        self.assertEqual(self.tournament.pending_pairings, 2)
+        second_round = list(self.tournament.get_open_pairings())
+        self.assertEqual([(pairing.white_player_id, pairing.black_player_id) for pairing in second_round],
+                         [(first_round[0].white_player_id, first_round[1].white_player_id),
+                          (first_round[2].white_player_id, first_round[3].white_player_id)])
+
+    def test_part_of_a_round_does_not_advance(self):
+        first_round = self._start(8)
+        self.tournament.record_round_results([(first_round[0].id, None)])
+        self.assertEqual(self.tournament.round, 1)
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).pending_pairings, 3)
+        match = Match.objects.get(pairing=first_round[0])
+        self.assertTrue(match.is_draw)
+        self.assertIn(match.winner_id, (first_round[0].white_player_id, first_round[0].black_player_id))
+
+    def test_last_round_names_the_winner(self):
+        final = self._start(2)
+        self.tournament.record_round_results([(final[0].id, final[0].black_player_id)])
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).winner_id, final[0].black_player_id)
+
+    def test_invalid_result_records_nothing(self):
+        first_round = self._start(8)
+        with self.assertRaises(ValueError):
+            self.tournament.record_round_results([(first_round[0].id, first_round[0].white_player_id),
+                                                  (first_round[1].id, first_round[0].white_player_id)])
+        with self.assertRaises(ValueError):
+            self.tournament.record_round_results([(first_round[0].id, None), (first_round[0].id, None)])
+        self.assertFalse(Match.objects.filter(pairing__tournament=self.tournament).exists())
+
+    def test_pairing_with_a_result_is_rejected(self):
+        first_round = self._start(8)
+        self.tournament.record_round_results([(first_round[0].id, None)])
+        with self.assertRaises(ValueError):
+            self.tournament.record_round_results([(first_round[0].id, first_round[0].white_player_id)])
+
+    def test_counters_and_ratings_are_updated(self):
+        first_round = self._start(4)
+        self.tournament.record_round_results([(first_round[0].id, first_round[0].white_player_id),
+                                              (first_round[1].id, None)])
+        winner = UserStats.objects.get(club=self.club, user_id=first_round[0].white_player_id)
+        self.assertEqual((winner.matches_played, winner.matches_won), (1, 1))
+        loser = UserStats.objects.get(club__isnull=True, user_id=first_round[0].black_player_id)
+        self.assertEqual((loser.matches_played, loser.matches_lost), (1, 1))
+        drawn = UserStats.objects.get(club=self.club, user_id=first_round[1].black_player_id)
+        self.assertEqual((drawn.matches_played, drawn.matches_drawn), (1, 1))
+        self.assertEqual(EloRatingHistory.objects.filter(club=self.club).count(), 4)
+        self.assertGreater(EloRating.objects.get(club=self.club, user_id=first_round[0].white_player_id).elo_rating,
+                           EloRating.objects.get(club=self.club, user_id=first_round[0].black_player_id).elo_rating)
+
+    def test_group_results_go_into_the_standings(self):
+        self.tournament.number_of_groups = 2
+        first_round = self._start(12)
+        self.assertTrue(self.tournament.group_phase)
+        self.tournament.record_round_results([(pairing.id, pairing.white_player_id) for pairing in first_round])
+        points = {standing.player_id: standing.points for standing in self.tournament.get_group_standings()}
+        for pairing in first_round:
+            self.assertEqual(points[pairing.white_player_id], 1)
+            self.assertEqual(points[pairing.black_player_id], 0)
+
+    def test_number_of_queries_does_not_grow_with_the_round(self):
+        def queries(number_of_players):
+            Match.objects.all().delete()
+            self.tournament.pairings_within.all().delete()
+            self.tournament.is_final = False
+            self.tournament.save()
+            first_round = self._start(number_of_players)
+            with CaptureQueriesContext(connection) as context:
+                self.tournament.record_round_results([(pairing.id, pairing.white_player_id)
+                                                      for pairing in first_round])
+            # The leaderboard moves each player up to a threshold, past which it is rebuilt
+            return len([query for query in context.captured_queries
+                        if 'clubs_leaderboardentry' not in query['sql']])
+
+        # Only the club summary may be skipped, when the rating changes happen to cancel out
+        self.assertLessEqual(abs(queries(8) - queries(16)), 1)
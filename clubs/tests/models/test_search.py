@@ -0,0 +1,65 @@
+"""Unit tests of the full-text search over clubs and players."""
+from django.apps import apps
+from django.db import connection
+from django.db.models.signals import post_migrate
+from django.test import TestCase
+from clubs.models import User, Club
+from clubs.search import search, autocomplete, _search_substrings
+
+
+class SearchTestCase(TestCase):
+    """Unit tests of the full-text search over clubs and players."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json']
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@example.com')
+        self.kings = Club.objects.create(name="Kings Club", location="Leeds", description="We play in London",
+                                         owner=self.user)
+        self.london = Club.objects.create(name="London Knights", location="London", owner=self.user)
+
+    def test_search_ranks_names_above_descriptions(self):
+        self.assertEqual(search(Club, "london"), [self.london, self.kings])
+
+    def test_search_needs_every_word(self):
+        self.assertEqual(search(Club, "london knights"), [self.london])
+        self.assertEqual(search(Club, "london queens"), [])
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(search(Club, 'london"*:'), [self.london, self.kings])
+        self.assertEqual(search(Club, '"*'), [])
+
+    def test_search_follows_changes(self):
+        self.london.name = "Paris Knights"
+        self.london.save()
+        self.assertEqual(search(Club, "paris"), [self.london])
+        self.assertEqual(search(Club, "london"), [self.london, self.kings])
+        self.kings.delete()
+        self.assertEqual(search(Club, "london"), [self.london])
+        Club.objects.filter(id=self.london.id).update(location="Paris")
+        self.assertEqual(search(Club, "london"), [])
+
+    def test_migrate_restores_dropped_triggers(self):
+        # What SQLite does to the triggers when a migration rebuilds the table of a searched model
+        with connection.cursor() as cursor:
+            for trigger in ('insert', 'delete', 'update'):
+                cursor.execute(f"DROP TRIGGER clubs_club_fts_{trigger}")
+        Club.objects.filter(id=self.london.id).update(name="Paris Knights")
+        post_migrate.send(sender=apps.get_app_config('clubs'), app_config=apps.get_app_config('clubs'),
+                          using=connection.alias)
+        self.assertEqual(search(Club, "paris"), [self.london])
+        self.kings.delete()
+        self.assertEqual(search(Club, "london"), [self.london])
+
+    def test_autocomplete_matches_the_start_of_names(self):
+        self.assertEqual(autocomplete(Club, "lon kn"), [self.london])
+        self.assertEqual(autocomplete(Club, "lee"), [])
+        self.assertEqual(autocomplete(User, "jo do"), [self.user])
+
+    def test_search_users(self):
+        self.assertIn(self.user, search(User, "doe"))
+        self.assertEqual(search(User, "johndoe"), [])
+
+    def test_substring_fallback(self):
+        self.assertEqual(_search_substrings(Club, ["london"], prefix=False, limit=10), [self.kings, self.london])
+        self.assertEqual(_search_substrings(Club, ["kni"], prefix=True, limit=10), [self.london])
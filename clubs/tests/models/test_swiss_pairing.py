@@ -0,0 +1,126 @@
+"""Unit tests of the Swiss pairing."""
+import random
+import time
+from django.test import TestCase
+from clubs import swiss
+from clubs.models import User, Tournament, Pairing, pairing_to_match_group_phase
+from .helpers import _create_test_users
+
+
+class SwissPairingTestCase(TestCase):
+    """Unit tests of the Swiss pairing."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 7)
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.format = Tournament.Format.SWISS
+        self.tournament.number_of_rounds = 4
+        self.tournament.participants.set(self.players)
+        for player in self.players:
+            self.tournament.club.make_member(player)
+
+    def test_first_round_pairs_top_half_against_bottom_half(self):
+        (pairs, bye) = swiss.pair_round([1, 2, 3, 4, 5, 6], {}, {}, {}, {}, set())
+        self.assertEqual(pairs, [(1, 4), (2, 5), (3, 6)])
+        self.assertIsNone(bye)
+
+    def test_players_are_paired_inside_their_score_group(self):
+        scores = {1: 1, 2: 1, 3: 0, 4: 0}
+        (pairs, _) = swiss.pair_round([1, 2, 3, 4], scores, {}, {}, {}, set())
+        self.assertEqual({frozenset(pair) for pair in pairs}, {frozenset((1, 2)), frozenset((3, 4))})
+
+    def test_rematches_are_avoided(self):
+        scores = {1: 1, 2: 1, 3: 0, 4: 0}
+        opponents = {1: {2}, 2: {1}, 3: {4}, 4: {3}}
+        (pairs, _) = swiss.pair_round([1, 2, 3, 4], scores, {}, {}, opponents, set())
+        for (white, black) in pairs:
+            self.assertNotIn(black, opponents[white])
+
+    def test_rematch_is_allowed_when_nothing_else_is_possible(self):
+        (pairs, _) = swiss.pair_round([1, 2], {}, {}, {}, {1: {2}, 2: {1}}, set())
+        self.assertEqual(len(pairs), 1)
+
+    def test_colours_alternate(self):
+        colours = {1: [swiss.WHITE], 2: [swiss.BLACK]}
+        (pairs, _) = swiss.pair_round([1, 2], {}, {}, colours, {}, set())
+        self.assertEqual(pairs, [(2, 1)])
+
+    def test_bye_goes_to_the_lowest_player_without_one(self):
+        scores = {1: 2, 2: 1, 3: 0}
+        (_, bye) = swiss.pair_round([1, 2, 3], scores, {}, {}, {}, {3})
+        self.assertEqual(bye, 2)
+
+    def test_pairing_a_thousand_players_is_fast(self):
+        random.seed(3)
+        players = list(range(1000))
+        ratings = {player: random.randint(800, 2400) for player in players}
+        scores = {player: random.randint(0, 8) / 2 for player in players}
+        opponents = {player: set(random.sample(players, 8)) - {player} for player in players}
+        for (player, played) in opponents.items():
+            for opponent in played:
+                opponents[opponent].add(player)
+        start = time.perf_counter()
+        (pairs, _) = swiss.pair_round(players, scores, ratings, {}, opponents, set())
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(len(pairs), 500)
+        self.assertFalse(any(black in opponents[white] for (white, black) in pairs))
+
+    def test_late_rounds_keep_rematches_to_a_minimum(self):
+        # Ten players over nine rounds leave few pairs who have not met, so by round eight the rematch-free search
+        # runs out of budget
+        rng = random.Random(4)
+        players = list(range(1, 11))
+        ratings = {player: rng.randint(1000, 2000) for player in players}
+        (scores, colours, opponents) = ({}, {}, {})
+        searches_given_up = 0
+        for _ in range(9):
+            ranked = sorted(players, key=lambda player: (-scores.get(player, 0), -ratings[player], player))
+            dues = {player: swiss.due_colour(colours.get(player, [])) for player in ranked}
+            if swiss._match(ranked, scores, dues, opponents, swiss.BACKTRACKING_LIMIT * len(ranked)) is None:
+                searches_given_up += 1
+            (pairs, _) = swiss.pair_round(players, scores, ratings, colours, opponents, set())
+            rematches = sum(1 for (white, black) in pairs if black in opponents.get(white, ()))
+            self.assertEqual(rematches, self._fewest_rematches(players, opponents))
+            for (white, black) in pairs:
+                white_score = rng.choice((1, 0, 0.5))
+                scores[white] = scores.get(white, 0) + white_score
+                scores[black] = scores.get(black, 0) + 1 - white_score
+                colours.setdefault(white, []).append(swiss.WHITE)
+                colours.setdefault(black, []).append(swiss.BLACK)
+                opponents.setdefault(white, set()).add(black)
+                opponents.setdefault(black, set()).add(white)
+        self.assertGreater(searches_given_up, 0)
+
+    def _fewest_rematches(self, players, opponents):
+        if not players:
+            return 0
+        (player, others) = (players[0], players[1:])
+        return min((other in opponents.get(player, ())) + self._fewest_rematches(
+            [remaining for remaining in others if remaining != other], opponents) for other in others)
+
+    def test_swiss_tournament_is_played_to_the_end(self):
+        pairings = self.tournament.create_initial_pairings()
+        met = set()
+        for round_number in range(1, 5):
+            self.assertEqual(len(pairings), 3)
+            self.assertEqual(Pairing.objects.filter(tournament=self.tournament, round=round_number,
+                                                    black_player__isnull=True).count(), 1)
+            for pairing in pairings:
+                players = frozenset((pairing.white_player_id, pairing.black_player_id))
+                self.assertNotIn(players, met)
+                met.add(players)
+                pairing_to_match_group_phase(pairing, pairing.white_player)
+            self.assertTrue(self.tournament.all_pairings_completed())
+            self.assertEqual(self.tournament.is_final, round_number == 4)
+            if round_number < 4:
+                pairings = self.tournament.next_pairings()
+        standings = self.tournament.get_swiss_standings()
+        self.assertEqual(sum(scores.points for (_, scores) in standings), 4 * 4)
+        self.assertEqual(self.tournament.decide_winner(None), standings[0][0])
+
+    def test_swiss_tournament_has_no_entry_cap(self):
+        self.assertFalse(self.tournament.is_full())
+        self.assertEqual(self.tournament.get_bracket(), [])
@@ -0,0 +1,47 @@
+"""Unit tests of the tie-breaks."""
+from django.test import TestCase
+from clubs.tiebreaks import compute_tiebreaks, rank_players, ROUND_ROBIN_TIEBREAKS, SWISS_TIEBREAKS
+
+
+class TieBreaksTestCase(TestCase):
+    """Unit tests of the tie-breaks."""
+
+    def setUp(self):
+        # A round robin of four where 1 and 3 finish on two points
+        self.players = [1, 2, 3, 4]
+        self.results = [(1, 2, 1), (3, 4, 0.5), (1, 3, 0), (2, 4, 1), (1, 4, 1), (2, 3, 0.5)]
+
+    def test_points_and_wins(self):
+        table = compute_tiebreaks(self.players, self.results)
+        self.assertEqual(list(table.points), [2, 1.5, 2, 0.5])
+        self.assertEqual(list(table.wins), [2, 1, 1, 0])
+
+    def test_buchholz_sums_the_points_of_the_opponents(self):
+        table = compute_tiebreaks(self.players, self.results)
+        self.assertEqual(list(table.buchholz), [4, 4.5, 4, 5.5])
+        self.assertEqual(list(table.median_buchholz), [1.5, 2, 1.5, 2])
+
+    def test_sonneborn_berger_weights_the_results_by_the_points_of_the_opponents(self):
+        table = compute_tiebreaks(self.players, self.results)
+        self.assertEqual(list(table.sonneborn_berger), [2, 1.5, 3, 1])
+
+    def test_direct_encounter_only_counts_players_on_the_same_points(self):
+        table = compute_tiebreaks(self.players, self.results)
+        self.assertEqual(list(table.direct_encounter), [0, 0, 1, 0])
+
+    def test_ranking_applies_the_tiebreaks_in_order(self):
+        ranking = rank_players(self.players, self.results, ROUND_ROBIN_TIEBREAKS)
+        self.assertEqual([player for (player, _) in ranking], [3, 1, 2, 4])
+
+    def test_players_level_on_everything_are_ranked_by_id(self):
+        ranking = rank_players([7, 5, 6], [], SWISS_TIEBREAKS)
+        self.assertEqual([player for (player, _) in ranking], [5, 6, 7])
+
+    def test_extra_points_count_towards_points_only(self):
+        table = compute_tiebreaks([1, 2, 3], [(1, 2, 1)], extra_points={3: 1})
+        self.assertEqual(list(table.points), [1, 0, 1])
+        self.assertEqual(list(table.buchholz), [0, 1, 0])
+
+    def test_games_with_other_players_are_ignored(self):
+        table = compute_tiebreaks([1, 2], [(1, 2, 0.5), (1, 9, 1)])
+        self.assertEqual(list(table.points), [0.5, 0.5])
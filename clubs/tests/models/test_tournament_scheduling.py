@@ -1,5 +1,7 @@
 """Unit tests of the tournament scheduling."""
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from clubs.models import User, Tournament, Match
 from .helpers import _create_test_users
 
@@ -134,3 +136,19 @@ class TournamentSchedulingTestCase(TestCase):
 
             for pairing in pairings:
                 _create_match_from_pairing(pairing)
+
+    def test_setting_up_a_tournament_does_not_query_per_pairing(self):
+        _create_test_users(45, 61)
+        query_counts = []
+        for number_of_participants in (35, 96):
+            tournament = Tournament.objects.create(club=self.tournament.club, organiser=self.tournament.organiser,
+                                                   name=f"Tournament of {number_of_participants}",
+                                                   description="Setup", deadline=self.tournament.deadline)
+            tournament.participants.set(list(User.objects.all())[10: 10 + number_of_participants])
+            with CaptureQueriesContext(connection) as queries:
+                tournament.create_initial_pairings()
+            query_counts.append(len(queries))
+            self.assertEqual(tournament.groups_within.count(), Tournament.NUMBER_OF_GROUPS)
+        # Only the batches SQLite splits the inserts into grow with the number of participants
+        self.assertLess(query_counts[1] - query_counts[0], 5)
+        self.assertLess(query_counts[1], 50)
@@ -0,0 +1,65 @@
+"""Unit tests of the snapshots of completed tournaments."""
+import json
+from django.test import TestCase
+from clubs.models import User, Club, Tournament, Match, TournamentSnapshot
+from .helpers import _create_test_users
+
+
+class TournamentSnapshotTestCase(TestCase):
+    """Unit tests of the snapshots of completed tournaments."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 4)
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        for player in self.players:
+            self.club.give_elo(player)
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.winner = None
+        self.tournament.save()
+        self.tournament.participants.set(self.players)
+
+    def _play_to_the_end(self):
+        pairings = self.tournament.create_initial_pairings()
+        while pairings:
+            matches = [Match.objects.create(pairing=pairing, winner=pairing.white_player,
+                                            loser=pairing.black_player, is_draw=False) for pairing in pairings]
+            self.tournament.advance_round(matches[-1])
+            pairings = list(self.tournament.get_open_pairings())
+
+    def test_completion_freezes_the_tournament(self):
+        self._play_to_the_end()
+        snapshot = TournamentSnapshot.objects.get(tournament=self.tournament).data
+        self.assertEqual(snapshot['tournament']['winner'], {'id': self.players[0].id,
+                                                            'name': self.players[0].full_name()})
+        self.assertEqual(len(snapshot['matches']), 3)
+        self.assertEqual([len(round) for round in snapshot['bracket']], [2, 1])
+        self.assertEqual([participant['id'] for participant in snapshot['participants']],
+                         [player.id for player in self.players])
+        self.assertEqual(snapshot['participants'][0]['mean_elo'], 1000)
+        self.assertEqual(snapshot['club']['name'], self.club.name)
+
+    def test_snapshot_is_plain_json(self):
+        self._play_to_the_end()
+        snapshot = TournamentSnapshot.objects.get(tournament=self.tournament).data
+        self.assertEqual(json.loads(json.dumps(snapshot)), snapshot)
+
+    def test_snapshot_is_not_changed_afterwards(self):
+        self._play_to_the_end()
+        self.players[0].first_name = "Renamed"
+        self.players[0].save()
+        self.tournament.freeze()
+        snapshot = TournamentSnapshot.objects.get(tournament=self.tournament).data
+        self.assertNotEqual(snapshot['tournament']['winner']['name'], self.players[0].full_name())
+
+    def test_swiss_snapshot_has_the_standings(self):
+        self.tournament.format = Tournament.Format.SWISS
+        self.tournament.number_of_rounds = 2
+        self.tournament.save()
+        self._play_to_the_end()
+        snapshot = TournamentSnapshot.objects.get(tournament=self.tournament).data
+        self.assertEqual(len(snapshot['swiss_standings']), 4)
+        self.assertEqual(snapshot['swiss_standings'][0]['points'], 2)
+        self.assertEqual(snapshot['bracket'], [])
@@ -0,0 +1,71 @@
+"""Unit tests of changes of state of tournaments made from stale copies, as concurrent requests would."""
+from django.test import TestCase
+from clubs.models import User, Club, Tournament, Match, UserStats
+from .helpers import _create_test_users
+
+
+def _white_wins(pairing):
+    return Match.objects.create(pairing=pairing, winner=pairing.white_player, loser=pairing.black_player,
+                                is_draw=False)
+
+
+class TournamentTransitionsTestCase(TestCase):
+    """Unit tests of changes of state of tournaments made from stale copies, as concurrent requests would."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json', 'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        _create_test_users(10, 4)
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.winner = None
+        self.tournament.save()
+
+    def _copies(self):
+        return (Tournament.objects.get(id=self.tournament.id), Tournament.objects.get(id=self.tournament.id))
+
+    def test_round_is_advanced_once(self):
+        self.tournament.participants.set(self.players)
+        first_round = self.tournament.create_initial_pairings()
+        (first, second) = self._copies()
+        matches = [_white_wins(pairing) for pairing in first_round]
+        first.advance_round(matches[0])
+        second.advance_round(matches[1])
+        self.assertEqual(self.tournament.pairings_within.filter(round=2).count(), 1)
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).round, 2)
+
+    def test_winner_is_counted_once(self):
+        self.tournament.participants.set(self.players[:2])
+        final = self.tournament.create_initial_pairings()
+        (first, second) = self._copies()
+        match = _white_wins(final[0])
+        first.advance_round(match)
+        second.advance_round(match)
+        stats = UserStats.objects.get(club=self.club, user=final[0].white_player)
+        self.assertEqual(stats.tournaments_won, 1)
+
+    def test_initial_pairings_are_created_once(self):
+        self.tournament.participants.set(self.players)
+        (first, second) = self._copies()
+        self.assertEqual(len(first.create_initial_pairings()), 2)
+        self.assertEqual(second.create_initial_pairings(), [])
+        self.assertEqual(self.tournament.pairings_within.count(), 3)
+
+    def test_joins_do_not_go_over_capacity(self):
+        User.objects.bulk_create([User(id=user_id, email=f"{user_id}@capacity.com", first_name="First",
+                                       last_name="Last") for user_id in range(100, 195)])
+        self.tournament.participants.set(User.objects.filter(id__gte=100))
+        (first, second) = self._copies()
+        self.assertFalse(second.is_full())
+        first.make_participant(self.players[0])
+        with self.assertRaises(ValueError):
+            second.make_participant(self.players[1])
+        self.assertEqual(self.tournament.participants.count(), Tournament.MAX_KNOCKOUT_PARTICIPANTS)
+
+    def test_saving_a_stale_copy_keeps_the_version(self):
+        (first, second) = self._copies()
+        first.lock()
+        second.description = "Changed"
+        second.save()
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).version, first.version)
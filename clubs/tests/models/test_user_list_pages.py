@@ -0,0 +1,98 @@
+"""Unit tests of the keyset pages of the user list of a club."""
+from django.db import connection
+from django.test import TestCase
+from clubs.models import User, Club, EloRating
+from clubs.pagination import after, keyset_page, encode_cursor
+from .helpers import _create_test_users
+
+
+class UserListPagesTestCase(TestCase):
+    """Unit tests of the keyset pages of the user list of a club."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json']
+
+    def setUp(self):
+        self.club = Club.objects.get(name='Saint Louis Chess Club')
+        # Every user of a club has a rating in it, the owner is given theirs when the club is created
+        self.club.give_elo(self.club.owner)
+        _create_test_users(10, 7)
+        for user in User.objects.filter(id__gte=10):
+            self.club.make_member(user)
+            # Three pairs of users share a rating, so the pages have to be told apart by id
+            EloRating.objects.filter(club=self.club, user=user).update(elo_rating=1000 + 100 * (user.id // 2))
+
+    def _all_pages(self, users, ordering, size):
+        (page, cursor) = keyset_page(users, ordering, None, size)
+        pages = [page]
+        while cursor:
+            (page, cursor) = keyset_page(users, ordering, cursor, size)
+            pages.append(page)
+        return pages
+
+    def test_pages_cover_every_user_once_in_order(self):
+        users = self.club.get_user_list()
+        pages = self._all_pages(users, ('-elo', 'id'), 3)
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        listed = [user.id for page in pages for user in page]
+        self.assertEqual(listed, [user.id for user in users.order_by('-elo', 'id')])
+
+    def test_users_are_annotated_with_role_and_elo(self):
+        users = {user.id: user for user in self.club.get_user_list()}
+        self.assertEqual(users[self.club.owner_id].role, "Owner")
+        self.assertEqual(users[10].role, "Member")
+        self.assertEqual(users[10].elo, 1500)
+        self.assertEqual(users[self.club.owner_id].elo, 1000)
+
+    def test_members_only_lists_the_members(self):
+        self.assertNotIn(self.club.owner_id, [user.id for user in self.club.get_user_list(members_only=True)])
+
+    def test_filters(self):
+        self.assertEqual(list(self.club.get_user_list(role="Owner").values_list('id', flat=True)),
+                         [self.club.owner_id])
+        User.objects.filter(id=12).update(chess_exp="Expert")
+        self.assertEqual(list(self.club.get_user_list(experience="Expert").values_list('id', flat=True)), [12])
+
+    def test_page_is_one_query(self):
+        (_, cursor) = keyset_page(self.club.get_user_list(), ('-elo', 'id'), None, 3)
+        with self.assertNumQueries(1):
+            keyset_page(self.club.get_user_list(), ('-elo', 'id'), cursor, 3)
+
+    def test_invalid_cursor_starts_from_the_first_page(self):
+        users = self.club.get_user_list()
+        first_page = keyset_page(users, ('last_name', 'id'), None, 3)
+        self.assertEqual(keyset_page(users, ('last_name', 'id'), "not a cursor", 3), first_page)
+        self.assertEqual(keyset_page(users, ('last_name', 'id'), encode_cursor([1]), 3), first_page)
+
+    def test_cursor_with_values_of_the_wrong_type_starts_from_the_first_page(self):
+        users = self.club.get_user_list()
+        first_page = keyset_page(users, ('-elo', 'id'), None, 3)
+        for values in (["abc", "x"], [None, 1], [1000, [2]], [{}, 1]):
+            self.assertEqual(keyset_page(users, ('-elo', 'id'), encode_cursor(values), 3), first_page)
+
+    def test_rated_pages_cover_every_user_once_in_order(self):
+        ratings = self.club.get_rated_user_list()
+        pages = self._all_pages(ratings, ('-elo_rating', 'user_id'), 3)
+        listed = [rating.get_listed_user() for page in pages for rating in page]
+        self.assertEqual([user.id for user in listed],
+                         [user.id for user in self.club.get_user_list().order_by('-elo', 'id')])
+        self.assertEqual({user.role for user in listed}, {"Owner", "Member"})
+        self.assertEqual([user.elo for user in listed], sorted((user.elo for user in listed), reverse=True))
+
+    def test_rated_list_filters(self):
+        self.assertEqual([rating.user_id for rating in self.club.get_rated_user_list(members_only=True)],
+                         list(range(10, 17)))
+        self.assertEqual([rating.user_id for rating in self.club.get_rated_user_list(role="Owner")],
+                         [self.club.owner_id])
+        self.assertEqual(list(self.club.get_rated_user_list(members_only=True, role="Owner")), [])
+        User.objects.filter(id=12).update(chess_exp="Expert")
+        self.assertEqual([rating.user_id for rating in self.club.get_rated_user_list(experience="Expert")], [12])
+
+    def test_rated_page_seeks_the_rating_index(self):
+        ordering = ('-elo_rating', 'user_id')
+        page = self.club.get_rated_user_list().filter(after(ordering, [1300, 12])).order_by(*ordering)[:4]
+        (sql, params) = page.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("elo_rating<", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
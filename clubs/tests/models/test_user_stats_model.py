@@ -0,0 +1,69 @@
+"""Unit tests of the user stats model."""
+from django.test import TestCase
+from clubs.models import Club, Pairing, Tournament, User, UserStats, pairing_to_match_group_phase, \
+    pairing_to_match_elimination_phase
+
+
+class UserStatsModelTestCase(TestCase):
+    """Unit tests of the user stats model."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+        "clubs/tests/fixtures/default_tournament.json",
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.winner = None
+        self.tournament.save()
+        self.tournament.participants.clear()
+        self.jane = User.objects.get(email="janedoe@example.com")
+        self.bob = User.objects.get(email="bobdoe@example.com")
+        for player in (self.jane, self.bob):
+            self.club.make_member(player)
+            self.tournament.make_participant(player)
+        self.pairing = Pairing.objects.create(tournament=self.tournament, white_player=self.jane,
+                                              black_player=self.bob, round=1)
+
+    def test_user_without_games_has_empty_stats(self):
+        stats = User.objects.get(email="johndoe@example.com").get_stats()
+        self.assertEqual(stats.matches_played, 0)
+        self.assertIsNone(stats.pk)
+
+    def test_joining_counts_participation_in_club_and_globally(self):
+        self.assertEqual(self.jane.get_stats().tournaments_participated_in, 1)
+        self.assertEqual(self.jane.get_stats(self.club).tournaments_participated_in, 1)
+        self.tournament.remove_participant(self.jane)
+        self.assertEqual(self.jane.get_stats().tournaments_participated_in, 0)
+
+    def test_win_is_counted(self):
+        pairing_to_match_group_phase(self.pairing, self.jane)
+        jane_stats = self.jane.get_stats(self.club)
+        bob_stats = self.bob.get_stats()
+        self.assertEqual((jane_stats.matches_played, jane_stats.matches_won, jane_stats.matches_lost), (1, 1, 0))
+        self.assertEqual((bob_stats.matches_played, bob_stats.matches_won, bob_stats.matches_lost), (1, 0, 1))
+
+    def test_draw_is_counted(self):
+        pairing_to_match_elimination_phase(self.pairing)
+        for player in (self.jane, self.bob):
+            stats = player.get_stats()
+            self.assertEqual((stats.matches_played, stats.matches_drawn, stats.matches_won), (1, 1, 0))
+
+    def test_tournament_winner_is_counted(self):
+        self.tournament.set_winner(self.bob)
+        self.assertEqual(self.bob.get_stats().tournaments_won, 1)
+        self.assertEqual(self.jane.get_stats().tournaments_lost, 1)
+        self.assertEqual(self.jane.get_stats().get_number_of_tournaments_ongoing(), 0)
+
+    def test_changing_the_tournament_winner_moves_the_counts(self):
+        self.tournament.set_winner(self.bob)
+        self.tournament.set_winner(self.jane)
+        self.assertEqual((self.bob.get_stats().tournaments_won, self.bob.get_stats().tournaments_lost), (0, 1))
+        self.assertEqual((self.jane.get_stats().tournaments_won, self.jane.get_stats().tournaments_lost), (1, 0))
+
+    def test_each_user_has_one_global_row(self):
+        pairing_to_match_group_phase(self.pairing, self.jane)
+        self.assertEqual(UserStats.objects.filter(user=self.jane, club__isnull=True).count(), 1)
+        self.assertEqual(UserStats.objects.filter(user=self.jane, club=self.club).count(), 1)
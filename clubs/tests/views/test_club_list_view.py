@@ -1,7 +1,9 @@
 """Unit tests of the club list view."""
 from django.test import TestCase
 from django.urls import reverse
-from clubs.models import User, Club
+from clubs.models import User, Club, ClubApplication
+from clubs.pagination import encode_cursor
+from clubs.views import CLUB_LIST_PAGE_SIZE
 from clubs.tests.views.helpers import reverse_with_next, give_all_missing_elos
 
 
@@ -42,3 +44,58 @@ class ClubListTest(TestCase):
         redirect_url = reverse_with_next("log_in", self.url)
         response = self.client.get(self.url)
         self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+
+    def test_club_list_query_count_does_not_grow_with_clubs(self):
+        self.client.login(email=self.user.email, password="Password123")
+        self.client.get(self.url)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+        for i in range(10):
+            new_club = Club.objects.create(name=f"Club {i}", location="London", owner=self.user)
+            new_club.give_elo(self.user)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+    def test_search_matches_the_start_of_the_name_or_the_location(self):
+        Club.objects.create(name="Kings Club", location="Leeds", owner=self.user)
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url, {"q": "kIN"})
+        self.assertEqual([listed_club.name for listed_club in response.context["clubs"]], ["Kings Club"])
+        response = self.client.get(self.url, {"q": "leeds"})
+        self.assertEqual([listed_club.name for listed_club in response.context["clubs"]], ["Kings Club"])
+        response = self.client.get(self.url, {"q": "ngs"})
+        self.assertEqual(list(response.context["clubs"]), [])
+
+    def test_pages_follow_each_other(self):
+        for i in range(CLUB_LIST_PAGE_SIZE):
+            Club.objects.create(name=f"Club {i:02}", location="London", owner=self.user)
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url)
+        first_page = [listed_club.id for listed_club in response.context["clubs"]]
+        self.assertEqual(len(first_page), CLUB_LIST_PAGE_SIZE)
+        self.assertContains(response, "More clubs")
+        response = self.client.get(self.url, {"after": response.context["next_cursor"]})
+        second_page = [listed_club.id for listed_club in response.context["clubs"]]
+        self.assertIsNone(response.context["next_cursor"])
+        self.assertEqual(sorted(first_page + second_page), sorted(Club.objects.values_list('id', flat=True)))
+
+    def test_clubs_show_the_status_of_the_user(self):
+        other_owner = User.objects.create_user(email="owner@example.com", first_name="Other", last_name="Owner",
+                                               chess_exp="Beginner")
+        other_club = Club.objects.create(name="Kings Club", location="Leeds", owner=other_owner)
+        other_club.make_applicant(self.user)
+        ClubApplication.objects.create(associated_club=other_club, associated_user=self.user, is_rejected=True)
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url)
+        statuses = {listed_club.id: (listed_club.role, listed_club.application_rejected)
+                    for listed_club in response.context["clubs"]}
+        self.assertEqual(statuses[other_club.id], ("Applicant", True))
+        self.assertEqual(statuses[self.club.id], ("Owner", None))
+        self.assertContains(response, "Status: Rejected")
+
+    def test_cursor_with_values_of_the_wrong_type_starts_from_the_first_page(self):
+        self.client.login(email=self.user.email, password="Password123")
+        for values in ([None, 1], ["Club", "x"]):
+            response = self.client.get(self.url, {"after": encode_cursor(values)})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context["clubs"]), 2)
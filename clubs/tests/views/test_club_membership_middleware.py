@@ -0,0 +1,55 @@
+"""Unit tests of the club membership middleware"""
+from django.test import TestCase
+from django.urls import reverse
+from clubs.middleware import UserMemberships
+from clubs.models import User, Club
+
+
+class ClubMembershipMiddlewareTest(TestCase):
+    """Unit tests of the club membership middleware"""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+        "clubs/tests/fixtures/other_clubs.json",
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(email="johndoe@example.com")
+        self.jane = User.objects.get(email="janedoe@example.com")
+        self.bob = User.objects.get(email="bobdoe@example.com")
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.other_club = Club.objects.get(name="Saint Louis Chess Club 2")
+
+    def test_memberships_of_owner(self):
+        memberships = UserMemberships(self.user)
+        self.assertEqual(memberships.clubs, [self.club, self.other_club])
+        self.assertEqual(memberships.user_level(self.club), "Owner")
+        self.assertEqual(memberships.managed_club_ids, {self.club.id, self.other_club.id})
+
+    def test_memberships_of_member_and_applicant(self):
+        self.club.make_member(self.jane)
+        self.other_club.make_applicant(self.jane)
+        memberships = UserMemberships(self.jane)
+        self.assertEqual(memberships.clubs, [self.club])
+        self.assertEqual(memberships.user_level(self.club), "Member")
+        self.assertEqual(memberships.user_level(self.other_club), "Applicant")
+        self.assertEqual(memberships.managed_club_ids, set())
+
+    def test_memberships_are_loaded_in_one_query(self):
+        self.club.make_member(self.jane)
+        self.other_club.make_member(self.jane)
+        self.other_club.make_officer(self.jane)
+        with self.assertNumQueries(1):
+            memberships = UserMemberships(self.jane)
+        self.assertEqual(memberships.user_level(self.other_club), "Officer")
+
+    def test_home_page_query_count_does_not_grow_with_clubs(self):
+        self.client.login(email=self.user.email, password="Password123")
+        self.client.get(reverse("home_page"))
+        with self.assertNumQueries(5):
+            self.client.get(reverse("home_page"))
+        for i in range(10):
+            Club.objects.create(name=f"Club {i}", location="London", owner=self.bob)
+        with self.assertNumQueries(5):
+            self.client.get(reverse("home_page"))
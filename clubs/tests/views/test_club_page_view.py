@@ -105,3 +105,12 @@ class ClubPageViewTest(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "You are the <b>owner</b> of this club.")
+
+    def test_leaderboard_link_is_shown_to_members_only(self):
+        leaderboard_url = reverse("leaderboard", kwargs={"club_id": self.club.id})
+        self.client.login(email=self.alice.email, password="Password123")
+        self.assertNotContains(self.client.get(self.url), leaderboard_url)
+        self.club.make_applicant(self.alice)
+        self.assertNotContains(self.client.get(self.url), leaderboard_url)
+        self.club.make_member(self.alice)
+        self.assertContains(self.client.get(self.url), leaderboard_url)
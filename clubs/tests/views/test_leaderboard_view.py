@@ -0,0 +1,78 @@
+"""Unit tests of the leaderboard view"""
+from django.test import TestCase
+from django.urls import reverse
+from clubs.models import User, Club, EloRating, rebuild_leaderboard
+from clubs.tests.models.helpers import _create_test_users
+from clubs.tests.views.helpers import reverse_with_next
+import clubs.views
+
+
+class LeaderboardViewTest(TestCase):
+    """Unit tests of the leaderboard view"""
+    fixtures = ["clubs/tests/fixtures/default_user.json", "clubs/tests/fixtures/other_users.json",
+                "clubs/tests/fixtures/default_club.json"]
+
+    def setUp(self):
+        self.user = User.objects.get(email="johndoe@example.com")
+        self.jane = User.objects.get(email="janedoe@example.com")
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.club.give_elo(self.user)
+        _create_test_users(10, 60)
+        for player in User.objects.filter(id__gte=10):
+            self.club.make_member(player)
+        self.url = reverse("leaderboard", kwargs={"club_id": self.club.id})
+
+    def test_leaderboard_url(self):
+        self.assertEqual(self.url, f"/club/{self.club.id}/leaderboard")
+
+    def test_get_leaderboard_redirects_when_not_logged_in(self):
+        redirect_url = reverse_with_next("log_in", self.url)
+        response = self.client.get(self.url)
+        self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+
+    def test_get_leaderboard_is_paged(self):
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url, {"page": 2})
+        self.assertTemplateUsed(response, "leaderboard.html")
+        self.assertEqual(response.context["number_of_pages"], 2)
+        self.assertEqual(len(response.context["entries"]), 11)
+        self.assertEqual(response.context["user_entry"].user, self.user)
+
+    def test_find_me_opens_the_page_of_the_user(self):
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url, {"find_me": 1})
+        self.assertEqual(response.context["page_number"],
+                         (self.club.get_leaderboard_entry(self.user).position - 1) // clubs.views.LEADERBOARD_PAGE_SIZE + 1)
+
+    def test_invalid_page_shows_the_first_page(self):
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url, {"page": "last"})
+        self.assertEqual(response.context["page_number"], 1)
+
+    def test_top_player_is_rated_at_least_as_high_as_the_whole_club(self):
+        EloRating.objects.filter(club=self.club, user=self.user).update(elo_rating=2000)
+        rebuild_leaderboard(self.club.id)
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url)
+        self.assertContains(response, "You are ranked <b>1</b>")
+        self.assertContains(response, "rated at least as high as 100.0% of the club")
+
+    def test_bottom_player_is_rated_at_least_as_high_as_only_themselves(self):
+        EloRating.objects.filter(club=self.club, user=self.user).update(elo_rating=500)
+        rebuild_leaderboard(self.club.id)
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url)
+        self.assertContains(response, "You are ranked <b>61</b>")
+        self.assertContains(response, "rated at least as high as 1.6% of the club")
+        self.assertNotContains(response, "in the top")
+
+    def test_page_query_count_does_not_grow_with_the_club(self):
+        self.client.login(email=self.user.email, password="Password123")
+        self.client.get(self.url)
+        with self.assertNumQueries(7):
+            self.client.get(self.url)
+
+    def test_non_member_has_no_access(self):
+        self.client.login(email=self.jane.email, password="Password123")
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(response, "no_access_screen.html")
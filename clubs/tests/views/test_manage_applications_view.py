@@ -3,6 +3,8 @@ from django.test import TestCase
 from clubs.models import User, Club, ClubApplication, EloRating
 from django.urls import reverse
 from clubs.tests.views.helpers import reverse_with_next, give_all_missing_elos
+from clubs.pagination import encode_cursor
+from clubs.views import APPLICATION_INBOX_PAGE_SIZE
 
 
 class ManageApplicationViewTest(TestCase):
@@ -62,8 +64,7 @@ class ManageApplicationViewTest(TestCase):
         self.client.login(email=self.second_user.email, password='Password123')
         self.client.post(self.apply_url, {'name': self.second_club.name})
         before_count = ClubApplication.objects.count()
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.second_club.name, 'accepted': True})
+        self._decide(self.second_user, self.second_club, 'accepted')
 
         after_count = ClubApplication.objects.count()
         self.assertEqual(after_count, before_count - 1)
@@ -72,8 +73,7 @@ class ManageApplicationViewTest(TestCase):
         self.client.login(email=self.second_user.email, password='Password123')
         self.client.post(self.apply_url, {'name': self.second_club.name})
         before_count = ClubApplication.objects.count()
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.second_club.name, 'rejected': True})
+        self._decide(self.second_user, self.second_club, 'rejected')
 
         after_count = ClubApplication.objects.count()
         self.assertEqual(after_count, before_count)
@@ -83,8 +83,7 @@ class ManageApplicationViewTest(TestCase):
         self.client.post(self.apply_url, {'name': self.second_club.name})
         c_initial = ClubApplication.objects.get(associated_club=self.second_club, associated_user=self.second_user)
         self.assertFalse(c_initial.is_rejected)
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.second_club.name, 'rejected': True})
+        self._decide(self.second_user, self.second_club, 'rejected')
 
         c = ClubApplication.objects.get(associated_club=self.second_club, associated_user=self.second_user)
         self.assertTrue(c.is_rejected)
@@ -104,10 +103,8 @@ class ManageApplicationViewTest(TestCase):
         self.client.post(self.apply_url, {'name': self.second_club.name})
         before_count = ClubApplication.objects.count()
 
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.first_club.name, 'accepted': True})
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.second_club.name, 'accepted': True})
+        self._decide(self.second_user, self.first_club, 'accepted')
+        self._decide(self.second_user, self.second_club, 'accepted')
         after_count = ClubApplication.objects.count()
 
         self.assertEqual(before_count - 2, after_count)
@@ -126,10 +123,8 @@ class ManageApplicationViewTest(TestCase):
         self.assertFalse(c2.is_rejected)
 
         before_rejected_count = ClubApplication.objects.count()
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.first_club.name, 'rejected': True})
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.second_club.name, 'rejected': True})
+        self._decide(self.second_user, self.first_club, 'rejected')
+        self._decide(self.second_user, self.second_club, 'rejected')
 
         after_rejected_count = ClubApplication.objects.count()
         self.assertEqual(after_rejected_count, before_rejected_count)
@@ -146,21 +141,69 @@ class ManageApplicationViewTest(TestCase):
         self.client.login(email=self.first_user.email, password='Password123')
         self.client.post(self.apply_url, {'name': self.first_club.name})
         with self.assertRaises(ValueError):
-            self.client.post(self.url, {'uname': self.first_user.email,
-                                        'clubname': self.first_club.name, 'accepted': True})
+            self._decide(self.first_user, self.first_club, 'accepted')
 
     def test_user_cannot_apply_to_their_club(self):
         self.client.login(email=self.second_user.email, password='Password123')
         self.client.post(self.apply_url, {'name': self.second_club.name})
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.second_club.name, 'accepted': True})
+        self._decide(self.second_user, self.second_club, 'accepted')
 
         self.client.login(email=self.second_user.email, password='Password123')
         self.client.post(self.apply_url, {'name': self.second_club.name})
 
         with self.assertRaises(ValueError):
-            self.client.post(self.url, {'uname': self.second_user.email,
-                                        'clubname': self.second_club.name, 'accepted': True})
+            self._decide(self.second_user, self.second_club, 'accepted')
+
+    def test_applicant_cannot_decide_on_their_application(self):
+        self.client.login(email=self.second_user.email, password='Password123')
+        self.client.post(self.apply_url, {'name': self.second_club.name})
+        application = ClubApplication.objects.get(associated_club=self.second_club, associated_user=self.second_user)
+        response = self.client.post(self.url, {'application': application.id, 'accepted': True})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.second_club.user_level(self.second_user), "Applicant")
+
+    def test_decision_on_a_malformed_application_id_is_not_found(self):
+        self.client.login(email=self.first_user.email, password='Password123')
+        for application_id in ("abc", "", "1.5", "\u00b2"):
+            response = self.client.post(self.url, {'application': application_id, 'accepted': True})
+            self.assertEqual(response.status_code, 404)
+        response = self.client.post(self.url, {'rejected': True})
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(ClubApplication.objects.filter(id=self.first_club_application.id, is_rejected=False).exists())
+
+    def test_inbox_only_lists_open_applications_of_managed_clubs(self):
+        other_owner = User.objects.create_user(email="owner@example.com", first_name="Other", last_name="Owner",
+                                               chess_exp="Beginner")
+        other_club = Club.objects.create(name="Kings Club", location="Leeds", owner=other_owner)
+        ClubApplication.objects.create(associated_club=other_club, associated_user=self.second_user)
+        rejected = ClubApplication.objects.create(associated_club=self.second_club, associated_user=self.second_user,
+                                                  is_rejected=True)
+        self.client.login(email=self.first_user.email, password="Password123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["applications"], [self.first_club_application])
+        self.assertNotIn(rejected, response.context["applications"])
+
+    def test_inbox_is_paged_newest_first(self):
+        for user_id in range(100, 100 + APPLICATION_INBOX_PAGE_SIZE):
+            applicant = User.objects.create_user(id=user_id, email=f"{user_id}@test.com", first_name="First",
+                                                 last_name="Last", chess_exp="Beginner")
+            ClubApplication.objects.create(associated_club=self.second_club, associated_user=applicant)
+        self.client.login(email=self.first_user.email, password="Password123")
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        first_page = response.context["applications"]
+        self.assertEqual(len(first_page), APPLICATION_INBOX_PAGE_SIZE)
+        self.assertEqual(first_page[0].associated_user_id, 100 + APPLICATION_INBOX_PAGE_SIZE - 1)
+        response = self.client.get(self.url, {"after": response.context["next_cursor"]})
+        self.assertEqual(response.context["applications"], [self.first_club_application])
+        self.assertIsNone(response.context["next_cursor"])
+
+    def test_cursor_with_values_of_the_wrong_type_starts_from_the_first_page(self):
+        self.client.login(email=self.first_user.email, password="Password123")
+        for values in (["not a date", 1], [None, 1], ["2026-10-18T10:00:00+00:00", "x"]):
+            response = self.client.get(self.url, {"after": encode_cursor(values)})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context["applications"], [self.first_club_application])
 
     def test_only_officers_and_owners_can_see_manage_applications_navbar_icon(self):
         self.client.login(email=self.first_user.email, password='Password123')
@@ -173,10 +216,16 @@ class ManageApplicationViewTest(TestCase):
     def test_users_can_not_see_manage_applications_navbar_icon(self):
         self.client.login(email=self.second_user.email, password='Password123')
         self.client.post(self.apply_url, {'name': self.second_club.name})
-        self.client.post(self.url, {'uname': self.second_user.email,
-                                    'clubname': self.second_club.name, 'accepted': True})
+        self._decide(self.second_user, self.second_club, 'accepted')
         select_club = self.client.get('/2/users')
         html_content = str(select_club.content)
         str_to_test = """href="/manage_applications">"""
         res = str_to_test in html_content
         self.assertFalse(res)
+
+    def _decide(self, applicant, applied_club, decision):
+        application = ClubApplication.objects.filter(associated_club=applied_club, associated_user=applicant,
+                                                     is_rejected=False).latest('id')
+        self.client.login(email=self.first_user.email, password='Password123')
+        self.client.post(self.url, {'application': application.id, decision: True})
+        self.client.login(email=applicant.email, password='Password123')
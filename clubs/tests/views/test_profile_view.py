@@ -1,5 +1,7 @@
 """Unit tests of the profile view"""
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from clubs.models import Tournament, User, Club, EloRating
 from django.urls import reverse
 from clubs.tests.views.helpers import reverse_with_next
@@ -37,7 +39,7 @@ class ProfileViewTest(TestCase):
         EloRating.objects.filter(user=self.target_user, club=self.club).delete()
         self.club.make_member(self.target_user)
         self.club.make_officer(self.target_user)
-        self.tournament.participants.add(self.target_user)
+        self.tournament.make_participant(self.target_user)
 
         response = self.client.get(self.url, follow=True)
         self.assertEqual(response.status_code, 200)
@@ -51,6 +53,20 @@ class ProfileViewTest(TestCase):
         self.assertContains(response, "<b>Tournaments participated in:</b> 1")
         self.assertContains(response, "<b>Tournaments won:</b> 0")
 
+    def test_number_of_queries_does_not_grow_with_the_clubs(self):
+        self.club.make_member(self.target_user)
+        self.client.login(email=self.user.email, password="Password123")
+        with CaptureQueriesContext(connection) as one_club:
+            self.client.get(self.url)
+        for number in range(3):
+            other_club = Club.objects.create(name=f"Club {number}", location="Leeds", owner=self.bob)
+            other_club.make_member(self.target_user)
+            other_club.give_elo(self.target_user)
+        with CaptureQueriesContext(connection) as four_clubs:
+            response = self.client.get(self.url)
+        self.assertContains(response, "<b>Number of clubs:</b> 4")
+        self.assertEqual(len(four_clubs), len(one_club))
+
     def test_get_profile_with_own_id(self):
         self.client.login(email=self.user.email, password="Password123")
         url = reverse("profile", kwargs={"user_id": self.user.id})
@@ -0,0 +1,43 @@
+"""Unit tests of the search and autocomplete views."""
+from django.test import TestCase
+from django.urls import reverse
+from clubs.models import User, Club
+from clubs.tests.views.helpers import reverse_with_next
+
+
+class SearchViewTest(TestCase):
+    """Unit tests of the search and autocomplete views."""
+    fixtures = ["clubs/tests/fixtures/default_user.json", "clubs/tests/fixtures/default_club.json"]
+
+    def setUp(self):
+        self.user = User.objects.get(email="johndoe@example.com")
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        self.url = reverse("search")
+        self.autocomplete_url = reverse("search_autocomplete")
+
+    def test_search_urls(self):
+        self.assertEqual(self.url, "/search")
+        self.assertEqual(self.autocomplete_url, "/search/autocomplete")
+
+    def test_search_redirects_when_not_logged_in(self):
+        response = self.client.get(self.url, {"q": "chess"})
+        self.assertRedirects(response, reverse_with_next("log_in", self.url) + "%3Fq%3Dchess", status_code=302,
+                             target_status_code=200)
+
+    def test_search(self):
+        self.client.login(email=self.user.email, password="Password123")
+        results = self.client.get(self.url, {"q": "saint louis"}).json()
+        self.assertEqual(results["clubs"], [{"id": self.club.id, "name": self.club.name,
+                                             "location": self.club.location,
+                                             "url": reverse("club_page", args=[self.club.id])}])
+        self.assertEqual(results["users"], [])
+
+    def test_autocomplete(self):
+        self.client.login(email=self.user.email, password="Password123")
+        results = self.client.get(self.autocomplete_url, {"q": "joh"}).json()
+        self.assertEqual(results["users"], [{"id": self.user.id, "name": "John Doe",
+                                             "url": reverse("profile", args=[self.user.id])}])
+
+    def test_empty_query(self):
+        self.client.login(email=self.user.email, password="Password123")
+        self.assertEqual(self.client.get(self.url).json(), {"clubs": [], "users": []})
@@ -0,0 +1,94 @@
+"""Unit tests of the view that records the results of a whole round."""
+import json
+from django.test import TestCase
+from django.urls import reverse
+from clubs.models import Tournament, User, Club, Match
+from clubs.tests.models.helpers import _create_test_users
+
+
+class SubmitRoundResultsViewTest(TestCase):
+    """Unit tests of the view that records the results of a whole round."""
+    fixtures = [
+        "clubs/tests/fixtures/default_user.json",
+        "clubs/tests/fixtures/other_users.json",
+        "clubs/tests/fixtures/default_club.json",
+        "clubs/tests/fixtures/default_tournament.json",
+    ]
+
+    def setUp(self):
+        self.organiser = User.objects.get(email="johndoe@example.com")
+        self.coorganiser = User.objects.get(email="janedoe@example.com")
+        self.club = Club.objects.get(name="Saint Louis Chess Club")
+        _create_test_users(10, 4)
+        self.players = list(User.objects.filter(id__gte=10).order_by('id'))
+        for player in self.players:
+            self.club.give_elo(player)
+        self.tournament = Tournament.objects.get(name="Saint Louis Chess Tournament")
+        self.tournament.winner = None
+        self.tournament.save()
+        self.tournament.participants.set(self.players)
+        self.pairings = self.tournament.create_initial_pairings()
+        self.url = reverse("submit_round_results", kwargs={"tournament_id": self.tournament.id})
+
+    def _post_json(self, results):
+        return self.client.post(self.url, json.dumps({"results": results}), content_type="application/json")
+
+    def test_submit_round_results_url(self):
+        self.assertEqual(self.url, f"/tournament/{self.tournament.id}/results")
+
+    def test_json_results_record_the_round(self):
+        self.client.login(email=self.coorganiser.email, password="Password123")
+        response = self._post_json([{"pairing": pairing.id, "winner": pairing.black_player_id}
+                                    for pairing in self.pairings])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"recorded": 2, "round": 2, "winner": None})
+        self.assertEqual(Match.objects.filter(pairing__tournament=self.tournament).count(), 2)
+
+    def test_invalid_json_results_are_rejected(self):
+        self.client.login(email=self.organiser.email, password="Password123")
+        response = self._post_json([{"pairing": self.pairings[0].id, "winner": self.organiser.id}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+        response = self.client.post(self.url, "not json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Match.objects.filter(pairing__tournament=self.tournament).exists())
+
+    def test_form_results_record_the_round(self):
+        self.client.login(email=self.organiser.email, password="Password123")
+        response = self.client.post(self.url, {f"pairing_{self.pairings[0].id}": self.pairings[0].white_player_id,
+                                               f"pairing_{self.pairings[1].id}": "draw"})
+        self.assertRedirects(response, reverse("view_tournament", kwargs={"tournament_id": self.tournament.id}),
+                             fetch_redirect_response=False)
+        self.assertEqual(Match.objects.filter(pairing__tournament=self.tournament).count(), 2)
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).round, 2)
+
+    def test_empty_form_records_nothing(self):
+        self.client.login(email=self.organiser.email, password="Password123")
+        self.client.post(self.url, {})
+        self.assertFalse(Match.objects.filter(pairing__tournament=self.tournament).exists())
+
+    def test_only_organisers_can_submit_results(self):
+        self.client.login(email="alicedoe@example.com", password="Password123")
+        response = self._post_json([{"pairing": self.pairings[0].id, "winner": None}])
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Match.objects.filter(pairing__tournament=self.tournament).exists())
+
+    def test_get_is_not_allowed(self):
+        self.client.login(email=self.organiser.email, password="Password123")
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_tournament_page_has_the_round_form(self):
+        Tournament.objects.filter(id=self.tournament.id).update(deadline="2000-01-01T00:00:00+00:00")
+        self.client.login(email=self.organiser.email, password="Password123")
+        response = self.client.get(reverse("view_tournament", kwargs={"tournament_id": self.tournament.id}))
+        self.assertContains(response, "Results of round 1")
+        self.assertContains(response, f'name="pairing_{self.pairings[0].id}"')
+
+    def test_tournament_page_has_the_round_form_for_coorganisers(self):
+        Tournament.objects.filter(id=self.tournament.id).update(deadline="2000-01-01T00:00:00+00:00")
+        self.client.login(email=self.coorganiser.email, password="Password123")
+        response = self.client.get(reverse("view_tournament", kwargs={"tournament_id": self.tournament.id}))
+        self.assertContains(response, "Results of round 1")
+        self.client.login(email="alicedoe@example.com", password="Password123")
+        response = self.client.get(reverse("view_tournament", kwargs={"tournament_id": self.tournament.id}))
+        self.assertNotContains(response, "Results of round 1")
@@ -1,7 +1,11 @@
 """Unit tests of the view tournament view"""
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from clubs.models import Tournament, User, Club
+from unittest.mock import patch
+from clubs.models import EloRatingHistory, Tournament, TournamentPrediction, User, Club
+from clubs.predictions import refresh_prediction
 from clubs.tests.models.helpers import _create_test_users
 from clubs.tests.views.helpers import reverse_with_next
 from datetime import datetime, timedelta
@@ -211,3 +215,124 @@ class ViewTournamentTest(TestCase):
         self.client.post(late_t_url, {'Leave_tournament': True})
         # after joining, should still be in tournament
         self.assertIn(self.jane, late_tournament.get_all_participants())
+
+    def test_swiss_tournament_shows_standings_with_tiebreaks(self):
+        self.create_two_members_for_club(self.other_club, self.jane, self.michael)
+        swiss_tournament = Tournament.objects.create(
+            club=self.other_club,
+            name="Swiss Tournament",
+            organiser=self.user,
+            deadline=make_aware(datetime.now() - timedelta(minutes=5)),
+            format=Tournament.Format.SWISS,
+        )
+        swiss_tournament.make_participant(self.jane)
+        swiss_tournament.make_participant(self.michael)
+        swiss_tournament.create_initial_pairings()
+
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(reverse("view_tournament", kwargs={"tournament_id": swiss_tournament.id}))
+        self.assertContains(response, "Standings")
+        self.assertContains(response, "Buchholz")
+
+    def test_completed_tournament_is_shown_from_its_snapshot(self):
+        self.tournament.freeze()
+        self.client.login(email=self.user.email, password="Password123")
+        with self.assertNumQueries(4):
+            # The session, the user, the clubs of the navigation bar and the snapshot
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "view_tournament.html")
+        self.assertContains(response, "won this tournament, congratulations!")
+        self.assertContains(response, "Saint Louis Chess Tournament")
+        for participant in self.tournament.participants.all():
+            self.assertContains(response, participant.full_name())
+
+    def test_number_of_queries_does_not_grow_with_the_tournament(self):
+        _create_test_users(100, 16)
+        players = list(User.objects.filter(id__gte=100))
+        for player in players:
+            self.club.give_elo(player)
+        self.client.login(email=self.user.email, password="Password123")
+
+        def queries(number_of_players):
+            tournament = Tournament.objects.create(
+                club=self.club, name=f"Tournament of {number_of_players}", organiser=self.user,
+                deadline=make_aware(datetime.now() - timedelta(minutes=5)))
+            tournament.participants.set(players[:number_of_players])
+            first_round = tournament.create_initial_pairings()
+            tournament.record_round_results([(pairing.id, pairing.white_player_id) for pairing in first_round[1:]])
+            url = reverse("view_tournament", kwargs={"tournament_id": tournament.id})
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        self.assertEqual(queries(4), queries(16))
+
+    def test_organiser_sees_the_open_pairings(self):
+        _create_test_users(100, 4)
+        players = list(User.objects.filter(id__gte=100))
+        for player in players:
+            self.club.give_elo(player)
+        tournament = Tournament.objects.create(club=self.club, name="Open pairings", organiser=self.user,
+                                               deadline=make_aware(datetime.now() - timedelta(minutes=5)))
+        tournament.participants.set(players)
+        first_round = tournament.create_initial_pairings()
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(reverse("view_tournament", kwargs={"tournament_id": tournament.id}))
+        open_pairings = response.context["page"]["live"]["open_pairings"]
+        self.assertEqual([pairing["id"] for pairing in open_pairings], [pairing.id for pairing in first_round])
+        self.assertContains(response, "Click the player who won the match!")
+        self.assertContains(response, first_round[0].white_player.full_name())
+
+    def test_prediction_is_fetched_apart_from_the_page(self):
+        _create_test_users(100, 4)
+        players = list(User.objects.filter(id__gte=100))
+        for player in players:
+            self.club.give_elo(player)
+        tournament = Tournament.objects.create(club=self.club, name="Predicted", organiser=self.user,
+                                               deadline=make_aware(datetime.now() - timedelta(minutes=5)))
+        tournament.participants.set(players)
+        tournament.create_initial_pairings()
+        self.client.login(email=self.user.email, password="Password123")
+        prediction_url = reverse("tournament_prediction", kwargs={"tournament_id": tournament.id})
+        response = self.client.get(reverse("view_tournament", kwargs={"tournament_id": tournament.id}))
+        self.assertContains(response, prediction_url)
+        self.assertFalse(TournamentPrediction.objects.exists())
+
+        with patch("clubs.predictions.request_prediction") as request_prediction:
+            pending = self.client.get(prediction_url).json()
+        self.assertTrue(pending["pending"])
+        self.assertIsNone(pending["prediction"])
+        self.assertIn("being worked out", pending["html"])
+        request_prediction.assert_called_once()
+        self.assertFalse(TournamentPrediction.objects.exists())
+
+        # What the worker process does
+        refresh_prediction(tournament.id, simulations=1000)
+        prediction = self.client.get(prediction_url).json()
+        self.assertFalse(prediction["pending"])
+        self.assertEqual(prediction["prediction"]["rounds"], ["Semi-finals", "Final", "Winner"])
+        self.assertIn(players[0].full_name(), prediction["html"])
+
+    def test_result_sent_twice_is_recorded_once(self):
+        _create_test_users(100, 4)
+        players = list(User.objects.filter(id__gte=100))
+        for player in players:
+            self.club.give_elo(player)
+        tournament = Tournament.objects.create(club=self.club, name="Double click", organiser=self.user,
+                                               deadline=make_aware(datetime.now() - timedelta(minutes=5)))
+        tournament.participants.set(players)
+        first_round = tournament.create_initial_pairings()
+        self.client.login(email=self.user.email, password="Password123")
+        url = reverse("view_tournament", kwargs={"tournament_id": tournament.id})
+        result = {"results_entered": "1", "pairing": first_round[0].id, "player": first_round[0].white_player_id}
+        self.client.get(url, result)
+        response = self.client.get(url, result, follow=True)
+        self.assertContains(response, "is not waiting for a result")
+
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.round, 1)
+        self.assertEqual(tournament.pending_pairings, 1)
+        self.assertEqual(first_round[0].match.count(), 1)
+        self.assertEqual(EloRatingHistory.objects.filter(user=first_round[0].white_player).count(), 1)
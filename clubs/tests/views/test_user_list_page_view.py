@@ -0,0 +1,70 @@
+"""Unit tests of the view of the next pages of the user list"""
+from django.test import TestCase
+from django.urls import reverse
+from clubs.models import User, Club, EloRating
+from clubs.pagination import encode_cursor
+from clubs.views import USER_LIST_PAGE_SIZE
+
+
+class UserListPageViewTest(TestCase):
+    """Unit tests of the view of the next pages of the user list"""
+    fixtures = ["clubs/tests/fixtures/default_user.json", 'clubs/tests/fixtures/other_users.json',
+                'clubs/tests/fixtures/default_club.json']
+
+    def setUp(self):
+        self.user = User.objects.get(email='janedoe@example.com')
+        self.club = Club.objects.get(name='Saint Louis Chess Club')
+        self.url = reverse("user_list_page", kwargs={'club_id': self.club.id})
+        for user_id in range(100, 100 + USER_LIST_PAGE_SIZE + 5):
+            self.club.make_member(User.objects.create_user(
+                id=user_id, first_name=f"First {user_id}", last_name=f"Last {user_id}", email=f"{user_id}@test.com",
+                chess_exp="Expert" if user_id % 2 else "Beginner"))
+
+    def test_user_list_page_url(self):
+        self.assertEqual(self.url, "/1/users/page")
+
+    def test_applicant_cannot_fetch_pages(self):
+        self.club.make_applicant(self.user)
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_first_page_links_to_the_next(self):
+        self.club.make_member(self.user)
+        self.client.login(email=self.user.email, password="Password123")
+        page = self.client.get(self.url, {"sort": "name"}).json()
+        self.assertEqual(len(page["users"]), USER_LIST_PAGE_SIZE)
+        self.assertNotIn("email", page["users"][0])
+        next_page = self.client.get(self.url, {"sort": "name", "after": page["next"]}).json()
+        self.assertIsNone(next_page["next"])
+        listed = [user["id"] for user in page["users"] + next_page["users"]]
+        self.assertEqual(len(listed), self.club.get_number_of_members())
+        self.assertEqual(len(set(listed)), len(listed))
+        self.assertIn(next_page["users"][0]["name"], next_page["rows"])
+
+    def test_officer_sees_emails_and_roles(self):
+        self.club.make_member(self.user)
+        self.club.make_officer(self.user)
+        self.client.login(email=self.user.email, password="Password123")
+        page = self.client.get(self.url, {"role": "Officer"}).json()
+        self.assertEqual(page["users"], [{"id": self.user.id, "name": self.user.full_name(),
+                                          "chess_exp": self.user.chess_exp,
+                                          "elo": EloRating.objects.get(club=self.club, user=self.user).elo_rating, "email": self.user.email,
+                                          "role": "Officer"}])
+
+    def test_member_cannot_filter_by_role(self):
+        self.club.make_member(self.user)
+        self.client.login(email=self.user.email, password="Password123")
+        page = self.client.get(self.url, {"role": "Officer", "experience": "Expert"}).json()
+        self.assertTrue(page["users"])
+        self.assertTrue(all(user["chess_exp"] == "Expert" for user in page["users"]))
+
+    def test_cursor_with_values_of_the_wrong_type_starts_from_the_first_page(self):
+        self.club.make_member(self.user)
+        self.client.login(email=self.user.email, password="Password123")
+        first_page = self.client.get(self.url).json()
+        for values in (["abc", "x"], [None, 1]):
+            for url in (self.url, reverse("users", kwargs={'club_id': self.club.id})):
+                response = self.client.get(url, {"after": encode_cursor(values)})
+                self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.client.get(self.url, {"after": encode_cursor(values)}).json(), first_page)
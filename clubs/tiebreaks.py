@@ -0,0 +1,59 @@
+"""Tie-break scores of tournament standings, computed for every player at once from a matrix of results."""
+from collections import namedtuple
+import numpy as np
+
+TieBreakScores = namedtuple('TieBreakScores', ['points', 'wins', 'buchholz', 'median_buchholz', 'sonneborn_berger',
+                                               'direct_encounter'])
+
+# The tie-breaks applied after points, in order
+ROUND_ROBIN_TIEBREAKS = ('direct_encounter', 'sonneborn_berger', 'wins')
+SWISS_TIEBREAKS = ('median_buchholz', 'buchholz', 'sonneborn_berger', 'direct_encounter')
+
+
+def compute_tiebreaks(players, results, extra_points=None):
+    """Return the tie-break scores of the players, as arrays in the order of the players.
+
+    results are (white, black, white score) of the games played, games with other players are ignored.
+    extra_points are points scored without an opponent, like byes, they count towards points only.
+
+    - Buchholz: the sum of the points of every opponent met
+    - Median Buchholz: Buchholz without the best and the worst opponent, once there are at least three
+    - Sonneborn-Berger: the points of the opponents beaten plus half the points of those drawn
+    - Direct encounter: the points scored against the other players on the same points"""
+    n = len(players)
+    index = {player: i for (i, player) in enumerate(players)}
+    games = [(index[white], index[black], score) for (white, black, score) in results
+             if white in index and black in index]
+    scores = np.zeros((n, n))
+    met = np.zeros((n, n))
+    if games:
+        (white, black, white_scores) = (np.array(column) for column in zip(*games))
+        np.add.at(scores, (white, black), white_scores)
+        np.add.at(scores, (black, white), 1 - white_scores)
+        np.add.at(met, (white, black), 1)
+        np.add.at(met, (black, white), 1)
+        wins = np.bincount(white[white_scores == 1], minlength=n) + np.bincount(black[white_scores == 0], minlength=n)
+    else:
+        wins = np.zeros(n, dtype=int)
+
+    points = scores.sum(axis=1)
+    if extra_points is not None:
+        points += np.array([extra_points.get(player, 0) for player in players])
+    buchholz = met @ points
+    opponent_points = np.broadcast_to(points, (n, n))
+    cut = np.where((met > 0).sum(axis=1) >= 3,
+                   np.max(opponent_points, axis=1, initial=0, where=met > 0)
+                   + np.min(opponent_points, axis=1, initial=points.max(initial=0), where=met > 0), 0)
+    median_buchholz = buchholz - cut
+    sonneborn_berger = scores @ points
+    direct_encounter = (scores * (points[:, np.newaxis] == points[np.newaxis, :])).sum(axis=1)
+    return TieBreakScores(points, wins, buchholz, median_buchholz, sonneborn_berger, direct_encounter)
+
+
+def rank_players(players, results, tiebreaks, extra_points=None):
+    """Return the players best first with their tie-break scores, ranked by points and then the tie-breaks in
+    order. Players still level after every tie-break are ranked by id, so the ranking is reproducible."""
+    players = list(players)
+    table = compute_tiebreaks(players, results, extra_points)
+    keys = [np.array(players)] + [-getattr(table, name) for name in reversed(tiebreaks)] + [-table.points]
+    return [(players[i], TieBreakScores(*(column[i].item() for column in table))) for i in np.lexsort(keys)]
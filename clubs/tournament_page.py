@@ -0,0 +1,36 @@
+"""The view-model of the tournament page, loaded with a fixed number of queries and handed to the template as plain
+data, so rendering it costs the same for a tournament of four players and one of hundreds of pairings."""
+from .models import Tournament
+
+
+def build_tournament_page(tournament, user):
+    """Return the data of the page of a tournament still being played, as seen by the user.
+
+    It has the same shape as the snapshot of a completed tournament, with what depends on the viewer and on the
+    state of play added under 'viewer' and 'live'."""
+    page = tournament.get_page_data()
+    participant_ids = {participant['id'] for participant in page['participants']}
+    is_organising = tournament.is_organised_by(user)
+    page['viewer'] = {
+        'is_organiser': user.id == tournament.organiser_id,
+        'is_organising': is_organising,
+        'is_member': tournament.club.get_all_users().filter(id=user.id).exists(),
+        'is_participant': user.id in participant_ids,
+    }
+
+    has_pairings = tournament.pairings_within.exists()
+    open_pairings = []
+    if is_organising and tournament.pending_pairings:
+        open_pairings = [{'id': pairing.id, 'round': pairing.round,
+                          'white': {'id': pairing.white_player_id, 'name': pairing.white_player.full_name()},
+                          'black': {'id': pairing.black_player_id, 'name': pairing.black_player.full_name()}}
+                         for pairing in tournament.get_open_pairings()]
+    page['live'] = {
+        'has_pairings': has_pairings,
+        'round_completed': has_pairings and not tournament.pending_pairings,
+        'pending_pairings': tournament.pending_pairings,
+        'is_full': (tournament.format == Tournament.Format.KNOCKOUT and not tournament.group_size
+                    and len(participant_ids) >= Tournament.MAX_KNOCKOUT_PARTICIPANTS),
+        'open_pairings': open_pairings,
+    }
+    return page
@@ -1,18 +1,41 @@
-from django.shortcuts import redirect, render
-from .models import Tournament, User, Club, ClubApplication, Pairing, pairing_to_match_elimination_phase, EloRating
-from .forms import SignUpForm, LogInForm, EditForm, CreateClubForm, CreateTournamentForm
+import json
+from django.shortcuts import get_object_or_404, redirect, render
+from .models import Tournament, User, Club, ClubApplication, EloRating, TournamentSnapshot, get_application_inbox, \
+    get_club_directory
+from .middleware import UserMemberships
+from .forms import SignUpForm, LogInForm, EditForm, CreateClubForm, CreateTournamentForm, RoundResultsForm
+from .predictions import get_stored_prediction
+from .pagination import keyset_page
+from .search import autocomplete, search
+from .tournament_page import build_tournament_page
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.views.decorators.http import require_POST
 from datetime import datetime, date
+from django.utils.dateparse import parse_datetime
 from django.utils.timezone import make_aware
 from random import choice
 from pathlib import Path
+from math import ceil
 
 global club
 club = None
 
+LEADERBOARD_PAGE_SIZE = 50
+USER_LIST_PAGE_SIZE = 50
+# Both orderings end with the id, so each row has its own place and the cursor of a page is never ambiguous
+USER_LIST_ORDERINGS = {"elo": ("-elo_rating", "user_id"), "name": ("last_name", "id")}
+USER_LIST_ROLES = ["Owner", "Officer", "Member"]
+CLUB_LIST_PAGE_SIZE = 50
+CLUB_LIST_ORDERING = ("name", "id")
+APPLICATION_INBOX_PAGE_SIZE = 50
+APPLICATION_INBOX_ORDERING = ("-created_at", "-id")
+
 
 def login_prohibited(view_function):
     def modified_view_function(request):
@@ -26,77 +49,62 @@ def login_prohibited(view_function):
 
 @login_required
 def manage_applications(request):
-    user = request.user
-    if request.method == 'POST' and 'accepted' in request.POST:
-        username = request.POST.get('uname')  # the user to promote
-        club_name = request.POST.get('clubname')  # the club they wish to become a member of
-        temp_club = Club.objects.get(name=club_name)
-        temp_user = User.objects.get(email=username)
-        temp_club.make_member(temp_user)
-        temp_club.save()
-        form_to_be_deleted = ClubApplication.objects.get(associated_club=temp_club, associated_user=temp_user)
-        form_to_be_deleted.delete()
+    managed_club_ids = request.memberships.managed_club_ids
+    if request.method == 'POST' and ('accepted' in request.POST or 'rejected' in request.POST):
+        # An id that is not a number cannot name an application, and would otherwise fail the lookup itself
+        if not request.POST.get('application', '').isdecimal():
+            raise Http404("No application has this id")
+        application = get_object_or_404(ClubApplication.objects.select_related('associated_club', 'associated_user'),
+                                         id=request.POST['application'], associated_club_id__in=managed_club_ids,
+                                         is_rejected=False)
+        if 'accepted' in request.POST:
+            application.associated_club.make_member(application.associated_user)
+            application.delete()
+        else:
+            ClubApplication.objects.filter(id=application.id).update(is_rejected=True)
         return redirect('manage_applications')
 
-    if request.method == 'POST' and 'rejected' in request.POST:
-        username = request.POST.get('uname')  # the user to promote
-        club_name = request.POST.get('clubname')  # the club they wish to become a member of
-        temp_club = Club.objects.get(name=club_name)
-        temp_user = User.objects.get(email=username)
-        form_to_be_rejected = ClubApplication.objects.get(associated_club=temp_club, associated_user=temp_user)
-        form_to_be_rejected.is_rejected = True
-        form_to_be_rejected.save()
-        return redirect('manage_applications')
-
-    applications = []
-    try:
-        temp = ClubApplication.objects.filter(is_rejected=False)
-    except ClubApplication.DoesNotExist:
-        temp = None
-    for app in temp:
-        if user in app.associated_club.get_officers() or user == app.associated_club.get_owner():
-            applications.append(app)
-
-    user_clubs = user_clubs_finder(request)
-
-    return render(request, 'manage_applications.html',
-                  {'applications': applications, "user_clubs": user_clubs, "selected_club": club})
+    (applications, next_cursor) = keyset_page(get_application_inbox(managed_club_ids), APPLICATION_INBOX_ORDERING,
+                                              request.GET.get("after"), APPLICATION_INBOX_PAGE_SIZE)
+    for application in applications:
+        if not hasattr(application.associated_club, 'summary'):
+            application.associated_club.summary = application.associated_club.refresh_summary()
+    return render(request, 'manage_applications.html', {'applications': applications, "next_cursor": next_cursor,
+                                                        "selected_club": club})
 
 
 @login_required
 def user_list_main(request, club_id):
-    user_clubs = user_clubs_finder(request)
+    user_clubs = request.memberships.clubs
     try:
         club_verify = Club.objects.get(id=club_id)
     except Club.DoesNotExist:
-        response = render(request, "no_access_screen.html", {"user_clubs": user_clubs})
+        response = render(request, "no_access_screen.html")
         return response
     if user_clubs and club_verify in user_clubs:
         global club
-        club = Club.objects.get(id=club_id)
+        club = club_verify
         response = user_list(request, club)
         return response
     else:
-        response = render(request, "no_access_screen.html", {"user_clubs": user_clubs})
+        response = render(request, "no_access_screen.html")
         return response
 
 
 @login_required
 def user_list_no_club(request):
-    user_clubs = user_clubs_finder(request)
-    response = render(request, "no_club_screen.html", {"user_clubs": user_clubs})
+    response = render(request, "no_club_screen.html")
     return response
 
 
 def user_list_select_club(request):
-    user_clubs = user_clubs_finder(request)
-    response = render(request, "select_club_screen.html", {"user_clubs": user_clubs})
+    response = render(request, "select_club_screen.html")
     return response
 
 
 @login_required
 def user_list(request, user_club):
-    if user_club.user_level(request.user) == 'Applicant':
+    if request.memberships.user_level(user_club) == 'Applicant':
         redirect('home_page')
 
     if request.GET.get("listed_user"):
@@ -116,46 +124,77 @@ def user_list(request, user_club):
 
         return redirect("users", user_club.id)
 
-    if request.user.user_level(user_club) == "Member":
-        user_dict = user_club.get_members()
-    else:
-        user_dict = user_club.get_all_users()
-
-    user_dict_with_levels_elo = []
-    for user in user_dict:
-        user_elo_club = EloRating.objects.get(user=user, club=user_club)
-        user_dict_with_levels_elo.append((user, user_club.user_level(user), user_elo_club.elo_rating))
-
-    user_clubs = user_clubs_finder(request)
-
+    (users, next_cursor, filters) = _get_user_list_page(request, user_club)
     return render(request, "user_list.html",
-                  {"users": user_dict_with_levels_elo, "user_level": request.user.user_level(user_club),
-                   "user_clubs": user_clubs, "selected_club": user_club})
+                  {"users": users, "next_cursor": next_cursor, "filters": filters,
+                   "user_level": request.memberships.user_level(user_club), "selected_club": user_club,
+                   "experience_levels": User.ChessExperience.values, "roles": USER_LIST_ROLES})
 
 
 @login_required
-# Finds all clubs the logged in user belongs to and returns this information in a list
-def user_clubs_finder(request):
-    user_clubs = []
-
-    clubs = Club.objects.all()
-    for temp_club in clubs:
-        if request.user in temp_club.get_all_users():
-            user_clubs.append(temp_club)
-    return user_clubs
+def user_list_page(request, club_id):
+    """The next page of the user list as JSON, fetched by the table as it is scrolled."""
+    user_club = Club.objects.filter(id=club_id).first()
+    user_level = request.memberships.user_level(user_club) if user_club else "Applicant"
+    if user_level == "Applicant":
+        return JsonResponse({"error": "Only the users of the club can see its user list"}, status=403)
+    (users, next_cursor, _) = _get_user_list_page(request, user_club)
+    is_officer = user_level in ("Officer", "Owner")
+    return JsonResponse({
+        "users": [dict({"id": user.id, "name": user.full_name(), "chess_exp": user.chess_exp, "elo": user.elo},
+                       **({"email": user.email, "role": user.role} if is_officer else {})) for user in users],
+        "rows": render_to_string("partials/user_list_rows.html",
+                                 {"users": users, "user_level": user_level, "selected_club": user_club},
+                                 request=request),
+        "next": next_cursor,
+    })
+
+
+def _get_user_list_page(request, user_club):
+    user_level = request.memberships.user_level(user_club)
+    filters = {
+        "sort": request.GET.get("sort") if request.GET.get("sort") in USER_LIST_ORDERINGS else "elo",
+        # Members only ever see members, so they cannot filter by role
+        "role": request.GET.get("role") if user_level != "Member" and request.GET.get("role") in USER_LIST_ROLES
+        else "",
+        "experience": request.GET.get("experience") if request.GET.get("experience") in User.ChessExperience.values
+        else "",
+    }
+    list_filters = {"members_only": user_level == "Member", "role": filters["role"],
+                    "experience": filters["experience"]}
+    if filters["sort"] == "elo":
+        (ratings, next_cursor) = keyset_page(user_club.get_rated_user_list(**list_filters), USER_LIST_ORDERINGS["elo"],
+                                             request.GET.get("after"), USER_LIST_PAGE_SIZE)
+        users = [rating.get_listed_user() for rating in ratings]
+    else:
+        (users, next_cursor) = keyset_page(user_club.get_user_list(**list_filters), USER_LIST_ORDERINGS["name"],
+                                           request.GET.get("after"), USER_LIST_PAGE_SIZE)
+    return users, next_cursor, filters
 
 
 @login_required
-# Finds all clubs the logged in user belongs to and returns this information in a list
-def user_applied_clubs_finder(request):
-    user_clubs = []
-
-    clubs = Club.objects.all()
-    for temp_club in clubs:
-        if request.user in temp_club.get_all_applicants():
-            user_clubs.append(temp_club)
+def leaderboard(request, club_id):
+    try:
+        requested_club = Club.objects.get(id=club_id)
+    except Club.DoesNotExist:
+        return render(request, "no_access_screen.html")
+    if requested_club not in request.memberships.clubs:
+        return render(request, "no_access_screen.html")
+
+    user_entry = requested_club.get_leaderboard_entry(request.user)
+    number_of_pages = max(1, ceil(requested_club.leaderboard.count() / LEADERBOARD_PAGE_SIZE))
+    if request.GET.get("find_me") and user_entry:
+        page_number = ceil(user_entry.position / LEADERBOARD_PAGE_SIZE)
+    else:
+        try:
+            page_number = min(max(int(request.GET.get("page", 1)), 1), number_of_pages)
+        except ValueError:
+            page_number = 1
 
-    return user_clubs
+    return render(request, "leaderboard.html",
+                  {"entries": requested_club.get_leaderboard_page(page_number, LEADERBOARD_PAGE_SIZE),
+                   "user_entry": user_entry, "page_number": page_number, "number_of_pages": number_of_pages,
+                   "selected_club": requested_club})
 
 
 @login_required
@@ -179,38 +218,53 @@ def club_list(request):
             temp_club.make_applicant(curr_user)
             temp_club.save()
 
-    applications = []
-    try:
-        apps = ClubApplication.objects.filter(is_rejected=False)
-    except ClubApplication.DoesNotExist:
-        apps = None
-    for a in apps:
-        applications.append(a)
-
-    rejected_applications = []
-    try:
-        rejected = ClubApplication.objects.filter(is_rejected=True)
-    except ClubApplication.DoesNotExist:
-        rejected = None
-    for r in rejected:
-        rejected_applications.append(r)
+    search = request.GET.get("q", "").strip()
+    (clubs, next_cursor) = keyset_page(get_club_directory(curr_user, search), CLUB_LIST_ORDERING,
+                                       request.GET.get("after"), CLUB_LIST_PAGE_SIZE)
+    for listed_club in clubs:
+        if not hasattr(listed_club, 'summary'):
+            listed_club.summary = listed_club.refresh_summary()
 
-    user_clubs = user_clubs_finder(request)
     return render(request, "club_list.html",
-                  {"clubs": Club.objects.all(), 'applications': applications, 'curr_user': curr_user,
-                   "user_clubs": user_clubs, "selected_club": club, "rejected_applications": rejected_applications})
+                  {"clubs": clubs, "next_cursor": next_cursor, "search": search, 'curr_user': curr_user,
+                   "selected_club": club})
+
+
+@login_required
+def site_search(request):
+    """Clubs and players matching every word of the query, best match first."""
+    text = request.GET.get("q", "")
+    return JsonResponse({"clubs": [_club_result(found_club) for found_club in search(Club, text)],
+                         "users": [_user_result(user) for user in search(User, text)]})
+
+
+@login_required
+def search_autocomplete(request):
+    """Clubs and players whose names start with what has been typed so far."""
+    text = request.GET.get("q", "")
+    return JsonResponse({"clubs": [_club_result(found_club) for found_club in autocomplete(Club, text)],
+                         "users": [_user_result(user) for user in autocomplete(User, text)]})
+
+
+def _club_result(found_club):
+    return {"id": found_club.id, "name": found_club.name, "location": found_club.location,
+            "url": reverse("club_page", args=[found_club.id])}
+
+
+def _user_result(user):
+    return {"id": user.id, "name": user.full_name(), "url": reverse("profile", args=[user.id])}
 
 
 @login_required
 def home_page(request):
-    user_clubs = user_clubs_finder(request)
     return render(request, 'home_page.html', {"date": date.today().strftime("%d/%m/%Y"),
                                               "pun": choice(open(Path(__file__).with_name("puns.txt")).readlines()),
                                               "today": make_aware(datetime.now()),
                                               # i was going to make puns.txt a static file, but apparently django
                                               # won't 'serve' them when debug mode will be turned off
-                                              "incomplete_user_tournaments": _get_current_user_tournaments(user_clubs),
-                                              "user_clubs": user_clubs, "selected_club": club})
+                                              "incomplete_user_tournaments": _get_current_user_tournaments(
+                                                  request.memberships.clubs),
+                                              "selected_club": club})
 
 
 def _get_current_user_tournaments(user_clubs):
@@ -225,15 +279,14 @@ def _get_current_user_tournaments(user_clubs):
 
 @login_required
 def profile(request, user_id):
-    user_clubs = user_clubs_finder(request)
     try:
         requested_user = User.objects.get(id=user_id)
-        all_user_clubs = requested_user.member_of.all().union(requested_user.officer_of.all()).union(
-            requested_user.owner_of.all())
+        # The clubs of the user and their level in each come from one query, already made for one's own profile
+        memberships = request.memberships if requested_user == request.user else UserMemberships(requested_user)
+        club_elos = dict(requested_user.user_elo.values_list('club_id', 'elo_rating'))
         club_dict_elo = []
-        for club_x in all_user_clubs:
-            user_elo_club = EloRating.objects.get(user=requested_user, club=club_x)
-            club_dict_elo.append((club_x, club_x.user_level(requested_user), user_elo_club.elo_rating))
+        for club_x in memberships.clubs:
+            club_dict_elo.append((club_x, memberships.user_level(club_x), club_elos[club_x.id]))
     except:
         if club:
             return redirect("users", club.id)
@@ -241,8 +294,9 @@ def profile(request, user_id):
             return redirect("select_club")
     else:
         return render(request, "profile.html",
-                      {"requested_user": requested_user, "all_user_clubs": club_dict_elo, "user_clubs": user_clubs,
-                       "selected_club": club})
+                      {"requested_user": requested_user, "all_user_clubs": club_dict_elo,
+                       "elo_statistics": requested_user.get_elo_statistics(), "stats": requested_user.get_stats(),
+                       "tournaments": requested_user.participates_in.all(), "selected_club": club})
 
 
 @login_prohibited
@@ -264,9 +318,7 @@ def change_password(request):
     else:
         form = PasswordChangeForm(user=current_user)
 
-    user_clubs = user_clubs_finder(request)
-
-    return render(request, 'change_password.html', {'form': form, "user_clubs": user_clubs, "selected_club": club})
+    return render(request, 'change_password.html', {'form': form, "selected_club": club})
 
 
 @login_required
@@ -281,9 +333,7 @@ def edit_profile(request):
     else:
         form = EditForm(instance=current_user)
 
-    user_clubs = user_clubs_finder(request)
-
-    return render(request, 'edit_profile.html', {'form': form, "user_clubs": user_clubs, "selected_club": club})
+    return render(request, 'edit_profile.html', {'form': form, "selected_club": club})
 
 
 @login_prohibited
@@ -338,15 +388,14 @@ def create_club(request):
             return redirect("club_page", club_id=temp_club.id)
     else:
         form = CreateClubForm()
-    user_clubs = user_clubs_finder(request)
-    return render(request, 'create_club.html', {'form': form, "user_clubs": user_clubs, "selected_club": club})
+    return render(request, 'create_club.html', {'form': form, "selected_club": club})
 
 
 @login_required
 def create_tournament(request):
-    user_clubs = user_clubs_finder(request)
+    user_clubs = request.memberships.clubs
     if user_clubs and club in user_clubs:
-        if request.user.user_level(club) == "Officer" or request.user.user_level(club) == "Owner":
+        if request.memberships.user_level(club) in ("Officer", "Owner"):
             if request.method == "POST":
                 form = CreateTournamentForm(post=request.POST, club=club, current_user=request.user)
                 if form.is_valid():
@@ -356,51 +405,109 @@ def create_tournament(request):
             else:
                 form = CreateTournamentForm(club=club, current_user=request.user)
             return render(request, "create_tournament.html",
-                          {"form": form, "user_clubs": user_clubs, "selected_club": club, "club_id": club.id})
+                          {"form": form, "selected_club": club, "club_id": club.id})
         else:
             messages.add_message(request, messages.ERROR, "Only officers or owners can create tournaments!")
             return redirect("home_page")
     else:
-        response = render(request, "no_access_screen.html", {"user_clubs": user_clubs})
+        response = render(request, "no_access_screen.html")
         return response
 
 
 @login_required
 def view_tournament(request, tournament_id):
     temp_user = request.user
-    user_clubs = user_clubs_finder(request)
     try:
+        if request.method == "GET" and not request.GET:
+            # Completed tournaments are shown from their snapshot, without reading anything else
+            snapshot = TournamentSnapshot.objects.filter(tournament_id=tournament_id).values_list(
+                'data', flat=True).first()
+            if snapshot is not None:
+                return render(request, "view_tournament.html",
+                              {"page": snapshot, "deadline": parse_datetime(snapshot['tournament']['deadline']),
+                               "deadline_passed": True, "selected_club": club})
         tournament = Tournament.objects.get(id=tournament_id)
         if request.GET.get("create_pairings"):
             tournament.create_initial_pairings()
             return redirect("view_tournament", tournament_id)
         if request.GET.get("results_entered"):
-            pairing = Pairing.objects.get(id=request.GET.get("pairing"))
-            if request.GET.get("player"):
-                match = pairing_to_match_elimination_phase(pairing, User.objects.get(id=request.GET.get("player")))
-            else:
-                match = pairing_to_match_elimination_phase(pairing)
-            match.save()
-            if tournament.all_pairings_completed() and not tournament.is_final:
-                tournament.next_pairings()
-            elif tournament.all_pairings_completed():
-                tournament.set_winner(match.winner)
-                tournament.save()
+            winner = request.GET.get("player")
+            try:
+                # Recorded under the lock of the tournament, so a result sent twice is turned down the second time
+                tournament.record_round_results([(int(request.GET.get("pairing")), int(winner) if winner else None)])
+            except ValueError as error:
+                messages.add_message(request, messages.ERROR, str(error))
             return redirect("view_tournament", tournament_id)
     except:
         return redirect("home_page")
 
     if request.method == 'POST' and 'Join_tournament' in request.POST:
         if temp_user not in tournament.get_all_participants() and make_aware(datetime.now()) < tournament.deadline:
-            tournament.make_participant(temp_user)
+            try:
+                tournament.make_participant(temp_user)
+            except ValueError:
+                messages.add_message(request, messages.ERROR, "The tournament is full")
 
     if request.method == 'POST' and 'Leave_tournament' in request.POST:
         if temp_user in tournament.get_all_participants() and make_aware(datetime.now()) < tournament.deadline:
             tournament.remove_participant(temp_user)
 
+    page = build_tournament_page(tournament, temp_user)
+    round_results_form = None
+    if page["viewer"]["is_organising"] and tournament.pending_pairings:
+        round_results_form = RoundResultsForm(tournament)
     return render(request, "view_tournament.html",
-                  {"tournament": tournament, "deadline_passed": tournament.deadline < make_aware(datetime.now()),
-                   "user_clubs": user_clubs, "selected_club": club})
+                  {"tournament": tournament, "page": page,
+                   "deadline": tournament.deadline, "deadline_passed": tournament.deadline < make_aware(datetime.now()),
+                   "selected_club": club,
+                   "round_results_form": round_results_form})
+
+
+@login_required
+def tournament_prediction(request, tournament_id):
+    """The stored prediction of a knockout tournament, fetched by its page once shown. An out of date prediction is
+    worked out by a worker process in the meantime and is pending, the page asks again until it is stored."""
+    tournament = get_object_or_404(Tournament, id=tournament_id)
+    (prediction, pending) = get_stored_prediction(tournament)
+    return JsonResponse({"prediction": prediction, "pending": pending,
+                         "html": render_to_string("partials/tournament_prediction.html",
+                                                  {"prediction": prediction, "pending": pending}, request=request)})
+
+
+@login_required
+@require_POST
+def submit_round_results(request, tournament_id):
+    """Record results of the current round all at once, posted from the tournament page or as JSON.
+
+    JSON requests send {"results": [{"pairing": id, "winner": id or null for a draw}, ...]} and get back the
+    number of results recorded, the round the tournament is in and its winner, if it has one now."""
+    tournament = get_object_or_404(Tournament, id=tournament_id)
+    is_json = request.content_type == "application/json"
+    if not tournament.is_organised_by(request.user):
+        if is_json:
+            return JsonResponse({"error": "Only the organisers can enter results"}, status=403)
+        return HttpResponseForbidden()
+
+    if is_json:
+        try:
+            results = [(int(result["pairing"]), None if result.get("winner") is None else int(result["winner"]))
+                       for result in json.loads(request.body)["results"]]
+            matches = tournament.record_round_results(results)
+        except (ValueError, KeyError, TypeError) as error:
+            return JsonResponse({"error": str(error) or "Invalid results"}, status=400)
+        return JsonResponse({"recorded": len(matches), "round": tournament.round, "winner": tournament.winner_id})
+
+    form = RoundResultsForm(tournament, request.POST)
+    if form.is_valid():
+        try:
+            matches = tournament.record_round_results(form.get_results())
+        except ValueError as error:
+            messages.add_message(request, messages.ERROR, str(error))
+        else:
+            messages.add_message(request, messages.SUCCESS, f"Recorded {len(matches)} results")
+    else:
+        messages.add_message(request, messages.ERROR, "The results could not be recorded")
+    return redirect("view_tournament", tournament_id)
 
 
 @login_required
@@ -424,9 +531,9 @@ def club_page(request, club_id):
             temp_club.make_applicant(request.user)
             temp_club.save()
 
-    user_clubs = user_clubs_finder(request)
     return render(request, "club_page.html", {"club": requested_club,
                                               "owner_elo": EloRating.objects.get(user=requested_club.owner,
                                                                                  club=requested_club),
+                                              "elo_statistics": requested_club.get_elo_statistics(),
                                               "today": make_aware(datetime.now()), "curr_user": request.user,
-                                              "user_clubs": user_clubs, "selected_club": club})
+                                              "selected_club": club})
@@ -20,9 +20,14 @@ from clubs import views
 urlpatterns = [
     path("admin", admin.site.urls),
     path("<club_id>/users", views.user_list_main, name="users"),
+    path("<club_id>/users/page", views.user_list_page, name="user_list_page"),
     path("create_tournament", views.create_tournament, name="create_tournament"),
     path("tournament/<tournament_id>", views.view_tournament, name="view_tournament"),
+    path("tournament/<tournament_id>/results", views.submit_round_results, name="submit_round_results"),
+    path("tournament/<tournament_id>/prediction", views.tournament_prediction, name="tournament_prediction"),
     path("clubs", views.club_list, name="clubs"),
+    path("search", views.site_search, name="search"),
+    path("search/autocomplete", views.search_autocomplete, name="search_autocomplete"),
     path("no_club", views.user_list_no_club, name="no_club"),
     path("select_club", views.user_list_select_club, name="select_club"),
     path("home", views.home_page, name="home_page"),
@@ -36,4 +41,5 @@ urlpatterns = [
     path("create_club", views.create_club, name="create_club"),
     path('manage_applications', views.manage_applications, name='manage_applications'),
     path("club/<int:club_id>", views.club_page, name="club_page"),
+    path("club/<int:club_id>/leaderboard", views.leaderboard, name="leaderboard"),
 ]